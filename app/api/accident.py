@@ -1,14 +1,21 @@
-from fastapi import Depends, APIRouter, HTTPException, status
-from fastapi.responses import JSONResponse
-from fastapi.encoders import jsonable_encoder
+from fastapi import Depends, APIRouter, HTTPException, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
+from ..database import get_settings
 from ..dependencies import get_session
-from ..services.accident import get_accident_meta, get_accident_details_by_city
+from ..utils.serializer import FastJSONResponse, FastJSONRoute
+from ..utils.export import get_export_format, create_export_response
+from ..services.accident import (
+    get_accident_meta,
+    get_accident_details_by_city,
+    stream_accident_points_by_city
+)
 from ..schemas.accident import DeAccidentMetaResponse
 
-route_accident = APIRouter(prefix='/accident/v1')
+route_accident = APIRouter(prefix='/accident/v1', route_class=FastJSONRoute)
+
+EXPORT_CHUNK_SIZE = get_settings().export_chunk_size
 
 
 @route_accident.get(
@@ -43,13 +50,34 @@ async def fetch_accident_meta(session: AsyncSession = Depends(get_session)):
         404: {'description': 'Not Found'},
         422: {'description': 'Unprocessable Entity'},
     },
-    tags=['Unfallatlas']
+    tags=['Unfallatlas'],
+    description=(
+        'Retrieves the accidents of a city as GeoJSON feature collection. '
+        'Send Accept: application/x-ndjson or text/csv to stream one accident per row instead.')
 )
 async def fetch_accident_details_by_city(
+    request: Request,
     query: str,
     session: AsyncSession = Depends(get_session)
 ):
+    export_format = get_export_format(request)
+
+    if export_format is not None:
+        response = await create_export_response(
+            export_format,
+            lambda session: stream_accident_points_by_city(
+                session, query, EXPORT_CHUNK_SIZE),
+            'accidents'
+        )
+
+        if response is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f'No accidents for {query} found'
+            )
+
+        return response
+
     rows = await get_accident_details_by_city(session, query)
-    result = jsonable_encoder(rows)
 
-    return JSONResponse(content=result[0])
+    return FastJSONResponse(content=rows[0])
@@ -1,19 +1,26 @@
-from fastapi import Depends, APIRouter, HTTPException, Query, status
-from fastapi.responses import JSONResponse
-from fastapi.encoders import jsonable_encoder
+from fastapi import Depends, APIRouter, HTTPException, Query, Request, status
+from fastapi.responses import Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
 from ..dependencies import get_session
+from ..utils.geometry import GEOMETRY_ACCEPT_DESCRIPTION, GeometryOptions, get_geometry_options, geometry_response
+from ..utils.serializer import FastJSONResponse, FastJSONRoute
+from ..utils.simplify import SIMPLIFY_DESCRIPTION, get_boundary_tolerance
+from ..tilestore import get_cached_tile
+from ..topology import get_cached_topology, topology_response
+from ..utils.tile import TILE_RESPONSES, tile_response
 from ..services.administrative import (
     get_parcel_meta_by_lat_lng,
     get_municipality_by_query,
     get_municipality_by_name,
-    get_municipality_by_key
+    get_municipality_by_key,
+    get_municipality_boundaries,
+    get_district_boundaries
 )
 
 
-route_administrative = APIRouter(prefix='/administrative/v1')
+route_administrative = APIRouter(prefix='/administrative/v1', route_class=FastJSONRoute)
 
 
 @route_administrative.get(
@@ -25,17 +32,21 @@ route_administrative = APIRouter(prefix='/administrative/v1')
         404: {'description': 'Not Found'},
         422: {'description': 'Unprocessable Entity'},
     },
-    tags=['Verwaltungsgebiete'])
+    tags=['Verwaltungsgebiete'],
+    description=(
+        'Retrieves the cadastral parcel at the provided coordinates. '
+        f'{GEOMETRY_ACCEPT_DESCRIPTION}')
+)
 async def fetch_parcel_meta_by_lat_lng(
     lat: float,
     lng: float,
+    options: GeometryOptions = Depends(get_geometry_options),
     session: AsyncSession = Depends(get_session)
 ):
-    rows = await get_parcel_meta_by_lat_lng(session, lat, lng)
-    response = jsonable_encoder(rows)
+    rows = await get_parcel_meta_by_lat_lng(session, lat, lng, options)
 
     try:
-        return JSONResponse(content=response[0])
+        return geometry_response(rows[0], options)
     except IndexError:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -61,10 +72,9 @@ async def fetch_municipality_by_query(
     session: AsyncSession = Depends(get_session)
 ):
     rows = await get_municipality_by_query(session, query)
-    response = jsonable_encoder(rows)
 
     try:
-        return JSONResponse(content=response)
+        return FastJSONResponse(content=rows)
     except IndexError as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail=f'no results found')
@@ -80,37 +90,119 @@ async def fetch_municipality_by_query(
         422: {'description': 'Unprocessable Entity'},
     },
     tags=['Verwaltungsgebiete'],
-    description=('Retrieves the geometry, bounding box, shape area, and statistical information of a municipality based on the provided municipality key (AGS) or the municipality name.')
+    description=(
+        'Retrieves the geometry, bounding box, shape area, and statistical information of a municipality based on the provided municipality key (AGS) or the municipality name. '
+        f'{SIMPLIFY_DESCRIPTION} {GEOMETRY_ACCEPT_DESCRIPTION}')
 )
 async def fetch_municipality(
     municipality_key: str = Query(None, min_length=8, max_length=8),
     municipality_name: str = Query(None, min_length=2),
+    options: GeometryOptions = Depends(get_geometry_options),
+    tolerance: float | None = Depends(get_boundary_tolerance),
     session: AsyncSession = Depends(get_session)
 ):
     if municipality_key:
-        rows = await get_municipality_by_key(session, municipality_key)
-        response = jsonable_encoder(rows)
+        rows = await get_municipality_by_key(session, municipality_key, options, tolerance)
 
-        if len(response) == 0:
+        if len(rows) == 0:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail='No municipality was not found'
             )
 
-        return JSONResponse(content=response)
+        return geometry_response(rows, options)
     elif municipality_name:
-        rows = await get_municipality_by_name(session, municipality_name)
-        response = jsonable_encoder(rows)
+        rows = await get_municipality_by_name(session, municipality_name, options, tolerance)
 
-        if len(response) == 0:
+        if len(rows) == 0:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail='No municipality was not found'
             )
 
-        return JSONResponse(content=response)
+        return geometry_response(rows, options)
     else:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail='Either "key" or "name" parameter must be provided'
         )
+
+
+@route_administrative.get(
+    '/municipality/topojson',
+    response_class=Response,
+    responses={
+        200: {'description': 'OK', 'content': {'application/json': {}}},
+        404: {'description': 'Not Found'},
+        422: {'description': 'Unprocessable Entity'},
+    },
+    tags=['Verwaltungsgebiete'],
+    description=(
+        'Retrieves the boundaries of all municipalities of a district as TopoJSON, '
+        'borders shared by two municipalities are sent once.'
+    )
+)
+async def fetch_municipality_topology(
+    district_key: str = Query(..., pattern='^[0-9]{5}$')
+):
+    content = await get_cached_topology(
+        'municipalities', district_key, get_municipality_boundaries, district_key)
+
+    if content is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail='No municipalities were found'
+        )
+
+    return topology_response(content)
+
+
+@route_administrative.get(
+    '/district/topojson',
+    response_class=Response,
+    responses={
+        200: {'description': 'OK', 'content': {'application/json': {}}},
+        404: {'description': 'Not Found'},
+        422: {'description': 'Unprocessable Entity'},
+    },
+    tags=['Verwaltungsgebiete'],
+    description=(
+        'Retrieves the boundaries of all districts of a state as TopoJSON, '
+        'borders shared by two districts are sent once.'
+    )
+)
+async def fetch_district_topology(
+    state_key: str = Query(..., pattern='^[0-9]{2}$')
+):
+    content = await get_cached_topology(
+        'districts', state_key, get_district_boundaries, state_key)
+
+    if content is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail='No districts were found'
+        )
+
+    return topology_response(content)
+
+
+@route_administrative.get(
+    '/municipality/tiles/{z}/{x}/{y}.mvt',
+    response_class=Response,
+    responses=TILE_RESPONSES,
+    tags=['Verwaltungsgebiete'],
+    description=(
+        'Retrieves a Mapbox vector tile of German municipality boundaries. '
+        'Tiles below zoom level 6 are empty.'
+    )
+)
+async def fetch_municipality_tile(
+    request: Request,
+    z: int,
+    x: int,
+    y: int,
+    session: AsyncSession = Depends(get_session)
+):
+    tile = await get_cached_tile(session, 'municipality', z, x, y)
+
+    return tile_response(request, tile)
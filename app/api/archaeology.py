@@ -1,15 +1,14 @@
 from fastapi import Depends, APIRouter, HTTPException, Query
-from fastapi.responses import JSONResponse
-from fastapi.encoders import jsonable_encoder
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional, List
 
 from ..dependencies import get_session
+from ..utils.serializer import FastJSONResponse, FastJSONRoute
 from ..services.archaeology import get_archaeological_monument
 from ..schemas.archaeology import ArchaeologicalMonumentResponse
 
 
-route_archaeology = APIRouter(prefix='/archaeology/monument/v1')
+route_archaeology = APIRouter(prefix='/archaeology/monument/v1', route_class=FastJSONRoute)
 
 
 @route_archaeology.get(
@@ -43,5 +42,4 @@ async def fetch_archaeological_monument(
 
     rows = await get_archaeological_monument(session, active_filters)
 
-    response = jsonable_encoder(rows)
-    return JSONResponse(content=response)
+    return FastJSONResponse(content=rows)
@@ -1,16 +1,19 @@
-from fastapi import Depends, APIRouter, HTTPException, status
-from fastapi.responses import JSONResponse
-from fastapi.encoders import jsonable_encoder
+from fastapi import Depends, APIRouter, HTTPException, Request, status
+from fastapi.responses import Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
 from ..dependencies import get_session
+from ..utils.geometry import GEOMETRY_ACCEPT_DESCRIPTION, GeometryOptions, get_geometry_options, geometry_response
+from ..utils.serializer import FastJSONResponse, FastJSONRoute
+from ..tilestore import get_cached_tile
+from ..utils.tile import TILE_RESPONSES, tile_response
 from ..services.biotope import (
     get_biotope_meta_by_lat_lng,
     get_biotope_origin_meta
 )
 
-route_biotope = APIRouter(prefix='/biotope/v1')
+route_biotope = APIRouter(prefix='/biotope/v1', route_class=FastJSONRoute)
 
 
 @route_biotope.get(
@@ -22,17 +25,21 @@ route_biotope = APIRouter(prefix='/biotope/v1')
         404: {'description': 'Not Found'},
         422: {'description': 'Unprocessable Entity'},
     },
-    tags=['Biotopkartierung'])
+    tags=['Biotopkartierung'],
+    description=(
+        'Retrieves the mapped biotope at the provided coordinates. '
+        f'{GEOMETRY_ACCEPT_DESCRIPTION}')
+)
 async def fetch_biotope_meta_by_lat_lng(
     lat: float,
     lng: float,
+    options: GeometryOptions = Depends(get_geometry_options),
     session: AsyncSession = Depends(get_session)
 ):
-    rows = await get_biotope_meta_by_lat_lng(session, lat, lng)
-    response = jsonable_encoder(rows)
+    rows = await get_biotope_meta_by_lat_lng(session, lat, lng, options)
 
     try:
-        return JSONResponse(content=response[0])
+        return geometry_response(rows[0], options)
     except IndexError:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -55,12 +62,32 @@ async def fetch_biotope_origin(
     session: AsyncSession = Depends(get_session)
 ):
     rows = await get_biotope_origin_meta(session, code)
-    response = jsonable_encoder(rows)
 
     try:
-        return JSONResponse(content=response[0])
+        return FastJSONResponse(content=rows[0])
     except IndexError:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail='Not found'
         )
+
+
+@route_biotope.get(
+    '/tiles/{z}/{x}/{y}.mvt',
+    response_class=Response,
+    responses=TILE_RESPONSES,
+    tags=['Biotopkartierung'],
+    description=(
+        'Retrieves a Mapbox vector tile of biotope areas. Tiles below zoom level 12 are empty.'
+    )
+)
+async def fetch_biotope_tile(
+    request: Request,
+    z: int,
+    x: int,
+    y: int,
+    session: AsyncSession = Depends(get_session)
+):
+    tile = await get_cached_tile(session, 'biotope', z, x, y)
+
+    return tile_response(request, tile)
@@ -1,16 +1,33 @@
-from fastapi import Depends, APIRouter, HTTPException, Query, status
+from fastapi import Depends, APIRouter, HTTPException, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
+import numpy as np
+import time
+
 from typing import List
+from datetime import datetime
 from geojson import Feature, FeatureCollection
 
+from ..database import get_settings
 from ..dependencies import get_session
+from ..utils.serializer import FastJSONRoute
+from ..invalidation import subscribe
+from ..spatial import register_layer
+from ..tilestore import get_cached_tile
+from ..utils.cache import TTLCache, register_cache
+from ..utils.dwd_kmz import FORECAST_ELEMENTS
+from ..utils.exceptions import CustomValidationError
+from ..utils.geometry import GEOMETRY_ACCEPT_DESCRIPTION, GeometryOptions, get_geometry_options, geometry_response
+from ..utils.tile import TILE_RESPONSES, tile_response
 from ..services.climate import (
     get_dwd_stations_by_municipality_key,
-    get_mosmix_nearest_geometriey_by_position,
-    get_mosmix_geometries_by_radius,
-    get_mosmix_geometries_by_bbox,
     get_weather_service_stations,
-    get_all_mosmix_stations
+    get_all_mosmix_stations,
+    get_mosmix_station_points,
+    get_weather_station_points,
+    get_mosmix_station_ids,
+    get_mosmix_elements,
+    get_mosmix_issue,
+    get_mosmix_forecasts_by_station
 )
 
 from ..schemas.climate import (
@@ -19,10 +36,79 @@ from ..schemas.climate import (
     MosmixStationResponse
 )
 
-from ..utils.dwd_kmz import retrieve_station_kmz
+from ..forecast import (
+    FORECAST_POINT_STATIONS,
+    point_cache,
+    get_station_forecast,
+    get_forecast_headers,
+    get_forecast_payload,
+    get_batch_payload,
+    get_point_cell,
+    get_point_payload
+)
+from ..utils.forecast_format import EMPTY_VALUES, FORECAST_MEDIA_TYPES, FORECAST_ENCODERS, encode_json
+
+
+route_climate = APIRouter(prefix='/climate/v1', route_class=FastJSONRoute)
+
+FORECAST_BATCH_SIZE = get_settings().forecast_batch_size
+
+mosmix_layer = register_layer('mosmix', get_mosmix_station_points, 'tiles_mosmix')
+weather_layer = register_layer('weather_station', get_weather_station_points, 'weather_stations')
+
+# mosmix element codes of data/dwd_abbreviations_schema.sql
+element_cache = register_cache('mosmix_elements', TTLCache(
+    maxsize=1,
+    ttl=get_settings().meta_cache_ttl
+))
+
+subscribe('mosmix_elements', element_cache.invalidate)
+
+
+async def get_element_codes(session: AsyncSession) -> frozenset:
+    codes = element_cache.get('codes')
+
+    if codes is None:
+        rows = await get_mosmix_elements(session)
+        codes = frozenset(row['element_code'] for row in rows)
+
+        element_cache.set('codes', codes)
+
+    return codes
+
+
+async def get_requested_elements(session: AsyncSession, elements: str | None) -> tuple | None:
+    """
+    Returns the requested MOSMIX elements in request order, the default
+    elements when none were requested and None for all elements.
+    """
+    if not elements:
+        return FORECAST_ELEMENTS
+
+    if elements == 'all':
+        return None
+
+    requested = tuple(dict.fromkeys(
+        code.strip() for code in elements.split(',') if code.strip()
+    ))
+
+    codes = await get_element_codes(session)
+    unknown = [code for code in requested if code not in codes]
+
+    if unknown or not requested:
+        raise CustomValidationError(
+            loc=['query', 'elements'],
+            msg=f'Unknown MOSMIX elements: {", ".join(unknown) or elements}',
+            error_type='value_error'
+        )
+
+    return requested
 
 
-route_climate = APIRouter(prefix='/climate/v1')
+ELEMENTS_DESCRIPTION = (
+    'Comma separated MOSMIX element codes of /mosmix/elements or "all", '
+    'defaults to PPPP, FX1, TTT, RR1c, SunD1, FF, DD, Td, ww, SunD, Neff and R101'
+)
 
 
 @route_climate.get(
@@ -36,16 +122,19 @@ route_climate = APIRouter(prefix='/climate/v1')
     },
     tags=['Deutscher Wetterdienst'],
     description=(
-        'Retrieves a list of German weather service stations reference with corresponding ids.'
+        'Retrieves a list of German weather service stations reference with corresponding ids. '
+        f'{GEOMETRY_ACCEPT_DESCRIPTION}'
     )
 )
 async def fetch_dwd_stations_by_municipality_key(
     municipality_key: str = Query(None, min_length=8, max_length=8),
+    options: GeometryOptions = Depends(get_geometry_options),
     session: AsyncSession = Depends(get_session)
 ):
     rows = await get_dwd_stations_by_municipality_key(
         session,
-        municipality_key
+        municipality_key,
+        options
     )
 
     if len(rows) == 0:
@@ -54,7 +143,7 @@ async def fetch_dwd_stations_by_municipality_key(
             detail='Could not retrieve list of German weather service stations reference'
         )
 
-    return rows
+    return geometry_response(rows, options)
 
 
 @route_climate.get(
@@ -68,11 +157,15 @@ async def fetch_dwd_stations_by_municipality_key(
     },
     tags=['Deutscher Wetterdienst'],
     description=(
-        'Retrieves a list of German weather service stations with corresponding ids.'
+        'Retrieves a list of German weather service stations with corresponding ids. '
+        f'{GEOMETRY_ACCEPT_DESCRIPTION}'
     )
 )
-async def fetch_weather_stations(session: AsyncSession = Depends(get_session)):
-    rows = await get_weather_service_stations(session)
+async def fetch_weather_stations(
+    options: GeometryOptions = Depends(get_geometry_options),
+    session: AsyncSession = Depends(get_session)
+):
+    rows = await get_weather_service_stations(session, options)
 
     if len(rows) == 0:
         raise HTTPException(
@@ -80,6 +173,44 @@ async def fetch_weather_stations(session: AsyncSession = Depends(get_session)):
             detail='Could not retrieve list of German weather service stations'
         )
 
+    return geometry_response(rows, options)
+
+
+@route_climate.get(
+    '/radius',
+    response_model=List[WeatherStationResponse],
+    responses={
+        200: {'description': 'OK'},
+        400: {'description': 'Bad Request'},
+        404: {'description': 'Not Found'},
+        422: {'description': 'Unprocessable Entity'},
+    },
+    tags=['Deutscher Wetterdienst'],
+    description=(
+        'Retrieves the German weather service stations within the specified '
+        'radius, ordered by distance.'
+    )
+)
+async def fetch_weather_stations_by_radius(
+    lat: float,
+    lng: float,
+    radius: float = Query(
+        default=25000,
+        ge=0,
+        le=100000,
+        description='Radius in meters'
+    ),
+    session: AsyncSession = Depends(get_session)
+):
+    index = await weather_layer.get_index(session)
+    rows = index.radius(lat, lng, radius)
+
+    if len(rows) == 0:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f'No matches found for coordinates ({lat}, {lng})'
+        )
+
     return rows
 
 
@@ -94,11 +225,15 @@ async def fetch_weather_stations(session: AsyncSession = Depends(get_session)):
     },
     tags=['Deutscher Wetterdienst'],
     description=(
-        'Retrieves a list of global MOSMIX stations with corresponding ids.'
+        'Retrieves a list of global MOSMIX stations with corresponding ids. '
+        f'{GEOMETRY_ACCEPT_DESCRIPTION}'
     )
 )
-async def fetch_mosmix_stations(session: AsyncSession = Depends(get_session)):
-    rows = await get_all_mosmix_stations(session)
+async def fetch_mosmix_stations(
+    options: GeometryOptions = Depends(get_geometry_options),
+    session: AsyncSession = Depends(get_session)
+):
+    rows = await get_all_mosmix_stations(session, options)
 
     if len(rows) == 0:
         raise HTTPException(
@@ -106,7 +241,7 @@ async def fetch_mosmix_stations(session: AsyncSession = Depends(get_session)):
             detail='Could not retrieve list of German weather service stations'
         )
 
-    return rows
+    return geometry_response(rows, options)
 
 
 @route_climate.get(
@@ -131,9 +266,8 @@ async def fetch_mosmix_geometries_by_bbox(
     ymax: float,
     session: AsyncSession = Depends(get_session)
 ):
-    rows = await get_mosmix_geometries_by_bbox(
-        session, xmin, ymin, xmax, ymax
-    )
+    index = await mosmix_layer.get_index(session)
+    rows = index.bbox(xmin, ymin, xmax, ymax)
 
     if len(rows) == 0:
         raise HTTPException(
@@ -183,7 +317,8 @@ async def fetch_mosmix_geometries_by_radius(
     ),
     session: AsyncSession = Depends(get_session)
 ):
-    rows = await get_mosmix_geometries_by_radius(session, lat, lng, radius)
+    index = await mosmix_layer.get_index(session)
+    rows = index.radius(lat, lng, radius)
 
     if len(rows) == 0:
         raise HTTPException(
@@ -226,20 +361,19 @@ async def fetch_mosmix_nearest_geometriey_by_position(
     lng: float,
     session: AsyncSession = Depends(get_session)
 ):
-    row = await get_mosmix_nearest_geometriey_by_position(
-        session, lat, lng
-    )
+    index = await mosmix_layer.get_index(session)
+    rows = index.nearest(lat, lng)
 
-    if not row:
+    if not rows:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f'No matches found for coordinates ({lat}, {lng})'
         )
 
     feature = Feature(
-        id=row['station_id'],
-        geometry=row['geojson'],
-        properties={'station_name': row['station_name']},
+        id=rows[0]['station_id'],
+        geometry=rows[0]['geojson'],
+        properties={'station_name': rows[0]['station_name']},
     )
 
     crs = {'type': 'name', 'properties': {
@@ -249,12 +383,35 @@ async def fetch_mosmix_nearest_geometriey_by_position(
     return geojson_data
 
 
+@route_climate.get(
+    '/mosmix/elements',
+    response_model=list,
+    tags=['Deutscher Wetterdienst'],
+    description=(
+        'Retrieves the codes, labels and units of the MOSMIX forecast elements '
+        'accepted by the elements parameter of the forecast endpoints.'
+    ),
+    responses={
+        200: {'description': 'OK'},
+    }
+)
+async def fetch_mosmix_elements(session: AsyncSession = Depends(get_session)):
+    return await get_mosmix_elements(session)
+
+
 @route_climate.get(
     '/mosmix/forecast/{station_id}',
     response_model=dict,
     tags=['Deutscher Wetterdienst'],
     description=(
-        'Retrieves a KML file for the specified station ID.'
+        'Retrieves the MOSMIX forecast of the specified station ID. Forecasts are '
+        'cached until DWD publishes the next issue, the X-Cache and Age headers '
+        'tell whether and since when the forecast was cached. An outdated forecast '
+        'is answered with X-Cache STALE while the next issue is downloaded. '
+        'format=columnar returns one time array of epoch seconds and one array '
+        'per element with null for undefined values, format=binary the same '
+        'columns as a little endian buffer of int64 and float32 values. Only the '
+        'requested elements are parsed and returned.'
     ),
     responses={
         200: {'description': 'OK'},
@@ -264,14 +421,240 @@ async def fetch_mosmix_nearest_geometriey_by_position(
     }
 )
 async def fetch_forecast_station_kmz(
-    station_id: str
+    station_id: str,
+    elements: str = Query(None, description=ELEMENTS_DESCRIPTION),
+    response_format: str = Query('json', alias='format', pattern='^(json|columnar|binary)$'),
+    session: AsyncSession = Depends(get_session)
 ):
-    data = await retrieve_station_kmz(station_id)
+    requested = await get_requested_elements(session, elements)
+    entry, cache_status = await get_station_forecast(station_id)
 
-    if not data:
+    if not entry['forecast']['time'].size:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f'No matches found for station ID {station_id}'
         )
 
-    return data
+    return Response(
+        content=await get_forecast_payload(entry, response_format, requested),
+        media_type=FORECAST_MEDIA_TYPES[response_format],
+        headers=get_forecast_headers(entry, cache_status)
+    )
+
+
+@route_climate.get(
+    '/mosmix/batch',
+    response_model=dict,
+    tags=['Deutscher Wetterdienst'],
+    description=(
+        'Retrieves the MOSMIX forecasts of several stations, given as repeated '
+        'station_id parameters or as the stations of a municipality key. Every '
+        'station gets an entry with its status, failed stations carry an error '
+        'instead of a forecast. Accepts the elements and format parameters of '
+        '/mosmix/forecast/{station_id} except the binary format.'
+    ),
+    responses={
+        200: {'description': 'OK'},
+        400: {'description': 'Bad Request'},
+        404: {'description': 'Not Found'},
+        422: {'description': 'Unprocessable Entity'},
+    }
+)
+async def fetch_mosmix_forecast_batch(
+    station_id: List[str] = Query(None, description='MOSMIX station ID, repeat for several stations'),
+    municipality_key: str = Query(None, min_length=8, max_length=8),
+    elements: str = Query(None, description=ELEMENTS_DESCRIPTION),
+    response_format: str = Query('json', alias='format', pattern='^(json|columnar)$'),
+    session: AsyncSession = Depends(get_session)
+):
+    requested = await get_requested_elements(session, elements)
+    station_ids = list(dict.fromkeys(station_id or []))
+
+    if municipality_key:
+        rows = await get_dwd_stations_by_municipality_key(session, municipality_key, GeometryOptions('none'))
+
+        # the station code of the DWD reference is the id of the MOSMIX station
+        codes = list(dict.fromkeys(row['station_code'] for row in rows))
+        station_ids.extend(
+            code for code in await get_mosmix_station_ids(session, codes)
+            if code not in station_ids
+        )
+
+        if not station_ids:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f'No MOSMIX stations found for municipality key {municipality_key}'
+            )
+
+    if not station_ids:
+        raise CustomValidationError(
+            loc=['query', 'station_id'],
+            msg='Pass at least one station_id or a municipality_key',
+            error_type='value_error'
+        )
+
+    if len(station_ids) > FORECAST_BATCH_SIZE:
+        raise CustomValidationError(
+            loc=['query', 'station_id'],
+            msg=f'At most {FORECAST_BATCH_SIZE} stations per request',
+            error_type='value_error'
+        )
+
+    content = await get_batch_payload(station_ids, requested, response_format)
+
+    return Response(content=content, media_type='application/json')
+
+
+@route_climate.get(
+    '/forecast/point',
+    response_model=dict,
+    tags=['Deutscher Wetterdienst'],
+    description=(
+        'Retrieves a MOSMIX forecast for the specified coordinates, interpolated '
+        'per element and time step from the nearest stations by inverse distance. '
+        'Coordinates are rounded to a cell whose center is interpolated. With an '
+        'elevation in meters the temperatures are corrected by the standard lapse '
+        'rate, wind directions are averaged as vectors. Supports the elements '
+        'parameter and the columnar and binary formats of /mosmix/forecast/{station_id}.'
+    ),
+    responses={
+        200: {'description': 'OK'},
+        400: {'description': 'Bad Request'},
+        404: {'description': 'Not Found'},
+        422: {'description': 'Unprocessable Entity'},
+    }
+)
+async def fetch_point_forecast(
+    lat: float = Query(..., ge=-90, le=90),
+    lng: float = Query(..., ge=-180, le=180),
+    elevation: int = Query(None, ge=-500, le=9000, description='Elevation of the position in meters'),
+    elements: str = Query(None, description=ELEMENTS_DESCRIPTION),
+    response_format: str = Query('columnar', alias='format', pattern='^(columnar|binary)$'),
+    session: AsyncSession = Depends(get_session)
+):
+    requested = await get_requested_elements(session, elements)
+    cell = get_point_cell(lat, lng)
+
+    cached = point_cache.get((cell, elevation, requested, response_format))
+    cache_status = 'HIT'
+
+    if cached is None:
+        index = await mosmix_layer.get_index(session)
+        stations = index.nearest(*cell, FORECAST_POINT_STATIONS)
+
+        if not stations:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f'No matches found for coordinates ({lat}, {lng})'
+            )
+
+        cached = await get_point_payload(cell, stations, elevation, requested, response_format)
+        cache_status = 'MISS'
+
+    content, expires_at = cached
+
+    return Response(
+        content=content,
+        media_type=FORECAST_MEDIA_TYPES[response_format],
+        headers={
+            'X-Cache': cache_status,
+            'Cache-Control': f'public, max-age={max(0, int(expires_at - time.time()))}'
+        }
+    )
+
+
+@route_climate.get(
+    '/mosmix/forecasts/{station_id}',
+    response_model=dict,
+    tags=['Deutscher Wetterdienst'],
+    description=(
+        'Retrieves the MOSMIX forecast of the specified station ID from the '
+        'bulk loaded MOSMIX_L issues, the latest one unless an issue_time is given. '
+        'Undefined forecast values are null. Supports the format parameter of '
+        '/mosmix/forecast/{station_id}.'
+    ),
+    responses={
+        200: {'description': 'OK'},
+        400: {'description': 'Bad Request'},
+        404: {'description': 'Not Found'},
+        422: {'description': 'Unprocessable Entity'},
+    }
+)
+async def fetch_mosmix_forecasts_by_station(
+    station_id: str,
+    issue_time: datetime = Query(None, description='Issue time of a loaded MOSMIX_L issue'),
+    elements: str = Query(None, description=ELEMENTS_DESCRIPTION),
+    response_format: str = Query('json', alias='format', pattern='^(json|columnar|binary)$'),
+    session: AsyncSession = Depends(get_session)
+):
+    requested = await get_requested_elements(session, elements)
+    issue = await get_mosmix_issue(session, issue_time)
+
+    if not issue:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f'No MOSMIX issue loaded for {issue_time}' if issue_time else 'No MOSMIX issue has been loaded'
+        )
+
+    station, forecasts = await get_mosmix_forecasts_by_station(
+        session, issue['issue_time'], station_id, requested
+    )
+
+    if not station or not forecasts:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f'No matches found for station ID {station_id}'
+        )
+
+    forecast = {
+        'station': {
+            'name': station['station_id'],
+            'description': station['station_name'],
+            'coordinates': [
+                float(station['longitude']),
+                float(station['latitude']),
+                station['station_elevation']
+            ]
+        },
+        'issue_time': issue['issue_time'].strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'time': np.array([int(step.timestamp()) for step in issue['time_steps']], dtype=np.int64),
+        'elements': {
+            row['element_name']: np.array(row['forecast_values'], dtype=np.float32)
+            for row in forecasts
+        }
+    }
+
+    # keep the requested order, elements that were not loaded are empty
+    if requested is not None:
+        forecast['elements'] = {
+            name: forecast['elements'].get(name, EMPTY_VALUES) for name in requested
+        }
+
+    if response_format == 'json':
+        content = encode_json(forecast, missing=None)
+    else:
+        content = FORECAST_ENCODERS[response_format](forecast)
+
+    return Response(content=content, media_type=FORECAST_MEDIA_TYPES[response_format])
+
+
+@route_climate.get(
+    '/mosmix/tiles/{z}/{x}/{y}.mvt',
+    response_class=Response,
+    responses=TILE_RESPONSES,
+    tags=['Deutscher Wetterdienst'],
+    description=(
+        'Retrieves a Mapbox vector tile of German weather service stations. '
+        'Nearby stations are thinned out below zoom level 8.'
+    )
+)
+async def fetch_mosmix_tile(
+    request: Request,
+    z: int,
+    x: int,
+    y: int,
+    session: AsyncSession = Depends(get_session)
+):
+    tile = await get_cached_tile(session, 'mosmix', z, x, y)
+
+    return tile_response(request, tile)
@@ -1,16 +1,18 @@
 from fastapi import Depends, APIRouter, HTTPException, status
-from fastapi.responses import JSONResponse
-from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
 from ..dependencies import get_session
+from ..topology import get_cached_topology, topology_response
+from ..utils.serializer import FastJSONResponse, FastJSONRoute
 
 from ..services.demographic import (
     get_demographics_meta,
     get_district_details,
     get_districts,
     get_district,
+    get_district_boundaries,
     get_household_types,
     get_residents_by_age_groups,
     get_residents_non_germans,
@@ -84,7 +86,7 @@ from ..schemas.demographic import (
     HouseholdsRiskOfHomelessnessByDistrictResponse
 )
 
-route_demographic = APIRouter(prefix='/demographic/v1')
+route_demographic = APIRouter(prefix='/demographic/v1', route_class=FastJSONRoute)
 
 
 @route_demographic.get(
@@ -102,9 +104,8 @@ async def fetch_demographics_meta(
     session: AsyncSession = Depends(get_session)
 ):
     rows = await get_demographics_meta(session)
-    result = jsonable_encoder(rows)
 
-    return JSONResponse(content=result)
+    return FastJSONResponse(content=rows)
 
 
 @route_demographic.get(
@@ -122,9 +123,8 @@ async def fetch_district_details(
     session: AsyncSession = Depends(get_session)
 ):
     rows = await get_district_details(session)
-    result = jsonable_encoder(rows)
 
-    return JSONResponse(content=result[0])
+    return FastJSONResponse(content=rows[0])
 
 
 @route_demographic.get(
@@ -152,6 +152,28 @@ async def fetch_districts(
     return rows
 
 
+@route_demographic.get(
+    '/districts/topojson',
+    response_class=Response,
+    responses={
+        200: {'description': 'OK', 'content': {'application/json': {}}},
+        404: {'description': 'Not Found'},
+    },
+    tags=['Sozialatlas'],
+    description='Retrieves the boundaries of the Flensburg districts as TopoJSON, shared borders are sent once.'
+)
+async def fetch_district_topology():
+    content = await get_cached_topology('districts', 'flensburg', get_district_boundaries)
+
+    if content is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail='Could not retrieve boundaries of Flensburg districts'
+        )
+
+    return topology_response(content)
+
+
 @route_demographic.get(
     '/{district_id}',
     response_model=List[DistrictResponse],
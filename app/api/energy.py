@@ -1,10 +1,21 @@
-from fastapi import HTTPException, Depends, APIRouter, Query, status
-from fastapi.responses import JSONResponse
-from fastapi.encoders import jsonable_encoder
+from fastapi import HTTPException, Depends, APIRouter, Path, Query, Request, status
+from fastapi.responses import Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
+from ..database import get_settings
 from ..dependencies import get_session
+from ..utils.serializer import dumps, FastJSONResponse, FastJSONRoute
+from ..invalidation import subscribe
+from ..warmup import register_warmup
+from ..utils.cache import TTLCache, register_cache
+from ..utils.cursor import encode_cursor, decode_cursor
+from ..utils.export import get_export_format, create_export_response
+from ..tilestore import get_cached_tile
+from ..utils.nearest import NEAREST_CANDIDATES, NEAREST_MAX_RESULTS, NEAREST_RESPONSES, create_nearest_collection
+from ..utils.geometry import GEOMETRY_ACCEPT_DESCRIPTION, GeometryOptions, get_geometry_options, geometry_response
+from ..utils.tile import TILE_RESPONSES, tile_response
+from ..services.nearest import get_nearest_rows
 from ..services.energy import (
     get_energy_state_meta,
     get_energy_country_meta,
@@ -32,10 +43,143 @@ from ..services.energy import (
     get_wind_unit_by_id,
     get_wind_unit_by_municipality_key,
     get_solar_unit_by_id,
-    get_solar_unit_by_municipality_key
+    get_solar_unit_by_municipality_key,
+    get_unit_estimate_by_municipality_key,
+    stream_units_by_municipality_key
 )
 
-route_energy = APIRouter(prefix='/energy/v1')
+route_energy = APIRouter(prefix='/energy/v1', route_class=FastJSONRoute)
+
+UNIT_PAGE_LIMIT = 1000
+UNIT_PAGE_MAX_LIMIT = 10000
+
+UNIT_PAGE_ENCODING_DETAIL = 'Pages of units are only sent as JSON'
+
+UNIT_PAGE_ENCODING_DESCRIPTION = (
+    'Pages are only sent as JSON, Accept: application/wkb or application/twkb '
+    'is answered with 406 because a geometry collection can not carry the '
+    'cursor and the unit registration numbers.'
+)
+
+EXPORT_CHUNK_SIZE = get_settings().export_chunk_size
+
+META_QUERIES = [
+    get_energy_state_meta,
+    get_energy_country_meta,
+    get_network_operator_audit_meta,
+    get_energy_location_meta,
+    get_energy_supply_meta,
+    get_energy_source_meta,
+    get_turbine_manufacturer_meta,
+    get_power_limitation_meta,
+    get_power_technology_meta,
+    get_main_orientation_meta,
+    get_orientation_tilt_angle_meta,
+    get_usage_area_meta,
+    get_operational_status_meta,
+    get_biomass_type_meta,
+    get_primary_fuel_meta
+]
+
+# serialized meta lists, cleared when tools/insert_energy_meta.py reloads
+meta_cache = register_cache('energy_meta', TTLCache(
+    maxsize=get_settings().meta_cache_size,
+    ttl=get_settings().meta_cache_ttl
+))
+
+subscribe('energy_meta', meta_cache.invalidate)
+
+
+async def get_cached_meta(session: AsyncSession, query) -> bytes:
+    content = meta_cache.get(query.__name__)
+
+    if content is None:
+        rows = await query(session)
+        content = dumps(rows)
+
+        meta_cache.set(query.__name__, content)
+
+    return content
+
+
+async def cached_meta_response(session: AsyncSession, query) -> Response:
+    content = await get_cached_meta(session, query)
+
+    return Response(content=content, media_type='application/json')
+
+
+async def get_unit_page(
+    session: AsyncSession,
+    unit_type: str,
+    query,
+    municipality_key: str,
+    limit: int,
+    after: str = None,
+    options: GeometryOptions = GeometryOptions()
+):
+    # a geometry collection has no room for the cursor and the unit ids
+    if options.binary:
+        raise HTTPException(
+            status_code=status.HTTP_406_NOT_ACCEPTABLE,
+            detail=UNIT_PAGE_ENCODING_DETAIL
+        )
+
+    # one extra row tells whether another page follows
+    rows = await query(
+        session,
+        municipality_key,
+        limit + 1,
+        decode_cursor(after) if after else None,
+        options
+    )
+
+    if len(rows) == 0:
+        return None
+
+    next_cursor = None
+
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]['unit_registration_number'])
+
+    total_estimate = await get_unit_estimate_by_municipality_key(
+        session, unit_type, municipality_key)
+
+    return {
+        'items': rows,
+        'next_cursor': next_cursor,
+        'total_estimate': total_estimate
+    }
+
+
+def unit_page_response(page: dict | None) -> Response | None:
+    if page is None:
+        return None
+
+    return FastJSONResponse(content=page)
+
+
+async def export_units(
+    export_format: str,
+    unit_type: str,
+    municipality_key: str,
+    options: GeometryOptions = GeometryOptions()
+):
+    # ndjson and csv carry the geometry as geojson object
+    options = GeometryOptions(options.mode, options.precision)
+
+    return await create_export_response(
+        export_format,
+        lambda session: stream_units_by_municipality_key(
+            session, unit_type, municipality_key, EXPORT_CHUNK_SIZE, options),
+        f'{unit_type}_units_{municipality_key}'
+    )
+
+
+@register_warmup
+async def warm_energy_meta(session: AsyncSession):
+    for query in META_QUERIES:
+        await get_cached_meta(session, query)
 
 
 @route_energy.get(
@@ -53,16 +197,7 @@ route_energy = APIRouter(prefix='/energy/v1')
 async def fetch_energy_state_meta(
     session: AsyncSession = Depends(get_session)
 ):
-    rows = await get_energy_state_meta(session)
-    response = jsonable_encoder(rows)
-
-    try:
-        return JSONResponse(content=response)
-    except IndexError:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail='Could not retrieve list of German state codes'
-        )
+    return await cached_meta_response(session, get_energy_state_meta)
 
 
 @route_energy.get(
@@ -81,15 +216,7 @@ async def fetch_energy_state_meta(
 async def fetch_energy_country_meta(
     session: AsyncSession = Depends(get_session)
 ):
-    rows = await get_energy_country_meta(session)
-    response = jsonable_encoder(rows)
-
-    try:
-        return JSONResponse(content=response)
-    except IndexError:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail='Could not retrieve list of country codes')
+    return await cached_meta_response(session, get_energy_country_meta)
 
 
 @route_energy.get(
@@ -108,16 +235,7 @@ async def fetch_energy_country_meta(
 async def fetch_network_operator_audit_meta(
     session: AsyncSession = Depends(get_session)
 ):
-    rows = await get_network_operator_audit_meta(session)
-    response = jsonable_encoder(rows)
-
-    try:
-        return JSONResponse(content=response)
-    except IndexError:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail='Could not retrieves list of network operator audit codes'
-        )
+    return await cached_meta_response(session, get_network_operator_audit_meta)
 
 
 @route_energy.get(
@@ -135,16 +253,7 @@ async def fetch_network_operator_audit_meta(
 async def fetch_energy_location_meta(
     session: AsyncSession = Depends(get_session)
 ):
-    rows = await get_energy_location_meta(session)
-    response = jsonable_encoder(rows)
-
-    try:
-        return JSONResponse(content=response)
-    except IndexError:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail='Could not retrieve list of energy location codes'
-        )
+    return await cached_meta_response(session, get_energy_location_meta)
 
 
 @route_energy.get(
@@ -162,16 +271,7 @@ async def fetch_energy_location_meta(
 async def fetch_energy_supply_meta(
     session: AsyncSession = Depends(get_session)
 ):
-    rows = await get_energy_supply_meta(session)
-    response = jsonable_encoder(rows)
-
-    try:
-        return JSONResponse(content=response)
-    except IndexError:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail='Could not retrieves a list of energy supply types'
-        )
+    return await cached_meta_response(session, get_energy_supply_meta)
 
 
 @route_energy.get(
@@ -189,16 +289,7 @@ async def fetch_energy_supply_meta(
 async def fetch_energy_source_meta(
     session: AsyncSession = Depends(get_session)
 ):
-    rows = await get_energy_source_meta(session)
-    response = jsonable_encoder(rows)
-
-    try:
-        return JSONResponse(content=response)
-    except IndexError:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail='Could not retrieves list of energy source types'
-        )
+    return await cached_meta_response(session, get_energy_source_meta)
 
 
 @route_energy.get(
@@ -216,16 +307,7 @@ async def fetch_energy_source_meta(
 async def fetch_turbine_manufacturer_meta(
     session: AsyncSession = Depends(get_session)
 ):
-    rows = await get_turbine_manufacturer_meta(session)
-    response = jsonable_encoder(rows)
-
-    try:
-        return JSONResponse(content=response)
-    except IndexError:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail='Turbine manufacturer not found'
-        )
+    return await cached_meta_response(session, get_turbine_manufacturer_meta)
 
 
 @route_energy.get(
@@ -243,16 +325,7 @@ async def fetch_turbine_manufacturer_meta(
 async def fetch_power_limitation_meta(
     session: AsyncSession = Depends(get_session)
 ):
-    rows = await get_power_limitation_meta(session)
-    response = jsonable_encoder(rows)
-
-    try:
-        return JSONResponse(content=response)
-    except IndexError:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail='Power limitation not found'
-        )
+    return await cached_meta_response(session, get_power_limitation_meta)
 
 
 @route_energy.get(
@@ -270,16 +343,7 @@ async def fetch_power_limitation_meta(
 async def fetch_power_technology_meta(
     session: AsyncSession = Depends(get_session)
 ):
-    rows = await get_power_technology_meta(session)
-    response = jsonable_encoder(rows)
-
-    try:
-        return JSONResponse(content=response)
-    except IndexError:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail='Power technology not found'
-        )
+    return await cached_meta_response(session, get_power_technology_meta)
 
 
 @route_energy.get(
@@ -297,16 +361,7 @@ async def fetch_power_technology_meta(
 async def fetch_main_orientation_meta(
     session: AsyncSession = Depends(get_session)
 ):
-    rows = await get_main_orientation_meta(session)
-    response = jsonable_encoder(rows)
-
-    try:
-        return JSONResponse(content=response)
-    except IndexError:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail='Main orientation not found'
-        )
+    return await cached_meta_response(session, get_main_orientation_meta)
 
 
 @route_energy.get(
@@ -324,16 +379,7 @@ async def fetch_main_orientation_meta(
 async def fetch_orientation_tilt_angle_meta(
     session: AsyncSession = Depends(get_session)
 ):
-    rows = await get_orientation_tilt_angle_meta(session)
-    response = jsonable_encoder(rows)
-
-    try:
-        return JSONResponse(content=response)
-    except IndexError:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail='Orientation tilt angle not found'
-        )
+    return await cached_meta_response(session, get_orientation_tilt_angle_meta)
 
 
 @route_energy.get(
@@ -351,16 +397,7 @@ async def fetch_orientation_tilt_angle_meta(
 async def fetch_usage_area_meta(
     session: AsyncSession = Depends(get_session)
 ):
-    rows = await get_usage_area_meta(session)
-    response = jsonable_encoder(rows)
-
-    try:
-        return JSONResponse(content=response)
-    except IndexError:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail='Usage area not found'
-        )
+    return await cached_meta_response(session, get_usage_area_meta)
 
 
 @route_energy.get(
@@ -378,16 +415,7 @@ async def fetch_usage_area_meta(
 async def fetch_operational_status_meta(
     session: AsyncSession = Depends(get_session)
 ):
-    rows = await get_operational_status_meta(session)
-    response = jsonable_encoder(rows)
-
-    try:
-        return JSONResponse(content=response)
-    except IndexError:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail='Operational status not found'
-        )
+    return await cached_meta_response(session, get_operational_status_meta)
 
 
 @route_energy.get(
@@ -405,16 +433,7 @@ async def fetch_operational_status_meta(
 async def fetch_biomass_type_meta(
     session: AsyncSession = Depends(get_session)
 ):
-    rows = await get_biomass_type_meta(session)
-    response = jsonable_encoder(rows)
-
-    try:
-        return JSONResponse(content=response)
-    except IndexError:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail='Biomass type not found'
-        )
+    return await cached_meta_response(session, get_biomass_type_meta)
 
 
 @route_energy.get(
@@ -432,16 +451,7 @@ async def fetch_biomass_type_meta(
 async def fetch_primary_fuel_meta(
     session: AsyncSession = Depends(get_session)
 ):
-    rows = await get_primary_fuel_meta(session)
-    response = jsonable_encoder(rows)
-
-    try:
-        return JSONResponse(content=response)
-    except IndexError:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail='Primary fuel not found'
-        )
+    return await cached_meta_response(session, get_primary_fuel_meta)
 
 
 @route_energy.get(
@@ -455,17 +465,18 @@ async def fetch_primary_fuel_meta(
     },
     tags=['Marktstammdatenregister Combustion'],
     description=(
-        'Retrieves details about a specific combustion unit based on the provided 15 digit unit registration number.')
+        'Retrieves details about a specific combustion unit based on the provided 15 digit unit registration number. '
+        f'{GEOMETRY_ACCEPT_DESCRIPTION}')
 )
 async def fetch_combustion_unit_by_id(
     unit_id: str = Query(None, min_length=15, max_length=15),
+    options: GeometryOptions = Depends(get_geometry_options),
     session: AsyncSession = Depends(get_session)
 ):
-    rows = await get_combustion_unit_by_id(session, unit_id)
-    response = jsonable_encoder(rows)
+    rows = await get_combustion_unit_by_id(session, unit_id, options)
 
     try:
-        return JSONResponse(content=response[0])
+        return geometry_response(rows[0], options)
     except IndexError:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -475,34 +486,53 @@ async def fetch_combustion_unit_by_id(
 
 @route_energy.get(
     '/unit/combustion/key',
-    response_model=List,
+    response_model=dict,
     responses={
         200: {'description': 'OK'},
         400: {'description': 'Bad Request'},
         404: {'description': 'Not Found'},
+        406: {'description': 'Not Acceptable'},
         422: {'description': 'Unprocessable Entity'},
     },
     tags=['Marktstammdatenregister Combustion'],
     description=(
-        'Retrieves a list of combustion units with each detail based on the provided German municipality key (AGS).')
+        'Retrieves a list of combustion units with each detail based on the provided German municipality key (AGS). '
+        'Results are paginated by unit registration number, pass the '
+        'returned next_cursor as after to retrieve the next page. '
+        'Send Accept: application/x-ndjson or text/csv to stream all units instead. '
+        f'{UNIT_PAGE_ENCODING_DESCRIPTION}')
 )
 async def fetch_combustion_unit_by_municipality_key(
+    request: Request,
     municipality_key: str = Query(None, min_length=8, max_length=8),
+    limit: int = Query(UNIT_PAGE_LIMIT, ge=1, le=UNIT_PAGE_MAX_LIMIT),
+    after: str = Query(None, min_length=1, max_length=64),
+    options: GeometryOptions = Depends(get_geometry_options),
     session: AsyncSession = Depends(get_session)
 ):
-    rows = await get_combustion_unit_by_municipality_key(
-        session,
-        municipality_key
-    )
-    response = jsonable_encoder(rows)
+    export_format = get_export_format(request)
+
+    if export_format is not None:
+        response = await export_units(export_format, 'combustion', municipality_key, options)
+    else:
+        page = await get_unit_page(
+            session,
+            'combustion',
+            get_combustion_unit_by_municipality_key,
+            municipality_key,
+            limit,
+            after,
+            options
+        )
+        response = unit_page_response(page)
 
-    if len(response) == 0:
+    if response is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f'No combustion units for municipality key {municipality_key} found'
         )
 
-    return JSONResponse(content=response)
+    return response
 
 
 @route_energy.get(
@@ -516,17 +546,18 @@ async def fetch_combustion_unit_by_municipality_key(
     },
     tags=['Marktstammdatenregister Nuclear'],
     description=(
-        'Retrieves details about a specific nuclear unit based on the provided 15 digit unit registration number.')
+        'Retrieves details about a specific nuclear unit based on the provided 15 digit unit registration number. '
+        f'{GEOMETRY_ACCEPT_DESCRIPTION}')
 )
 async def fetch_nuclear_unit_by_id(
     unit_id: str = Query(None, min_length=15, max_length=15),
+    options: GeometryOptions = Depends(get_geometry_options),
     session: AsyncSession = Depends(get_session)
 ):
-    rows = await get_nuclear_unit_by_id(session, unit_id)
-    response = jsonable_encoder(rows)
+    rows = await get_nuclear_unit_by_id(session, unit_id, options)
 
     try:
-        return JSONResponse(content=response[0])
+        return geometry_response(rows[0], options)
     except IndexError:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -536,31 +567,53 @@ async def fetch_nuclear_unit_by_id(
 
 @route_energy.get(
     '/unit/nuclear/key',
-    response_model=List,
+    response_model=dict,
     responses={
         200: {'description': 'OK'},
         400: {'description': 'Bad Request'},
         404: {'description': 'Not Found'},
+        406: {'description': 'Not Acceptable'},
         422: {'description': 'Unprocessable Entity'},
     },
     tags=['Marktstammdatenregister Nuclear'],
     description=(
-        'Retrieves a list of nuclear units with each detail based on the provided German municipality key (AGS).')
+        'Retrieves a list of nuclear units with each detail based on the provided German municipality key (AGS). '
+        'Results are paginated by unit registration number, pass the '
+        'returned next_cursor as after to retrieve the next page. '
+        'Send Accept: application/x-ndjson or text/csv to stream all units instead. '
+        f'{UNIT_PAGE_ENCODING_DESCRIPTION}')
 )
 async def fetch_nuclear_unit_by_municipality_key(
+    request: Request,
     municipality_key: str = Query(None, min_length=8, max_length=8),
+    limit: int = Query(UNIT_PAGE_LIMIT, ge=1, le=UNIT_PAGE_MAX_LIMIT),
+    after: str = Query(None, min_length=1, max_length=64),
+    options: GeometryOptions = Depends(get_geometry_options),
     session: AsyncSession = Depends(get_session)
 ):
-    rows = await get_nuclear_unit_by_municipality_key(session, municipality_key)
-    response = jsonable_encoder(rows)
+    export_format = get_export_format(request)
+
+    if export_format is not None:
+        response = await export_units(export_format, 'nuclear', municipality_key, options)
+    else:
+        page = await get_unit_page(
+            session,
+            'nuclear',
+            get_nuclear_unit_by_municipality_key,
+            municipality_key,
+            limit,
+            after,
+            options
+        )
+        response = unit_page_response(page)
 
-    if len(response) == 0:
+    if response is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f'No nuclear units for municipality key {municipality_key} found'
         )
 
-    return JSONResponse(content=response)
+    return response
 
 
 @route_energy.get(
@@ -574,17 +627,18 @@ async def fetch_nuclear_unit_by_municipality_key(
     },
     tags=['Marktstammdatenregister Water'],
     description=(
-        'Retrieves details about a specific water unit based on the provided 15 digit unit registration number.')
+        'Retrieves details about a specific water unit based on the provided 15 digit unit registration number. '
+        f'{GEOMETRY_ACCEPT_DESCRIPTION}')
 )
 async def fetch_water_unit_by_id(
     unit_id: str = Query(None, min_length=15, max_length=15),
+    options: GeometryOptions = Depends(get_geometry_options),
     session: AsyncSession = Depends(get_session)
 ):
-    rows = await get_water_unit_by_id(session, unit_id)
-    response = jsonable_encoder(rows)
+    rows = await get_water_unit_by_id(session, unit_id, options)
 
     try:
-        return JSONResponse(content=response[0])
+        return geometry_response(rows[0], options)
     except IndexError:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -594,31 +648,53 @@ async def fetch_water_unit_by_id(
 
 @route_energy.get(
     '/unit/water/key',
-    response_model=List,
+    response_model=dict,
     responses={
         200: {'description': 'OK'},
         400: {'description': 'Bad Request'},
         404: {'description': 'Not Found'},
+        406: {'description': 'Not Acceptable'},
         422: {'description': 'Unprocessable Entity'},
     },
     tags=['Marktstammdatenregister Water'],
     description=(
-        'Retrieves a list of water units with each detail based on the provided German municipality key (AGS).')
+        'Retrieves a list of water units with each detail based on the provided German municipality key (AGS). '
+        'Results are paginated by unit registration number, pass the '
+        'returned next_cursor as after to retrieve the next page. '
+        'Send Accept: application/x-ndjson or text/csv to stream all units instead. '
+        f'{UNIT_PAGE_ENCODING_DESCRIPTION}')
 )
 async def fetch_water_unit_by_municipality_key(
+    request: Request,
     municipality_key: str = Query(None, min_length=8, max_length=8),
+    limit: int = Query(UNIT_PAGE_LIMIT, ge=1, le=UNIT_PAGE_MAX_LIMIT),
+    after: str = Query(None, min_length=1, max_length=64),
+    options: GeometryOptions = Depends(get_geometry_options),
     session: AsyncSession = Depends(get_session)
 ):
-    rows = await get_water_unit_by_municipality_key(session, municipality_key)
-    response = jsonable_encoder(rows)
+    export_format = get_export_format(request)
+
+    if export_format is not None:
+        response = await export_units(export_format, 'water', municipality_key, options)
+    else:
+        page = await get_unit_page(
+            session,
+            'water',
+            get_water_unit_by_municipality_key,
+            municipality_key,
+            limit,
+            after,
+            options
+        )
+        response = unit_page_response(page)
 
-    if len(response) == 0:
+    if response is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f'No water units for municipality key {municipality_key} found'
         )
 
-    return JSONResponse(content=response)
+    return response
 
 
 @route_energy.get(
@@ -632,17 +708,18 @@ async def fetch_water_unit_by_municipality_key(
     },
     tags=['Marktstammdatenregister Biomass'],
     description=(
-        'Retrieves details about a specific biomass unit based on the provided 15 digit unit registration number.')
+        'Retrieves details about a specific biomass unit based on the provided 15 digit unit registration number. '
+        f'{GEOMETRY_ACCEPT_DESCRIPTION}')
 )
 async def fetch_biomass_unit_by_id(
     unit_id: str = Query(None, min_length=15, max_length=15),
+    options: GeometryOptions = Depends(get_geometry_options),
     session: AsyncSession = Depends(get_session)
 ):
-    rows = await get_biomass_unit_by_id(session, unit_id)
-    response = jsonable_encoder(rows)
+    rows = await get_biomass_unit_by_id(session, unit_id, options)
 
     try:
-        return JSONResponse(content=response[0])
+        return geometry_response(rows[0], options)
     except IndexError:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -652,31 +729,53 @@ async def fetch_biomass_unit_by_id(
 
 @route_energy.get(
     '/unit/biomass/key',
-    response_model=List,
+    response_model=dict,
     responses={
         200: {'description': 'OK'},
         400: {'description': 'Bad Request'},
         404: {'description': 'Not Found'},
+        406: {'description': 'Not Acceptable'},
         422: {'description': 'Unprocessable Entity'},
     },
     tags=['Marktstammdatenregister Biomass'],
     description=(
-        'Retrieves a list of biomass units with each details based on the provided german municipality key (AGS).')
+        'Retrieves a list of biomass units with each details based on the provided german municipality key (AGS). '
+        'Results are paginated by unit registration number, pass the '
+        'returned next_cursor as after to retrieve the next page. '
+        'Send Accept: application/x-ndjson or text/csv to stream all units instead. '
+        f'{UNIT_PAGE_ENCODING_DESCRIPTION}')
 )
 async def fetch_biomass_by_municipality_key(
+    request: Request,
     municipality_key: str = Query(None, min_length=8, max_length=8),
+    limit: int = Query(UNIT_PAGE_LIMIT, ge=1, le=UNIT_PAGE_MAX_LIMIT),
+    after: str = Query(None, min_length=1, max_length=64),
+    options: GeometryOptions = Depends(get_geometry_options),
     session: AsyncSession = Depends(get_session)
 ):
-    rows = await get_biomass_unit_by_municipality_key(session, municipality_key)
-    response = jsonable_encoder(rows)
+    export_format = get_export_format(request)
+
+    if export_format is not None:
+        response = await export_units(export_format, 'biomass', municipality_key, options)
+    else:
+        page = await get_unit_page(
+            session,
+            'biomass',
+            get_biomass_unit_by_municipality_key,
+            municipality_key,
+            limit,
+            after,
+            options
+        )
+        response = unit_page_response(page)
 
-    if len(response) == 0:
+    if response is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f'No biomass units for municipality key {municipality_key} found'
         )
 
-    return JSONResponse(content=response)
+    return response
 
 
 @route_energy.get(
@@ -690,17 +789,18 @@ async def fetch_biomass_by_municipality_key(
     },
     tags=['Marktstammdatenregister Wind'],
     description=(
-        'Retrieves details about a specific wind turbine unit based on the provided 15 digit unit registration number.')
+        'Retrieves details about a specific wind turbine unit based on the provided 15 digit unit registration number. '
+        f'{GEOMETRY_ACCEPT_DESCRIPTION}')
 )
 async def fetch_wind_unit_by_id(
     unit_id: str = Query(None, min_length=15, max_length=15),
+    options: GeometryOptions = Depends(get_geometry_options),
     session: AsyncSession = Depends(get_session)
 ):
-    rows = await get_wind_unit_by_id(session, unit_id)
-    response = jsonable_encoder(rows)
+    rows = await get_wind_unit_by_id(session, unit_id, options)
 
     try:
-        return JSONResponse(content=response[0])
+        return geometry_response(rows[0], options)
     except IndexError:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -710,31 +810,53 @@ async def fetch_wind_unit_by_id(
 
 @route_energy.get(
     '/unit/wind/key',
-    response_model=List,
+    response_model=dict,
     responses={
         200: {'description': 'OK'},
         400: {'description': 'Bad Request'},
         404: {'description': 'Not Found'},
+        406: {'description': 'Not Acceptable'},
         422: {'description': 'Unprocessable Entity'},
     },
     tags=['Marktstammdatenregister Wind'],
     description=(
-        'Retrieves a list of wind turbine units with each details based on the provided german municipality key (AGS).')
+        'Retrieves a list of wind turbine units with each details based on the provided german municipality key (AGS). '
+        'Results are paginated by unit registration number, pass the '
+        'returned next_cursor as after to retrieve the next page. '
+        'Send Accept: application/x-ndjson or text/csv to stream all units instead. '
+        f'{UNIT_PAGE_ENCODING_DESCRIPTION}')
 )
 async def fetch_wind_unit_by_municipality_key(
+    request: Request,
     municipality_key: str = Query(None, min_length=8, max_length=8),
+    limit: int = Query(UNIT_PAGE_LIMIT, ge=1, le=UNIT_PAGE_MAX_LIMIT),
+    after: str = Query(None, min_length=1, max_length=64),
+    options: GeometryOptions = Depends(get_geometry_options),
     session: AsyncSession = Depends(get_session)
 ):
-    rows = await get_wind_unit_by_municipality_key(session, municipality_key)
-    response = jsonable_encoder(rows)
+    export_format = get_export_format(request)
+
+    if export_format is not None:
+        response = await export_units(export_format, 'wind', municipality_key, options)
+    else:
+        page = await get_unit_page(
+            session,
+            'wind',
+            get_wind_unit_by_municipality_key,
+            municipality_key,
+            limit,
+            after,
+            options
+        )
+        response = unit_page_response(page)
 
-    if len(response) == 0:
+    if response is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f'No wind turbine units for municipality key {municipality_key} found'
         )
 
-    return JSONResponse(content=response)
+    return response
 
 
 @route_energy.get(
@@ -748,17 +870,18 @@ async def fetch_wind_unit_by_municipality_key(
     },
     tags=['Marktstammdatenregister Solar'],
     description=(
-        'Retrieves the solar unit details based on the provided 15 digit unit registration number.')
+        'Retrieves the solar unit details based on the provided 15 digit unit registration number. '
+        f'{GEOMETRY_ACCEPT_DESCRIPTION}')
 )
 async def fetch_solar_unit_by_id(
     unit_id: str = Query(None, min_length=15, max_length=15),
+    options: GeometryOptions = Depends(get_geometry_options),
     session: AsyncSession = Depends(get_session)
 ):
-    rows = await get_solar_unit_by_id(session, unit_id)
-    response = jsonable_encoder(rows)
+    rows = await get_solar_unit_by_id(session, unit_id, options)
 
     try:
-        return JSONResponse(content=response[0])
+        return geometry_response(rows[0], options)
     except IndexError:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -768,28 +891,142 @@ async def fetch_solar_unit_by_id(
 
 @route_energy.get(
     '/unit/solar/key',
-    response_model=List,
+    response_model=dict,
     responses={
         200: {'description': 'OK'},
         400: {'description': 'Bad Request'},
         404: {'description': 'Not Found'},
+        406: {'description': 'Not Acceptable'},
         422: {'description': 'Unprocessable Entity'},
     },
     tags=['Marktstammdatenregister Solar'],
     description=(
-        'Retrieves a list of solar units with each details based on the provided german municipality key (AGS).')
+        'Retrieves a list of solar units with each details based on the provided german municipality key (AGS). '
+        'Results are paginated by unit registration number, pass the '
+        'returned next_cursor as after to retrieve the next page. '
+        'Send Accept: application/x-ndjson or text/csv to stream all units instead. '
+        f'{UNIT_PAGE_ENCODING_DESCRIPTION}')
 )
 async def fetch_solar_unit_by_municipality_key(
+    request: Request,
     municipality_key: str = Query(None, min_length=8, max_length=8),
+    limit: int = Query(UNIT_PAGE_LIMIT, ge=1, le=UNIT_PAGE_MAX_LIMIT),
+    after: str = Query(None, min_length=1, max_length=64),
+    options: GeometryOptions = Depends(get_geometry_options),
     session: AsyncSession = Depends(get_session)
 ):
-    rows = await get_solar_unit_by_municipality_key(session, municipality_key)
-    response = jsonable_encoder(rows)
+    export_format = get_export_format(request)
+
+    if export_format is not None:
+        response = await export_units(export_format, 'solar', municipality_key, options)
+    else:
+        page = await get_unit_page(
+            session,
+            'solar',
+            get_solar_unit_by_municipality_key,
+            municipality_key,
+            limit,
+            after,
+            options
+        )
+        response = unit_page_response(page)
 
-    if len(response) == 0:
+    if response is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f'No solar units for municipality key {municipality_key} found'
         )
 
-    return JSONResponse(content=response)
+    return response
+
+
+@route_energy.get(
+    '/unit/{unit_type}/nearest',
+    response_model=dict,
+    responses=NEAREST_RESPONSES,
+    tags=['Marktstammdatenregister Nearest'],
+    description=(
+        'Retrieves the k nearest energy units of a type to the specified coordinates '
+        'ordered by distance, optionally within max_distance meters. '
+        f'{GEOMETRY_ACCEPT_DESCRIPTION}')
+)
+async def fetch_nearest_units(
+    unit_type: str = Path(pattern='^(combustion|nuclear|water|biomass|wind|solar)$'),
+    lat: float = Query(..., ge=-90, le=90),
+    lng: float = Query(..., ge=-180, le=180),
+    k: int = Query(1, ge=1, le=NEAREST_MAX_RESULTS, description='Number of units'),
+    max_distance: float = Query(None, gt=0, description='Maximum distance in meters'),
+    options: GeometryOptions = Depends(get_geometry_options),
+    session: AsyncSession = Depends(get_session)
+):
+    rows = await get_nearest_rows(
+        session, f'{unit_type}_unit', lat, lng, k, NEAREST_CANDIDATES, max_distance, options)
+
+    if not rows:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f'No matches found for coordinates ({lat}, {lng})'
+        )
+
+    if options.binary:
+        return geometry_response(rows, options, id_key='unit_registration_number')
+
+    return create_nearest_collection(rows, 'unit_registration_number')
+
+
+@route_energy.get(
+    '/unit/{unit_type}/export',
+    responses={
+        200: {
+            'description': 'OK',
+            'content': {'application/x-ndjson': {}, 'text/csv': {}}
+        },
+        400: {'description': 'Bad Request'},
+        404: {'description': 'Not Found'},
+        422: {'description': 'Unprocessable Entity'},
+    },
+    tags=['Marktstammdatenregister Export'],
+    description=(
+        'Streams all units of a type whose German municipality key (AGS) starts with the provided key, '
+        'e.g. 01 for a whole state or 01001 for a district. '
+        'Send Accept: text/csv for csv, newline delimited json is returned otherwise.')
+)
+async def fetch_unit_export_by_municipality_key(
+    request: Request,
+    unit_type: str = Path(pattern='^(combustion|nuclear|water|biomass|wind|solar)$'),
+    municipality_key: str = Query(min_length=2, max_length=8, pattern=r'^\d+$'),
+    options: GeometryOptions = Depends(get_geometry_options)
+):
+    export_format = get_export_format(request) or 'ndjson'
+    response = await export_units(export_format, unit_type, municipality_key, options)
+
+    if response is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f'No {unit_type} units for municipality key {municipality_key} found'
+        )
+
+    return response
+
+
+@route_energy.get(
+    '/unit/{unit_type}/tiles/{z}/{x}/{y}.mvt',
+    response_class=Response,
+    responses=TILE_RESPONSES,
+    tags=['Marktstammdatenregister Tiles'],
+    description=(
+        'Retrieves a Mapbox vector tile of energy units of a type. Nearby units are thinned out '
+        'at lower zoom levels, keeping the unit with the highest gross capacity.'
+    )
+)
+async def fetch_unit_tile(
+    request: Request,
+    z: int,
+    x: int,
+    y: int,
+    unit_type: str = Path(pattern='^(combustion|nuclear|water|biomass|wind|solar)$'),
+    session: AsyncSession = Depends(get_session)
+):
+    tile = await get_cached_tile(session, f'{unit_type}_unit', z, x, y)
+
+    return tile_response(request, tile)
@@ -1,13 +1,15 @@
-import json
-
-from fastapi import Depends, APIRouter, HTTPException, status
-from fastapi.responses import JSONResponse
-from fastapi.encoders import jsonable_encoder
-from geojson import Feature, FeatureCollection
+from fastapi import Depends, APIRouter, HTTPException, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
 from ..dependencies import get_session
+from ..utils.serializer import FastJSONRoute
+from ..tilestore import get_cached_tile
+from ..utils.geojson import geojson_response
+from ..utils.geometry import GEOMETRY_ACCEPT_DESCRIPTION, GeometryOptions, get_geometry_options, geometry_response
+from ..utils.nearest import NEAREST_CANDIDATES, NEAREST_MAX_RESULTS, NEAREST_RESPONSES, create_nearest_collection
+from ..utils.tile import TILE_RESPONSES, tile_response
+from ..services.nearest import get_nearest_rows
 from ..services.monument import (
     get_monument_by_id,
     get_monument_by_slug,
@@ -17,18 +19,22 @@ from ..services.monument import (
 )
 
 
-route_monument = APIRouter(prefix='/monument/v1')
+route_monument = APIRouter(prefix='/monument/v1', route_class=FastJSONRoute)
 
 
 @route_monument.get(
     '/details',
     response_model=List,
-    tags=['Denkmalliste']
+    tags=['Denkmalliste'],
+    description=(
+        'Retrieves monument details based on exactly one of monument_id, '
+        f'slug or object_number. {GEOMETRY_ACCEPT_DESCRIPTION}')
 )
 async def fetch_monument_by_filter(
     monument_id: int = None,
     slug: str = None,
     object_number: str = None,
+    options: GeometryOptions = Depends(get_geometry_options),
     session: AsyncSession = Depends(get_session)
 ):
     filters = [monument_id, slug, object_number]
@@ -39,24 +45,22 @@ async def fetch_monument_by_filter(
         )
 
     if monument_id:
-        rows = await get_monument_by_id(session, monument_id)
+        rows = await get_monument_by_id(session, monument_id, options)
         identifier = f'monument id {monument_id}'
     elif slug:
-        rows = await get_monument_by_slug(session, slug)
+        rows = await get_monument_by_slug(session, slug, options)
         identifier = f'monument slug {slug}'
     else:
-        rows = await get_monument_by_object_number(session, object_number)
+        rows = await get_monument_by_object_number(session, object_number, options)
         identifier = f'monument object_number {object_number}'
 
-    response = jsonable_encoder(rows)
-
-    if not response:
+    if not rows:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f'No matches found for {identifier}'
         )
 
-    return JSONResponse(content=response)
+    return geometry_response(rows, options)
 
 
 @route_monument.get(
@@ -71,21 +75,11 @@ async def fetch_monument_geometries_by_bbox(
     ymax: float,
     session: AsyncSession = Depends(get_session)
 ):
-    rows = await get_monument_geometries_by_bbox(
+    content = await get_monument_geometries_by_bbox(
         session, xmin, ymin, xmax, ymax
     )
 
-    features = [
-        Feature(
-            id=row['id'],
-            geometry=json.loads(row['geom']),
-            properties={'label': row['label']},
-        )
-        for row in rows
-    ]
-
-    geojson_data = FeatureCollection(features)
-    return JSONResponse(content=jsonable_encoder(geojson_data))
+    return geojson_response(content)
 
 
 @route_monument.get(
@@ -98,16 +92,62 @@ async def fetch_monument_geometries_by_lat_lng(
     lng: float,
     session: AsyncSession = Depends(get_session)
 ):
-    rows = await get_monument_geometries_by_lat_lng(session, lat, lng)
+    content = await get_monument_geometries_by_lat_lng(session, lat, lng)
+
+    return geojson_response(content)
+
 
-    features = [
-        Feature(
-            id=row['id'],
-            geometry=json.loads(row['geom']),
-            properties={'label': row['label']},
+@route_monument.get(
+    '/nearest',
+    response_model=dict,
+    responses=NEAREST_RESPONSES,
+    tags=['Denkmalliste'],
+    description=(
+        'Retrieves the k nearest monuments to the specified coordinates ordered by '
+        'distance, optionally within max_distance meters. '
+        f'{GEOMETRY_ACCEPT_DESCRIPTION}'
+    )
+)
+async def fetch_nearest_monuments(
+    lat: float = Query(..., ge=-90, le=90),
+    lng: float = Query(..., ge=-180, le=180),
+    k: int = Query(1, ge=1, le=NEAREST_MAX_RESULTS, description='Number of monuments'),
+    max_distance: float = Query(None, gt=0, description='Maximum distance in meters'),
+    options: GeometryOptions = Depends(get_geometry_options),
+    session: AsyncSession = Depends(get_session)
+):
+    rows = await get_nearest_rows(
+        session, 'monument', lat, lng, k, NEAREST_CANDIDATES, max_distance, options)
+
+    if not rows:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f'No matches found for coordinates ({lat}, {lng})'
         )
-        for row in rows
-    ]
 
-    geojson_data = FeatureCollection(features)
-    return JSONResponse(content=jsonable_encoder(geojson_data))
+    if options.binary:
+        return geometry_response(rows, options, id_key='id')
+
+    return create_nearest_collection(rows, 'id')
+
+
+@route_monument.get(
+    '/tiles/{z}/{x}/{y}.mvt',
+    response_class=Response,
+    responses=TILE_RESPONSES,
+    tags=['Denkmalliste'],
+    description=(
+        'Retrieves a Mapbox vector tile of monuments. Tiles below zoom level 10 are '
+        'empty and nearby monuments are thinned out below zoom level 15.'
+    )
+)
+async def fetch_monument_tile(
+    request: Request,
+    z: int,
+    x: int,
+    y: int,
+    session: AsyncSession = Depends(get_session)
+):
+    tile = await get_cached_tile(session, 'monument', z, x, y)
+
+    return tile_response(request, tile)
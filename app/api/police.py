@@ -1,9 +1,7 @@
-import json
-
 from typing import List, Dict, Any, Optional
 
-from fastapi import Depends, APIRouter, HTTPException, status
-from geojson import Feature, FeatureCollection
+from fastapi import Depends, APIRouter, HTTPException, Query, Request, Response, status
+from geojson import FeatureCollection
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..schemas.police import (
@@ -11,30 +9,27 @@ from ..schemas.police import (
     PoliceResponse
 )
 from ..dependencies import get_session
+from ..utils.serializer import FastJSONRoute
+from ..spatial import register_layer
+from ..tilestore import get_cached_tile
+from ..utils.geojson import encode_feature, encode_feature_collection, geojson_response
+from ..utils.geometry import GEOMETRY_ACCEPT_DESCRIPTION, GeometryOptions, get_geometry_options, geometry_response
+from ..utils.nearest import NEAREST_MAX_RESULTS, NEAREST_RESPONSES, create_nearest_collection
+from ..utils.tile import TILE_RESPONSES, tile_response
 from ..services.police import (
     get_police_station_by_id,
-    get_police_station_geometries_by_bbox,
-    get_police_station_geometries_by_lat_lng
+    get_police_station_points
 )
 
 
-route_police = APIRouter(prefix='/police/v1')
+route_police = APIRouter(prefix='/police/v1', route_class=FastJSONRoute)
 
 
-def create_geojson_from_rows(rows: List[Dict[str, Any]]) -> FeatureCollection:
-    features = [
-        Feature(
-            id=row['id'],
-            geometry=json.loads(row['geojson']),
-            properties={'label': row['label']}
-        )
-        for row in rows
-    ]
+def render_police_feature(row) -> bytes:
+    return encode_feature(row['id'], row['geojson'], {'label': row['label']})
 
-    crs = {'type': 'name', 'properties': {
-        'name': 'urn:ogc:def:crs:OGC:1.3:CRS84'}}
 
-    return FeatureCollection(features, crs=crs)
+police_layer = register_layer('police', get_police_station_points, 'tiles_police', render_police_feature)
 
 
 @route_police.get(
@@ -42,14 +37,16 @@ def create_geojson_from_rows(rows: List[Dict[str, Any]]) -> FeatureCollection:
     response_model=PoliceResponse,
     tags=['Polizeidienststellen'],
     description=(
-        'Retrieves police station details based on the provided station id.'
+        'Retrieves police station details based on the provided station id. '
+        f'{GEOMETRY_ACCEPT_DESCRIPTION}'
     )
 )
 async def fetch_police_station_by_id(
     station_id: int,
+    options: GeometryOptions = Depends(get_geometry_options),
     session: AsyncSession = Depends(get_session)
 ) -> List[PoliceResponse]:
-    rows = await get_police_station_by_id(session, station_id)
+    rows = await get_police_station_by_id(session, station_id, options)
     identifier = f'station_id {station_id}'
 
     if not rows:
@@ -58,7 +55,7 @@ async def fetch_police_station_by_id(
             detail=f'No matches found for {identifier}'
         )
 
-    return rows
+    return geometry_response(rows, options)
 
 
 @route_police.get(
@@ -77,9 +74,8 @@ async def fetch_police_station_geometries_by_bbox(
     ymax: float,
     session: AsyncSession = Depends(get_session)
 ) -> FeatureCollection:
-    rows = await get_police_station_geometries_by_bbox(
-        session, xmin, ymin, xmax, ymax
-    )
+    index = await police_layer.get_index(session)
+    rows = index.bbox(xmin, ymin, xmax, ymax)
 
     if not rows:
         raise HTTPException(
@@ -87,7 +83,7 @@ async def fetch_police_station_geometries_by_bbox(
             detail='No matches found for the given bounding box'
         )
 
-    return create_geojson_from_rows(rows)
+    return geojson_response(encode_feature_collection([row['feature'] for row in rows]))
 
 
 @route_police.get(
@@ -156,7 +152,8 @@ async def fetch_police_station_geometries_by_lat_lng(
     Raises:
         HTTPException: If no polices are found near the coordinates
     """
-    rows = await get_police_station_geometries_by_lat_lng(session, lat, lng)
+    index = await police_layer.get_index(session)
+    rows = index.radius(lat, lng, 1000)
 
     if not rows:
         raise HTTPException(
@@ -164,4 +161,55 @@ async def fetch_police_station_geometries_by_lat_lng(
             detail=f'No matches found for coordinates ({lat}, {lng})'
         )
 
-    return create_geojson_from_rows(rows)
+    return geojson_response(encode_feature_collection([row['feature'] for row in rows]))
+
+
+@route_police.get(
+    '/nearest',
+    response_model=dict,
+    responses=NEAREST_RESPONSES,
+    tags=['Polizeidienststellen'],
+    description=(
+        'Retrieves the k nearest police stations to the specified coordinates '
+        'ordered by distance, optionally within max_distance meters.'
+    )
+)
+async def fetch_nearest_police_stations(
+    lat: float = Query(..., ge=-90, le=90),
+    lng: float = Query(..., ge=-180, le=180),
+    k: int = Query(1, ge=1, le=NEAREST_MAX_RESULTS, description='Number of police stations'),
+    max_distance: float = Query(None, gt=0, description='Maximum distance in meters'),
+    session: AsyncSession = Depends(get_session)
+):
+    index = await police_layer.get_index(session)
+    rows = index.nearest_with_distance(lat, lng, k, max_distance)
+
+    if not rows:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f'No matches found for coordinates ({lat}, {lng})'
+        )
+
+    return create_nearest_collection(rows, 'id')
+
+
+@route_police.get(
+    '/tiles/{z}/{x}/{y}.mvt',
+    response_class=Response,
+    responses=TILE_RESPONSES,
+    tags=['Polizeidienststellen'],
+    description=(
+        'Retrieves a Mapbox vector tile of police stations. Tiles below zoom level 6 are '
+        'empty and nearby stations are thinned out below zoom level 11.'
+    )
+)
+async def fetch_police_station_tile(
+    request: Request,
+    z: int,
+    x: int,
+    y: int,
+    session: AsyncSession = Depends(get_session)
+):
+    tile = await get_cached_tile(session, 'police', z, x, y)
+
+    return tile_response(request, tile)
@@ -1,9 +1,7 @@
-import json
-
 from typing import List, Dict, Any, Optional
 
-from fastapi import Depends, APIRouter, HTTPException, status
-from geojson import Feature, FeatureCollection
+from fastapi import Depends, APIRouter, HTTPException, Query, Request, Response, status
+from geojson import FeatureCollection
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..schemas.school import (
@@ -12,43 +10,33 @@ from ..schemas.school import (
     SchoolResponse
 )
 from ..dependencies import get_session
+from ..utils.serializer import FastJSONRoute
+from ..spatial import register_layer
+from ..tilestore import get_cached_tile
+from ..utils.geojson import encode_feature, encode_feature_collection, geojson_response
+from ..utils.geometry import GEOMETRY_ACCEPT_DESCRIPTION, GeometryOptions, get_geometry_options, geometry_response
+from ..utils.nearest import NEAREST_MAX_RESULTS, NEAREST_RESPONSES, create_nearest_collection
+from ..utils.tile import TILE_RESPONSES, tile_response
 from ..services.school import (
     get_school_by_id,
     get_school_by_slug,
     get_school_types,
-    get_school_geometries_by_bbox,
-    get_school_geometries_by_lat_lng,
+    get_school_points,
     get_school_geometries_by_school_type
 )
 
 
-route_school = APIRouter(prefix='/school/v1')
+route_school = APIRouter(prefix='/school/v1', route_class=FastJSONRoute)
 
 
-def create_geojson_from_rows(rows: List[Dict[str, Any]]) -> FeatureCollection:
-    """
-    Create a GeoJSON FeatureCollection from database rows.
+def render_school_feature(row) -> bytes:
+    return encode_feature(row['id'], row['geojson'], {
+        'label': row['label'],
+        'school_type': row['school_type']
+    })
 
-    Args:
-        rows: List of database rows containing geojson, id, label and school_type
 
-    Returns:
-        A GeoJSON FeatureCollection
-    """
-    features = [
-        Feature(
-            id=row['id'],
-            geometry=json.loads(row['geojson']),
-            properties={'label': row['label'],
-                        'school_type': row['school_type']},
-        )
-        for row in rows
-    ]
-
-    crs = {'type': 'name', 'properties': {
-        'name': 'urn:ogc:def:crs:OGC:1.3:CRS84'}}
-
-    return FeatureCollection(features, crs=crs)
+school_layer = register_layer('school', get_school_points, 'tiles_school', render_school_feature)
 
 
 @route_school.get(
@@ -96,12 +84,13 @@ def create_geojson_from_rows(rows: List[Dict[str, Any]]) -> FeatureCollection:
     description=(
         'Retrieves school details based on the provided filter. '
         'Exactly one of the following arguments must be provided: '
-        'school_id, slug.'
+        f'school_id, slug. {GEOMETRY_ACCEPT_DESCRIPTION}'
     )
 )
 async def fetch_school_by_filter(
     school_id: Optional[int] = None,
     slug: Optional[str] = None,
+    options: GeometryOptions = Depends(get_geometry_options),
     session: AsyncSession = Depends(get_session)
 ) -> List[SchoolResponse]:
     """
@@ -110,6 +99,7 @@ async def fetch_school_by_filter(
     Args:
         school_id: The school ID to lookup
         slug: The school slug to lookup
+        options: Geometry mode, precision and encoding
         session: Database session
 
     Returns:
@@ -126,10 +116,10 @@ async def fetch_school_by_filter(
         )
 
     if school_id:
-        rows = await get_school_by_id(session, school_id)
+        rows = await get_school_by_id(session, school_id, options)
         identifier = f'school id {school_id}'
     else:
-        rows = await get_school_by_slug(session, slug)
+        rows = await get_school_by_slug(session, slug, options)
         identifier = f'school slug {slug}'
 
     if not rows:
@@ -138,7 +128,7 @@ async def fetch_school_by_filter(
             detail=f'No matches found for {identifier}'
         )
 
-    return rows
+    return geometry_response(rows, options)
 
 
 @route_school.get(
@@ -211,9 +201,8 @@ async def fetch_school_geometries_by_bbox(
     Raises:
         HTTPException: If no schools are found in the bounding box
     """
-    rows = await get_school_geometries_by_bbox(
-        session, xmin, ymin, xmax, ymax
-    )
+    index = await school_layer.get_index(session)
+    rows = index.bbox(xmin, ymin, xmax, ymax)
 
     if not rows:
         raise HTTPException(
@@ -221,7 +210,7 @@ async def fetch_school_geometries_by_bbox(
             detail='No matches found for the given bounding box'
         )
 
-    return create_geojson_from_rows(rows)
+    return geojson_response(encode_feature_collection([row['feature'] for row in rows]))
 
 
 @route_school.get(
@@ -290,7 +279,8 @@ async def fetch_school_geometries_by_lat_lng(
     Raises:
         HTTPException: If no schools are found near the coordinates
     """
-    rows = await get_school_geometries_by_lat_lng(session, lat, lng)
+    index = await school_layer.get_index(session)
+    rows = index.radius(lat, lng, 1000)
 
     if not rows:
         raise HTTPException(
@@ -298,7 +288,7 @@ async def fetch_school_geometries_by_lat_lng(
             detail=f'No matches found for coordinates ({lat}, {lng})'
         )
 
-    return create_geojson_from_rows(rows)
+    return geojson_response(encode_feature_collection([row['feature'] for row in rows]))
 
 
 @route_school.get(
@@ -365,15 +355,15 @@ async def fetch_school_geometries_by_school_type(
     Raises:
         HTTPException: If no schools are found with the specified school type
     """
-    rows = await get_school_geometries_by_school_type(session, school_type)
+    row = await get_school_geometries_by_school_type(session, school_type)
 
-    if not rows:
+    if not row['count']:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f'No matches found for school type {school_type}'
         )
 
-    return create_geojson_from_rows(rows)
+    return geojson_response(row['content'])
 
 
 @route_school.get(
@@ -419,3 +409,67 @@ async def fetch_school_types(
         )
 
     return rows
+
+
+@route_school.get(
+    '/nearest',
+    response_model=dict,
+    responses=NEAREST_RESPONSES,
+    tags=['Schulen'],
+    description=(
+        'Retrieves the k nearest schools to the specified coordinates ordered by '
+        'distance, optionally within max_distance meters.'
+    )
+)
+async def fetch_nearest_schools(
+    lat: float = Query(..., ge=-90, le=90),
+    lng: float = Query(..., ge=-180, le=180),
+    k: int = Query(1, ge=1, le=NEAREST_MAX_RESULTS, description='Number of schools'),
+    max_distance: float = Query(None, gt=0, description='Maximum distance in meters'),
+    session: AsyncSession = Depends(get_session)
+):
+    index = await school_layer.get_index(session)
+    rows = index.nearest_with_distance(lat, lng, k, max_distance)
+
+    if not rows:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f'No matches found for coordinates ({lat}, {lng})'
+        )
+
+    return create_nearest_collection(rows, 'id')
+
+
+@route_school.get(
+    '/tiles/{z}/{x}/{y}.mvt',
+    response_class=Response,
+    responses=TILE_RESPONSES,
+    tags=['Schulen'],
+    description=(
+        'Retrieves a Mapbox vector tile of schools. Tiles below zoom level 6 are '
+        'empty and nearby schools are thinned out below zoom level 12.'
+    )
+)
+async def fetch_school_tile(
+    request: Request,
+    z: int,
+    x: int,
+    y: int,
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Retrieve a vector tile of schools.
+
+    Args:
+        request: Request, used for conditional requests
+        z: Zoom level
+        x: Tile column
+        y: Tile row
+        session: Database session
+
+    Returns:
+        Mapbox vector tile with a school layer
+    """
+    tile = await get_cached_tile(session, 'school', z, x, y)
+
+    return tile_response(request, tile)
@@ -0,0 +1,104 @@
+from fastapi import APIRouter
+
+from ..client import get_client_status
+from ..database import get_pool_status
+from ..executor import get_executor_status
+from ..forecast import get_forecast_metrics
+from ..utils.dwd_kmz import downloads
+from ..utils.cache import registry
+from ..utils.serializer import FastJSONResponse, FastJSONRoute
+from ..warmup import state
+
+
+route_system = APIRouter(prefix='/system/v1', route_class=FastJSONRoute)
+
+
+@route_system.get(
+    '/database/pool',
+    response_model=dict,
+    responses={
+        200: {'description': 'OK'},
+    },
+    tags=['System'],
+    description=(
+        'Retrieves the effective database engine profile and the current '
+        'connection pool usage of the answering worker.'
+    )
+)
+async def fetch_database_pool_status():
+    return get_pool_status()
+
+
+@route_system.get(
+    '/ready',
+    response_model=dict,
+    responses={
+        200: {'description': 'OK'},
+        503: {'description': 'Service Unavailable'},
+    },
+    tags=['System'],
+    description=(
+        'Reports whether the answering worker has finished its warm-up '
+        'phase without errors and is ready to serve requests, the errors '
+        'of a failed warm-up are listed.'
+    )
+)
+async def fetch_readiness():
+    return FastJSONResponse(
+        status_code=200 if state.ready else 503,
+        content=state.as_dict()
+    )
+
+
+@route_system.get(
+    '/cache',
+    response_model=dict,
+    responses={
+        200: {'description': 'OK'},
+    },
+    tags=['System'],
+    description=(
+        'Retrieves size and hit statistics of the in-memory caches of the '
+        'answering worker.'
+    )
+)
+async def fetch_cache_status():
+    return {name: cache.stats() for name, cache in registry.items()}
+
+
+@route_system.get(
+    '/http',
+    response_model=dict,
+    responses={
+        200: {'description': 'OK'},
+    },
+    tags=['System'],
+    description=(
+        'Retrieves the outgoing http client pool of the answering worker and '
+        'how many DWD downloads were shared between concurrent requests and '
+        'the pool parsing them outside of the event loop.'
+    )
+)
+async def fetch_http_client_status():
+    return {
+        'client': get_client_status(),
+        'dwd_downloads': downloads.stats(),
+        'parse_pool': get_executor_status()
+    }
+
+
+@route_system.get(
+    '/forecast',
+    response_model=dict,
+    responses={
+        200: {'description': 'OK'},
+    },
+    tags=['System'],
+    description=(
+        'Retrieves the MOSMIX forecast cache of the answering worker, how many '
+        'stale forecasts were served, the prefetched stations and the lag between '
+        'an expired forecast and its refresh in seconds.'
+    )
+)
+async def fetch_forecast_status():
+    return get_forecast_metrics()
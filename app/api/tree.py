@@ -1,15 +1,11 @@
-import json
-
-from typing import List, Dict, Any
-
 from fastapi import Depends, APIRouter, HTTPException, status
-from geojson import Feature, FeatureCollection
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..schemas.tree import (
     StreetTreeResponse
 )
 from ..dependencies import get_session
+from ..utils.serializer import FastJSONRoute
 from ..services.tree import (
     get_tree_by_id
 )
@@ -17,22 +13,7 @@ from ..services.tree import (
 from geoalchemy2.shape import to_shape
 from shapely.geometry import mapping
 
-route_street_tree = APIRouter(prefix='/street_tree/v1')
-
-def create_geojson_from_rows(rows: List[Dict[str, Any]]) -> FeatureCollection:
-    features = [
-        Feature(
-            id=row['id'],
-            geometry=json.loads(row['geojson']),
-            properties={'label': row['label']}
-        )
-        for row in rows
-    ]
-
-    crs = {'type': 'name', 'properties': {
-        'name': 'urn:ogc:def:crs:OGC:1.3:CRS84'}}
-
-    return FeatureCollection(features, crs=crs)
+route_street_tree = APIRouter(prefix='/street_tree/v1', route_class=FastJSONRoute)
 
 
 @route_street_tree.get(
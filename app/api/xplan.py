@@ -1,15 +1,15 @@
 from fastapi import Depends, APIRouter, HTTPException, status
-from fastapi.responses import JSONResponse
-from fastapi.encoders import jsonable_encoder
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
 from ..dependencies import get_session
+from ..utils.geometry import GEOMETRY_ACCEPT_DESCRIPTION, GeometryOptions, get_geometry_options, geometry_response
+from ..utils.serializer import FastJSONRoute
 from ..services.xplan import (
     get_plan_by_lat_lng
 )
 
-route_xplan = APIRouter(prefix='/xplan/v1')
+route_xplan = APIRouter(prefix='/xplan/v1', route_class=FastJSONRoute)
 
 
 @route_xplan.get(
@@ -21,17 +21,21 @@ route_xplan = APIRouter(prefix='/xplan/v1')
         404: {'description': 'Not Found'},
         422: {'description': 'Unprocessable Entity'},
     },
-    tags=['XPlanung'])
+    tags=['XPlanung'],
+    description=(
+        'Retrieves the development plan at the provided coordinates. '
+        f'{GEOMETRY_ACCEPT_DESCRIPTION}')
+)
 async def fetch_plan_by_lat_lng(
     lat: float,
     lng: float,
+    options: GeometryOptions = Depends(get_geometry_options),
     session: AsyncSession = Depends(get_session)
 ):
-    rows = await get_plan_by_lat_lng(session, lat, lng)
-    response = jsonable_encoder(rows)
+    rows = await get_plan_by_lat_lng(session, lat, lng, options)
 
     try:
-        return JSONResponse(content=response[0])
+        return geometry_response(rows[0], options)
     except IndexError:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -0,0 +1,57 @@
+import aiohttp
+
+from .database import get_settings, log
+
+
+# one client per uvicorn worker, created on first use inside the event loop
+client = {'session': None}
+
+
+def get_client_session() -> aiohttp.ClientSession:
+    session = client['session']
+
+    if session is None or session.closed:
+        settings = get_settings()
+
+        connector = aiohttp.TCPConnector(
+            limit=settings.http_pool_size,
+            limit_per_host=settings.http_limit_per_host,
+            keepalive_timeout=settings.http_keepalive_timeout,
+            ttl_dns_cache=300
+        )
+
+        session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=settings.http_timeout),
+            headers={'User-Agent': settings.application_name}
+        )
+        client['session'] = session
+
+        log.info('created http client with %s connections, %s per host',
+                 settings.http_pool_size, settings.http_limit_per_host)
+
+    return session
+
+
+def get_client_status() -> dict:
+    session = client['session']
+
+    if session is None or session.closed:
+        return {'open': False}
+
+    connector = session.connector
+
+    return {
+        'open': True,
+        'limit': connector.limit,
+        'limit_per_host': connector.limit_per_host,
+        'idle_connections': sum(len(c) for c in connector._conns.values())
+    }
+
+
+async def close_client_session():
+    session = client['session']
+
+    if session is not None:
+        client['session'] = None
+        await session.close()
@@ -10,4 +10,103 @@ class Settings(BaseSettings):
     database: str = Field(validation_alias='DB_NAME')
     port: int = Field(validation_alias='DB_PORT')
 
+    # engine profile, sized per uvicorn worker
+    echo: bool = Field(default=False, validation_alias='DB_ECHO')
+    pool_size: int = Field(default=5, ge=1, validation_alias='DB_POOL_SIZE')
+    max_overflow: int = Field(
+        default=5, ge=0, validation_alias='DB_MAX_OVERFLOW')
+    pool_timeout: int = Field(
+        default=30, ge=1, validation_alias='DB_POOL_TIMEOUT')
+    pool_recycle: int = Field(
+        default=1800, validation_alias='DB_POOL_RECYCLE')
+    pool_pre_ping: bool = Field(
+        default=True, validation_alias='DB_POOL_PRE_PING')
+    statement_cache_size: int = Field(
+        default=500, ge=0, validation_alias='DB_STATEMENT_CACHE_SIZE')
+
+    # per connection server settings
+    statement_timeout: int = Field(
+        default=30000, ge=0, validation_alias='DB_STATEMENT_TIMEOUT')
+    jit: bool = Field(default=False, validation_alias='DB_JIT')
+    application_name: str = Field(
+        default='open-data-api', validation_alias='DB_APPLICATION_NAME')
+
+    # in-memory caches
+    meta_cache_ttl: int = Field(
+        default=3600, ge=0, validation_alias='META_CACHE_TTL')
+    meta_cache_size: int = Field(
+        default=64, ge=1, validation_alias='META_CACHE_SIZE')
+
+    # streaming exports, rows fetched per server side cursor round trip
+    export_chunk_size: int = Field(
+        default=1000, ge=1, validation_alias='EXPORT_CHUNK_SIZE')
+
+    # vector tiles, seconds clients and proxies may reuse a tile
+    tile_max_age: int = Field(
+        default=3600, ge=0, validation_alias='TILE_MAX_AGE')
+    tile_cache_dir: str = Field(
+        default='cache/tiles', validation_alias='TILE_CACHE_DIR')
+
+    # outgoing http, one pooled client per uvicorn worker
+    dwd_base_url: str = Field(
+        default='https://opendata.dwd.de', validation_alias='DWD_BASE_URL')
+    http_pool_size: int = Field(
+        default=100, ge=1, validation_alias='HTTP_POOL_SIZE')
+    http_limit_per_host: int = Field(
+        default=10, ge=0, validation_alias='HTTP_LIMIT_PER_HOST')
+    http_keepalive_timeout: int = Field(
+        default=30, ge=0, validation_alias='HTTP_KEEPALIVE_TIMEOUT')
+    http_timeout: int = Field(
+        default=30, ge=1, validation_alias='HTTP_TIMEOUT')
+
+    # cpu bound parsing of downloads, outside of the event loop
+    parse_executor: str = Field(
+        default='thread', pattern='^(thread|process|inline)$', validation_alias='PARSE_EXECUTOR')
+    parse_workers: int = Field(
+        default=2, ge=1, validation_alias='PARSE_WORKERS')
+    parse_queue_size: int = Field(
+        default=32, ge=0, validation_alias='PARSE_QUEUE_SIZE')
+
+    # mosmix forecasts, valid until the next issue is published
+    forecast_cache_size: int = Field(
+        default=512, ge=1, validation_alias='FORECAST_CACHE_SIZE')
+    forecast_cache_path: str = Field(
+        default='cache/forecasts.sqlite', validation_alias='FORECAST_CACHE_PATH')
+    mosmix_issue_hours: list[int] = Field(
+        default=[3, 9, 15, 21], min_length=1, validation_alias='MOSMIX_ISSUE_HOURS')
+    mosmix_publish_delay: int = Field(
+        default=5400, ge=0, validation_alias='MOSMIX_PUBLISH_DELAY')
+    mosmix_retry_interval: int = Field(
+        default=600, ge=1, validation_alias='MOSMIX_RETRY_INTERVAL')
+    forecast_stale_ttl: int = Field(
+        default=172800, ge=0, validation_alias='FORECAST_STALE_TTL')
+    forecast_prefetch_stations: int = Field(
+        default=50, ge=0, validation_alias='FORECAST_PREFETCH_STATIONS')
+    forecast_batch_size: int = Field(
+        default=50, ge=1, validation_alias='FORECAST_BATCH_SIZE')
+    forecast_batch_concurrency: int = Field(
+        default=8, ge=1, validation_alias='FORECAST_BATCH_CONCURRENCY')
+    forecast_point_stations: int = Field(
+        default=4, ge=1, le=16, validation_alias='FORECAST_POINT_STATIONS')
+    forecast_point_precision: int = Field(
+        default=2, ge=0, le=4, validation_alias='FORECAST_POINT_PRECISION')
+
+    # nearest neighbour queries bound their search by this many index candidates
+    nearest_candidates: int = Field(
+        default=16, ge=1, validation_alias='NEAREST_CANDIDATES')
+    nearest_max_results: int = Field(
+        default=50, ge=1, validation_alias='NEAREST_MAX_RESULTS')
+
+    # decimal places of ST_AsGeoJSON coordinates, 6 are about 10 cm
+    geometry_precision: int = Field(
+        default=6, ge=0, le=15, validation_alias='GEOMETRY_PRECISION')
+
+    # topojson boundary collections, encoded once per collection
+    topojson_quantization: int = Field(
+        default=100000, ge=2, validation_alias='TOPOJSON_QUANTIZATION')
+    topojson_cache_size: int = Field(
+        default=128, ge=1, validation_alias='TOPOJSON_CACHE_SIZE')
+    topojson_cache_ttl: int = Field(
+        default=86400, ge=0, validation_alias='TOPOJSON_CACHE_TTL')
+
     model_config = SettingsConfigDict(env_file='.env', populate_by_name=True)
@@ -1,3 +1,5 @@
+import logging
+
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
@@ -6,6 +8,8 @@ from functools import lru_cache
 from .config import Settings
 
 
+log = logging.getLogger('uvicorn.error')
+
 
 @lru_cache()
 def get_settings():
@@ -22,7 +26,73 @@ port = get_settings().port
 DATABASE_URL = f'postgresql+asyncpg://{username}:{password}@{host}:{port}/{database}'
 
 
+def get_server_settings(settings: Settings) -> dict:
+    # asyncpg expects every server setting as a string
+    return {
+        'statement_timeout': str(settings.statement_timeout),
+        'jit': 'on' if settings.jit else 'off',
+        'application_name': settings.application_name
+    }
+
+
+def get_engine_options(settings: Settings) -> dict:
+    return {
+        'echo': settings.echo,
+        'pool_size': settings.pool_size,
+        'max_overflow': settings.max_overflow,
+        'pool_timeout': settings.pool_timeout,
+        'pool_recycle': settings.pool_recycle,
+        'pool_pre_ping': settings.pool_pre_ping,
+        'connect_args': {
+            'prepared_statement_cache_size': settings.statement_cache_size,
+            'server_settings': get_server_settings(settings)
+        }
+    }
+
+
+def get_pool_status() -> dict:
+    settings = get_settings()
+    pool = engine.pool
+
+    return {
+        'application_name': settings.application_name,
+        'echo': settings.echo,
+        'pool_class': type(pool).__name__,
+        'pool_size': pool.size(),
+        'max_overflow': settings.max_overflow,
+        'max_connections': pool.size() + settings.max_overflow,
+        'pool_timeout': settings.pool_timeout,
+        'pool_recycle': settings.pool_recycle,
+        'pool_pre_ping': settings.pool_pre_ping,
+        'checked_in': pool.checkedin(),
+        'checked_out': pool.checkedout(),
+        'overflow': pool.overflow(),
+        'statement_cache_size': settings.statement_cache_size,
+        'server_settings': get_server_settings(settings)
+    }
+
+
+def log_engine_profile():
+    settings = get_settings()
+
+    log.info(
+        'database engine: pool_size=%s max_overflow=%s pool_timeout=%ss '
+        'pool_recycle=%ss pre_ping=%s statement_cache_size=%s '
+        'statement_timeout=%sms jit=%s application_name=%s echo=%s',
+        settings.pool_size,
+        settings.max_overflow,
+        settings.pool_timeout,
+        settings.pool_recycle,
+        settings.pool_pre_ping,
+        settings.statement_cache_size,
+        settings.statement_timeout,
+        'on' if settings.jit else 'off',
+        settings.application_name,
+        settings.echo
+    )
+
+
 Base = declarative_base()
 
-engine = create_async_engine(DATABASE_URL, echo=True)
+engine = create_async_engine(DATABASE_URL, **get_engine_options(get_settings()))
 async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
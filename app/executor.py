@@ -0,0 +1,85 @@
+import asyncio
+import multiprocessing
+
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from fastapi import HTTPException
+
+from .database import get_settings, log
+
+
+settings = get_settings()
+
+PARSE_EXECUTOR = settings.parse_executor
+PARSE_WORKERS = settings.parse_workers
+PARSE_QUEUE_SIZE = settings.parse_queue_size
+
+# one pool per uvicorn worker, created on first use
+pool = {'executor': None}
+
+counters = {'submitted': 0, 'running': 0, 'rejected': 0}
+
+
+def get_executor() -> Executor | None:
+    if PARSE_EXECUTOR == 'inline':
+        return None
+
+    if pool['executor'] is None:
+        if PARSE_EXECUTOR == 'process':
+            # forking a worker with a running event loop and open sockets is unsafe
+            context = multiprocessing.get_context('spawn')
+            pool['executor'] = ProcessPoolExecutor(max_workers=PARSE_WORKERS, mp_context=context)
+        else:
+            pool['executor'] = ThreadPoolExecutor(max_workers=PARSE_WORKERS, thread_name_prefix='parse')
+
+        log.info('created %s pool with %s workers for parsing', PARSE_EXECUTOR, PARSE_WORKERS)
+
+    return pool['executor']
+
+
+async def run_in_executor(func, *args):
+    """
+    Runs cpu bound work like decoding and parsing downloads outside of the
+    event loop. At most PARSE_WORKERS calls run and PARSE_QUEUE_SIZE wait
+    at a time, further calls are rejected instead of queueing unbounded.
+    """
+    executor = get_executor()
+
+    if executor is None:
+        return func(*args)
+
+    if counters['running'] >= PARSE_WORKERS + PARSE_QUEUE_SIZE:
+        counters['rejected'] += 1
+
+        raise HTTPException(
+            status_code=503,
+            detail='Too many downloads are being processed, try again later',
+            headers={'Retry-After': '5'}
+        )
+
+    counters['submitted'] += 1
+    counters['running'] += 1
+
+    try:
+        return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+    finally:
+        counters['running'] -= 1
+
+
+def get_executor_status() -> dict:
+    return {
+        'mode': PARSE_EXECUTOR,
+        'workers': PARSE_WORKERS,
+        'queue_size': PARSE_QUEUE_SIZE,
+        'submitted': counters['submitted'],
+        'running': min(counters['running'], PARSE_WORKERS),
+        'queued': max(counters['running'] - PARSE_WORKERS, 0),
+        'rejected': counters['rejected']
+    }
+
+
+def shutdown_executor():
+    executor = pool['executor']
+
+    if executor is not None:
+        pool['executor'] = None
+        executor.shutdown(wait=True, cancel_futures=True)
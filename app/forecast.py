@@ -0,0 +1,615 @@
+import os
+import json
+import time
+import struct
+import asyncio
+import sqlite3
+import threading
+import numpy as np
+
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from fastapi import HTTPException
+
+from .database import get_settings, log
+from .utils.cache import TTLCache, register_cache
+from .utils.dwd_kmz import FORECAST_ELEMENTS, retrieve_station_kmz, parse_station_kmz
+from .utils.singleflight import SingleFlight
+from .utils.interpolation import get_distances, interpolate_forecasts
+from .utils.forecast_format import EMPTY_VALUES, FORECAST_ENCODERS, encode_binary, decode_binary
+
+
+settings = get_settings()
+
+MOSMIX_ISSUE_HOURS = sorted(settings.mosmix_issue_hours)
+MOSMIX_PUBLISH_DELAY = settings.mosmix_publish_delay
+MOSMIX_RETRY_INTERVAL = settings.mosmix_retry_interval
+FORECAST_STALE_TTL = settings.forecast_stale_ttl
+FORECAST_PREFETCH_STATIONS = settings.forecast_prefetch_stations
+FORECAST_BATCH_CONCURRENCY = settings.forecast_batch_concurrency
+FORECAST_POINT_STATIONS = settings.forecast_point_stations
+FORECAST_POINT_PRECISION = settings.forecast_point_precision
+
+# content is the downloaded kmz, elements not parsed yet are read from it
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS station_forecasts (
+    station_id TEXT PRIMARY KEY,
+    issue_time TEXT,
+    fetched_at REAL,
+    expires_at REAL,
+    payload BLOB,
+    content BLOB
+);
+'''
+
+
+class ForecastStore:
+    """
+    SQLite file of serialized station forecasts shared by all uvicorn
+    workers, so a forecast downloaded by one worker or before a restart
+    is reused until its next issue is expected.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = None
+
+    def connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+
+            connection = sqlite3.connect(
+                self.path, timeout=30, check_same_thread=False)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.executescript(SCHEMA)
+
+            self._connection = connection
+
+        return self._connection
+
+    def get(self, station_id: str) -> dict | None:
+        with self._lock:
+            row = self.connect().execute(
+                'SELECT payload, issue_time, fetched_at, expires_at, content FROM station_forecasts WHERE station_id = ?',
+                (station_id,)
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        try:
+            forecast = decode_binary(bytes(row[0]))
+        except (ValueError, struct.error):
+            # written by an earlier version, downloaded again
+            return None
+
+        return {
+            'station_id': station_id,
+            'forecast': forecast,
+            'content': bytes(row[4]),
+            'complete': False,
+            'payloads': {},
+            'issue_time': row[1],
+            'fetched_at': row[2],
+            'expires_at': row[3]
+        }
+
+    def put(self, station_id: str, entry: dict):
+        with self._lock:
+            connection = self.connect()
+
+            with connection:
+                connection.execute(
+                    'INSERT OR REPLACE INTO station_forecasts (station_id, issue_time, fetched_at, expires_at, payload, content) VALUES (?, ?, ?, ?, ?, ?)',
+                    (station_id, entry['issue_time'], entry['fetched_at'], entry['expires_at'], encode_binary(entry['forecast']), entry['content'])
+                )
+
+
+def get_next_issue_time(issue_time: datetime) -> datetime:
+    for hour in MOSMIX_ISSUE_HOURS:
+        candidate = issue_time.replace(hour=hour, minute=0, second=0, microsecond=0)
+
+        if candidate > issue_time:
+            return candidate
+
+    tomorrow = issue_time + timedelta(days=1)
+
+    return tomorrow.replace(hour=MOSMIX_ISSUE_HOURS[0], minute=0, second=0, microsecond=0)
+
+
+def get_expires_at(issue_time: str | None, now: float) -> float:
+    if not issue_time:
+        return now + MOSMIX_RETRY_INTERVAL
+
+    issued = datetime.strptime(issue_time, '%Y-%m-%dT%H:%M:%S%z')
+    expires_at = get_next_issue_time(issued).timestamp() + MOSMIX_PUBLISH_DELAY
+
+    # the next issue is overdue on opendata.dwd.de, look again shortly
+    if expires_at <= now:
+        expires_at = now + MOSMIX_RETRY_INTERVAL
+
+    return expires_at
+
+
+def get_expected_issue_time(now: datetime) -> datetime:
+    """
+    Returns the latest issue slot that should be published by now.
+    """
+    published = now - timedelta(seconds=MOSMIX_PUBLISH_DELAY)
+    slot = get_next_issue_time(published) - timedelta(days=1)
+
+    # step forward to the last slot before the publish horizon
+    while get_next_issue_time(slot) <= published:
+        slot = get_next_issue_time(slot)
+
+    return slot
+
+
+# parsed forecasts as arrays with their kmz, a MOSMIX_L station takes about
+# 14 KiB for the default elements and 20 KiB for the kmz. entries
+# outlive their expiry by FORECAST_STALE_TTL to be served while refreshing
+forecast_cache = register_cache('mosmix_forecasts', TTLCache(
+    maxsize=settings.forecast_cache_size,
+    ttl=MOSMIX_RETRY_INTERVAL
+))
+
+forecast_store = ForecastStore(settings.forecast_cache_path) if settings.forecast_cache_path else None
+
+# encoded point forecasts by rounded coordinate cell, elevation, elements
+# and format, kept until the first of their stations expires
+point_cache = register_cache('mosmix_point_forecasts', TTLCache(
+    maxsize=settings.forecast_cache_size,
+    ttl=MOSMIX_RETRY_INTERVAL
+))
+
+refreshes = SingleFlight()
+
+# element parses of the kmz of an entry, shared by concurrent requests
+parses = SingleFlight()
+
+# requests per station, halved after every prefetch to follow recent demand
+popularity = Counter()
+
+failed_at = {}
+
+# background refreshes by station, keeps a reference to the running tasks
+background = {}
+
+prefetcher = {'task': None}
+
+metrics = {
+    'served_stale': 0,
+    'refreshes': 0,
+    'refresh_failures': 0,
+    'prefetched_stations': 0,
+    'last_prefetch': None,
+    'last_refresh_lag': None,
+    'max_refresh_lag': None
+}
+
+
+def remember(station_id: str, entry: dict, now: float):
+    ttl = entry['expires_at'] - now + FORECAST_STALE_TTL
+    forecast_cache.set(station_id, entry, ttl=ttl)
+
+
+async def read_stored_forecast(station_id: str) -> dict | None:
+    if forecast_store is None:
+        return None
+
+    entry = await asyncio.to_thread(forecast_store.get, station_id)
+
+    if entry is None or entry['expires_at'] + FORECAST_STALE_TTL <= time.time():
+        return None
+
+    return entry
+
+
+async def load_station_forecast(station_id: str) -> dict | None:
+    entry = forecast_cache.get(station_id)
+
+    if entry is None:
+        entry = await read_stored_forecast(station_id)
+
+        if entry is not None:
+            remember(station_id, entry, time.time())
+
+    return entry
+
+
+async def fetch_station_forecast(station_id: str) -> dict:
+    now = time.time()
+    content = await retrieve_station_kmz(station_id)
+    data = await parse_station_kmz(content)
+
+    entry = {
+        'station_id': station_id,
+        'forecast': data,
+        'content': content,
+        'complete': False,
+        'payloads': {},
+        'issue_time': data.get('issue_time'),
+        'fetched_at': now,
+        'expires_at': get_expires_at(data.get('issue_time'), now)
+    }
+
+    remember(station_id, entry, now)
+
+    if forecast_store is not None:
+        try:
+            await asyncio.to_thread(forecast_store.put, station_id, entry)
+        except sqlite3.Error as e:
+            log.warning('could not persist forecast of %s: %s', station_id, e)
+
+    return entry
+
+
+async def refresh_station_forecast(station_id: str, stale: dict | None = None) -> dict | None:
+    now = time.time()
+
+    # another worker may have refreshed the shared store already
+    stored = await read_stored_forecast(station_id)
+
+    if stored is not None and stored['expires_at'] > now:
+        remember(station_id, stored, now)
+        return stored
+
+    try:
+        entry = await refreshes.do(station_id, fetch_station_forecast, station_id)
+    except (HTTPException, OSError) as e:
+        failed_at[station_id] = time.time()
+        metrics['refresh_failures'] += 1
+
+        log.warning('could not refresh forecast of %s: %s', station_id, getattr(e, 'detail', e))
+        return None
+
+    failed_at.pop(station_id, None)
+    metrics['refreshes'] += 1
+
+    if stale is not None:
+        lag = round(entry['fetched_at'] - stale['expires_at'], 1)
+
+        metrics['last_refresh_lag'] = lag
+        metrics['max_refresh_lag'] = max(lag, metrics['max_refresh_lag'] or lag)
+
+    return entry
+
+
+def schedule_refresh(station_id: str, stale: dict):
+    # one attempt per retry interval while opendata.dwd.de is failing
+    if time.time() - failed_at.get(station_id, 0) < MOSMIX_RETRY_INTERVAL:
+        return
+
+    # the stale entry is served until the running refresh finished
+    if station_id in background:
+        return
+
+    task = asyncio.create_task(refresh_station_forecast(station_id, stale))
+
+    background[station_id] = task
+    task.add_done_callback(lambda t: background.pop(station_id, None))
+
+
+async def get_station_forecast(station_id: str) -> tuple:
+    """
+    Returns the serialized forecast of a station, its cache entry and
+    whether it was a cache HIT, a STALE entry served while it is refreshed
+    in the background, or a MISS that waited on DWD.
+    """
+    entry = await load_station_forecast(station_id)
+
+    if entry is None:
+        entry = await refreshes.do(station_id, fetch_station_forecast, station_id)
+        popularity[station_id] += 1
+
+        return entry, 'MISS'
+
+    popularity[station_id] += 1
+
+    if entry['expires_at'] > time.time():
+        return entry, 'HIT'
+
+    metrics['served_stale'] += 1
+    schedule_refresh(station_id, entry)
+
+    return entry, 'STALE'
+
+
+async def parse_entry_elements(entry: dict, elements: tuple | None) -> dict:
+    key = (entry['station_id'], entry['issue_time'], elements)
+
+    return await parses.do(key, parse_station_kmz, entry['content'], elements)
+
+
+def merge_integral(forecast: dict, data: dict) -> list:
+    integral = forecast.get('integral', [])
+
+    return integral + [name for name in data['integral'] if name not in integral]
+
+
+async def get_forecast_elements(entry: dict, elements: tuple | None) -> dict:
+    """
+    Returns the forecast of an entry with the requested elements, every
+    element of the document for None. Elements requested for the first
+    time are parsed from the stored kmz, the others are reused.
+    """
+    forecast = entry['forecast']
+    parsed = forecast['elements']
+
+    if elements is None:
+        if not entry['complete']:
+            data = await parse_entry_elements(entry, None)
+
+            parsed = {**data['elements'], **parsed}
+            forecast['elements'] = parsed
+            forecast['integral'] = merge_integral(forecast, data)
+            entry['complete'] = True
+
+        return forecast
+
+    missing = tuple(name for name in elements if name not in parsed)
+
+    if missing and not entry['complete']:
+        data = await parse_entry_elements(entry, missing)
+
+        parsed = {**parsed, **data['elements']}
+        forecast['elements'] = parsed
+        forecast['integral'] = merge_integral(forecast, data)
+
+    return {
+        **forecast,
+        'elements': {name: parsed.get(name, EMPTY_VALUES) for name in elements}
+    }
+
+
+async def get_forecast_payload(entry: dict, response_format: str, elements: tuple | None = FORECAST_ELEMENTS) -> bytes:
+    forecast = await get_forecast_elements(entry, elements)
+
+    # the default and the complete element list are encoded once per entry,
+    # other selections are small and encoded per request
+    if elements is not None and elements != FORECAST_ELEMENTS:
+        return FORECAST_ENCODERS[response_format](forecast)
+
+    key = (response_format, elements)
+    payloads = entry['payloads']
+
+    if key not in payloads:
+        payloads[key] = FORECAST_ENCODERS[response_format](forecast)
+
+    return payloads[key]
+
+
+async def get_batch_item(station_id: str, elements: tuple | None, response_format: str) -> bytes:
+    head = {'station_id': station_id}
+
+    try:
+        entry, cache_status = await get_station_forecast(station_id)
+        payload = await get_forecast_payload(entry, response_format, elements)
+    except HTTPException as e:
+        head.update(status=e.status_code, error=e.detail)
+        return json.dumps(head, ensure_ascii=False).encode('utf-8')
+    except Exception as e:
+        log.error('forecast of %s failed: %s', station_id, e)
+
+        head.update(status=500, error='Internal Server Error')
+        return json.dumps(head, ensure_ascii=False).encode('utf-8')
+
+    head.update(status=200, cache=cache_status, issue_time=entry['issue_time'])
+
+    # the encoded forecast is spliced in as it is cached
+    return json.dumps(head, ensure_ascii=False).encode('utf-8')[:-1] + b',"forecast":' + payload + b'}'
+
+
+async def get_batch_payload(station_ids: list, elements: tuple | None, response_format: str) -> bytes:
+    """
+    Returns the forecasts of several stations as one json document in
+    request order. At most FORECAST_BATCH_CONCURRENCY stations are fetched
+    at a time, a station that failed gets an entry with its status and
+    error instead of failing the batch.
+    """
+    semaphore = asyncio.Semaphore(FORECAST_BATCH_CONCURRENCY)
+
+    async def fetch(station_id):
+        async with semaphore:
+            return await get_batch_item(station_id, elements, response_format)
+
+    items = await asyncio.gather(*[fetch(station_id) for station_id in station_ids])
+
+    return b'{"stations":[' + b','.join(items) + b']}'
+
+
+def get_point_cell(lat: float, lng: float) -> tuple:
+    return round(lat, FORECAST_POINT_PRECISION), round(lng, FORECAST_POINT_PRECISION)
+
+
+async def get_point_forecast(cell: tuple, stations: list, elevation: float | None, elements: tuple | None) -> dict:
+    """
+    Returns the forecast at the center of a coordinate cell, interpolated
+    from the cached forecasts of the given stations by inverse distance.
+    Stations without a forecast are left out, it fails only when none of
+    them has one.
+    """
+    lat, lng = cell
+    results = await asyncio.gather(
+        *[get_station_forecast(station['station_id']) for station in stations],
+        return_exceptions=True
+    )
+
+    used = []
+    forecasts = []
+    error = None
+
+    for station, result in zip(stations, results):
+        if isinstance(result, HTTPException):
+            error = error or result
+            continue
+
+        if isinstance(result, BaseException):
+            log.error('forecast of %s failed: %s', station['station_id'], result)
+            continue
+
+        entry = result[0]
+
+        if not entry['forecast']['time'].size:
+            continue
+
+        used.append((station, entry))
+        forecasts.append(await get_forecast_elements(entry, elements))
+
+    if not forecasts:
+        raise error or HTTPException(
+            status_code=404,
+            detail=f'No forecasts found for coordinates ({lat}, {lng})'
+        )
+
+    distances = get_distances(
+        lat, lng,
+        np.array([float(station['latitude']) for station, _ in used]),
+        np.array([float(station['longitude']) for station, _ in used])
+    )
+    elevations = np.array([
+        np.nan if station['station_elevation'] is None else station['station_elevation']
+        for station, _ in used
+    ], dtype=np.float64)
+
+    result = interpolate_forecasts(forecasts, distances, elevations, elevation)
+
+    return {
+        'lat': lat,
+        'lng': lng,
+        'elevation': elevation,
+        'issue_time': used[0][1]['issue_time'],
+        'expires_at': min(entry['expires_at'] for _, entry in used),
+        'stations': [
+            {
+                'station_id': station['station_id'],
+                'station_name': station['station_name'],
+                'distance': round(float(distance), 1),
+                'weight': round(float(weight), 4)
+            }
+            for (station, _), distance, weight in zip(used, distances, result['weights'])
+        ],
+        'time': result['time'],
+        'elements': result['elements']
+    }
+
+
+async def get_point_payload(cell: tuple, stations: list, elevation: float | None, elements: tuple | None, response_format: str) -> tuple:
+    """
+    Returns the encoded point forecast of a cell and when it expires, the
+    payload is cached until the first of the interpolated forecasts expires.
+    """
+    forecast = await get_point_forecast(cell, stations, elevation, elements)
+    expires_at = forecast.pop('expires_at')
+
+    content = FORECAST_ENCODERS[response_format](forecast)
+    ttl = expires_at - time.time()
+
+    if ttl > 0:
+        point_cache.set((cell, elevation, elements, response_format), (content, expires_at), ttl=ttl)
+
+    return content, expires_at
+
+
+def get_forecast_headers(entry: dict, status: str) -> dict:
+    now = time.time()
+
+    headers = {
+        'X-Cache': status,
+        'Age': str(max(0, int(now - entry['fetched_at']))),
+        'Cache-Control': f'public, max-age={max(0, int(entry["expires_at"] - now))}'
+    }
+
+    if entry['issue_time']:
+        headers['X-Forecast-Issue-Time'] = entry['issue_time']
+
+    return headers
+
+
+async def prefetch_popular_stations(slot: datetime) -> list:
+    """
+    Refreshes the most requested stations and returns those still
+    without the issue of slot.
+    """
+    stations = [station_id for station_id, _ in popularity.most_common(FORECAST_PREFETCH_STATIONS)]
+    semaphore = asyncio.Semaphore(4)
+    pending = []
+
+    async def prefetch(station_id):
+        async with semaphore:
+            entry = await load_station_forecast(station_id)
+
+            if entry is None or entry['expires_at'] <= time.time():
+                entry = await refresh_station_forecast(station_id, entry) or entry
+
+            issue_time = entry and entry['issue_time']
+
+            if not issue_time or datetime.strptime(issue_time, '%Y-%m-%dT%H:%M:%S%z') < slot:
+                pending.append(station_id)
+
+    await asyncio.gather(*[prefetch(station_id) for station_id in stations])
+
+    metrics['prefetched_stations'] = len(stations)
+    metrics['last_prefetch'] = datetime.now(timezone.utc).isoformat()
+
+    return pending
+
+
+async def run_prefetcher():
+    while True:
+        now = datetime.now(timezone.utc)
+        slot = get_next_issue_time(get_expected_issue_time(now))
+        publish_at = slot + timedelta(seconds=MOSMIX_PUBLISH_DELAY)
+
+        await asyncio.sleep((publish_at - now).total_seconds())
+
+        try:
+            # a late issue is looked for again a few times
+            for attempt in range(4):
+                pending = await prefetch_popular_stations(slot)
+
+                if not pending:
+                    break
+
+                await asyncio.sleep(MOSMIX_RETRY_INTERVAL)
+
+            log.info('prefetched forecasts of %s stations for issue %s',
+                     metrics['prefetched_stations'], slot.isoformat())
+        except Exception as e:
+            log.error('forecast prefetch failed: %s', e)
+
+        for station_id in list(popularity):
+            popularity[station_id] //= 2
+
+            if not popularity[station_id]:
+                del popularity[station_id]
+
+
+def start_prefetcher():
+    if FORECAST_PREFETCH_STATIONS and prefetcher['task'] is None:
+        prefetcher['task'] = asyncio.create_task(run_prefetcher())
+
+
+async def stop_prefetcher():
+    task = prefetcher['task']
+
+    if task is not None:
+        prefetcher['task'] = None
+        task.cancel()
+
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+
+def get_forecast_metrics() -> dict:
+    return {
+        **metrics,
+        'tracked_stations': len(popularity),
+        'refreshing': len(background),
+        'parses': parses.stats(),
+        'cache': forecast_cache.stats()
+    }
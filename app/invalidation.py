@@ -0,0 +1,137 @@
+import asyncio
+import asyncpg
+
+from collections import defaultdict
+
+from .database import get_settings, log
+
+
+# ingest tools in tools/ call pg_notify on this channel with a topic such
+# as 'energy_meta' as payload once they have reloaded their tables
+CHANNEL = 'open_data_api_reload'
+
+subscribers = defaultdict(list)
+
+# seconds between reconnect attempts, doubled after every failed attempt
+RECONNECT_DELAY = 1
+MAX_RECONNECT_DELAY = 60
+
+# a connection dropped without a close is found by a query this often
+CHECK_INTERVAL = 30
+
+listener = {'connection': None, 'task': None}
+
+
+def subscribe(topic: str, callback):
+    subscribers[topic].append(callback)
+
+    return callback
+
+
+def dispatch(topic: str):
+    callbacks = subscribers.get(topic, [])
+
+    for callback in callbacks:
+        try:
+            callback()
+        except Exception as e:
+            log.error('invalidation of %s failed: %s', topic, e)
+
+    log.info('invalidated %s caches for topic %s', len(callbacks), topic)
+
+
+def on_notification(connection, pid, channel, payload):
+    dispatch(payload.strip())
+
+
+async def connect_listener(lost: asyncio.Event):
+    settings = get_settings()
+
+    connection = await asyncpg.connect(
+        host=settings.host,
+        port=settings.port,
+        user=settings.username,
+        password=settings.password,
+        database=settings.database,
+        server_settings={
+            'application_name': f'{settings.application_name}-listener'
+        }
+    )
+
+    connection.add_termination_listener(lambda _: lost.set())
+    await connection.add_listener(CHANNEL, on_notification)
+
+    return connection
+
+
+async def watch_connection(connection, lost: asyncio.Event):
+    # returns once the connection is closed or does not answer anymore
+    while not lost.is_set():
+        try:
+            await asyncio.wait_for(lost.wait(), CHECK_INTERVAL)
+        except asyncio.TimeoutError:
+            try:
+                await connection.execute('SELECT 1', timeout=CHECK_INTERVAL)
+            except Exception as e:
+                log.warning('listener connection on %s failed: %s', CHANNEL, e)
+                return
+
+
+async def run_listener():
+    """
+    Keeps a connection listening on CHANNEL and opens a new one when it
+    is lost. Notifications sent in between are missed, so every topic is
+    invalidated after a reconnect.
+    """
+    delay = RECONNECT_DELAY
+    reconnect = False
+
+    while True:
+        lost = asyncio.Event()
+
+        try:
+            connection = await connect_listener(lost)
+        except Exception as e:
+            # caches still expire by their ttl without notifications
+            log.warning('could not listen on %s, retrying in %ss: %s', CHANNEL, delay, e)
+
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, MAX_RECONNECT_DELAY)
+            continue
+
+        listener['connection'] = connection
+        delay = RECONNECT_DELAY
+
+        log.info('listening for cache invalidations on %s', CHANNEL)
+
+        if reconnect:
+            for topic in list(subscribers):
+                dispatch(topic)
+
+        reconnect = True
+
+        try:
+            await watch_connection(connection, lost)
+        finally:
+            listener['connection'] = None
+            connection.terminate()
+
+        log.warning('lost the listener connection on %s, reconnecting', CHANNEL)
+
+
+async def start_listener():
+    if listener['task'] is None:
+        listener['task'] = asyncio.create_task(run_listener())
+
+
+async def stop_listener():
+    task = listener['task']
+
+    if task is not None:
+        listener['task'] = None
+        task.cancel()
+
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
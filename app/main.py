@@ -2,9 +2,13 @@ from fastapi import FastAPI, Request
 from fastapi.staticfiles import StaticFiles
 from fastapi.openapi.docs import get_swagger_ui_html
 from fastapi.responses import JSONResponse, HTMLResponse, RedirectResponse
-from sqlalchemy.ext.declarative import declarative_base
 
-from .database import engine
+from .database import log_engine_profile
+from .warmup import FirstRequestTimer, run_warmup
+from .invalidation import start_listener, stop_listener
+from .client import close_client_session
+from .executor import shutdown_executor
+from .forecast import start_prefetcher, stop_prefetcher
 from .utils.exceptions import CustomValidationError
 
 from .api.biotope import route_biotope
@@ -19,6 +23,7 @@ from .api.school import route_school
 from .api.police import route_police
 from .api.xplan import route_xplan
 from .api.tree import route_street_tree
+from .api.system import route_system
 
 
 app = FastAPI(
@@ -31,16 +36,24 @@ app = FastAPI(
         'https://oklabflensburg.de'
     )
 )
-Base = declarative_base()
-
+app.add_middleware(FirstRequestTimer)
 app.mount('/static', StaticFiles(directory='static'), name='static')
 
 
 @app.on_event('startup')
-async def init_schemas():
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.drop_all)
-        await conn.run_sync(Base.metadata.create_all)
+async def warmup():
+    log_engine_profile()
+    await start_listener()
+    start_prefetcher()
+    await run_warmup(app)
+
+
+@app.on_event('shutdown')
+async def shutdown():
+    await stop_listener()
+    await stop_prefetcher()
+    await close_client_session()
+    shutdown_executor()
 
 
 @app.get('/', include_in_schema=False)
@@ -80,3 +93,4 @@ app.include_router(route_administrative)
 app.include_router(route_demographic)
 app.include_router(route_energy)
 app.include_router(route_street_tree)
+app.include_router(route_system)
@@ -189,3 +189,30 @@ class VG25Lan(SQLModel, table=True):
     model_config = {
         "arbitrary_types_allowed": True
     }
+
+
+class VG25Simplified(SQLModel, table=True):
+    __tablename__ = 'vg25_simplified'
+    __table_args__ = {'schema': 'public'}
+
+    level: str = Field(primary_key=True)
+    boundary_id: int = Field(primary_key=True)
+    tolerance: float = Field(primary_key=True)
+    key: Optional[str] = None
+    name: Optional[str] = None
+    gf: Optional[int] = None
+    xmin: Optional[float] = None
+    ymin: Optional[float] = None
+    xmax: Optional[float] = None
+    ymax: Optional[float] = None
+    shape_area: Optional[float] = None
+    geom: Optional[Geometry] = Field(
+        default=None,
+        sa_column=Column(
+            Geometry('MULTIPOLYGON', srid=4326)
+        )
+    )
+
+    model_config = {
+        'arbitrary_types_allowed': True
+    }
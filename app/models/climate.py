@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, Numeric, String, TIMESTAMP, Date
+from sqlalchemy import Column, Integer, Numeric, String, TIMESTAMP, Date, REAL
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.declarative import declarative_base
 from geoalchemy2 import Geometry
 
@@ -50,3 +51,32 @@ class MosmixStation(Base):
     longitude = Column(Numeric, nullable=False)
     station_elevation = Column(Integer)
     wkb_geometry = Column(Geometry('POINT', srid=4326))
+
+
+class MosmixElement(Base):
+    __tablename__ = 'de_mosmix_element'
+
+    id = Column(Integer, primary_key=True)
+    element_code = Column(String, nullable=False, unique=True)
+    element_label = Column(String)
+    element_unit = Column(String)
+
+
+class MosmixIssue(Base):
+    __tablename__ = 'global_mosmix_issues'
+
+    issue_time = Column(TIMESTAMP(timezone=True), primary_key=True)
+    product_id = Column(String)
+    generating_process = Column(String)
+    time_steps = Column(ARRAY(TIMESTAMP(timezone=True)), nullable=False)
+    station_count = Column(Integer, nullable=False)
+    loaded_at = Column(TIMESTAMP(timezone=True), nullable=False)
+
+
+class MosmixForecast(Base):
+    __tablename__ = 'global_mosmix_forecasts'
+
+    issue_time = Column(TIMESTAMP(timezone=True), primary_key=True)
+    station_id = Column(String, primary_key=True)
+    element_name = Column(String, primary_key=True)
+    forecast_values = Column(ARRAY(REAL), nullable=False)
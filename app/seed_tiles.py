@@ -0,0 +1,116 @@
+import time
+import click
+import asyncio
+import multiprocessing
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .database import async_session, engine
+from .services.tile import TILE_LAYERS, get_tile
+from .tilestore import get_tile_store
+from .utils.tile import get_tile_range
+
+
+# bounding box of Germany in WGS84
+GERMANY_BBOX = '5.87,47.27,15.04,55.06'
+
+
+async def render_chunk(layer: str, tiles: list) -> list:
+    rendered = []
+
+    try:
+        async with async_session() as session:
+            for z, x, y in tiles:
+                tile = await get_tile(session, layer, z, x, y)
+                rendered.append((z, x, y, tile))
+    finally:
+        # the next chunk runs in a new event loop
+        await engine.dispose()
+
+    return rendered
+
+
+def seed_chunk(layer: str, tiles: list) -> tuple:
+    store = get_tile_store(layer)
+
+    # a chunk rendered while the layer was reloaded is not stored
+    generation = store.get_generation()
+    rendered = asyncio.run(render_chunk(layer, tiles))
+    store.put_many(rendered, generation)
+
+    empty = sum(1 for *_, tile in rendered if not tile)
+
+    return len(rendered), empty
+
+
+def get_chunks(layer: str, bbox: tuple, min_zoom: int, max_zoom: int, chunk_size: int):
+    min_zoom = max(min_zoom, TILE_LAYERS[layer]['min_zoom'])
+    chunk = []
+
+    for z in range(min_zoom, max_zoom + 1):
+        xs, ys = get_tile_range(*bbox, z)
+
+        for x in xs:
+            for y in ys:
+                chunk.append((z, x, y))
+
+                if len(chunk) == chunk_size:
+                    yield chunk
+                    chunk = []
+
+    if chunk:
+        yield chunk
+
+
+@click.command()
+@click.option('--layer', '-l', type=click.Choice(sorted(TILE_LAYERS)), required=True, help='Tile layer to seed')
+@click.option('--bbox', '-b', type=str, default=GERMANY_BBOX, help='Bounding box as xmin,ymin,xmax,ymax in WGS84')
+@click.option('--min-zoom', type=click.IntRange(0, 22), default=0, help='Lowest zoom level to render')
+@click.option('--max-zoom', type=click.IntRange(0, 22), default=12, help='Highest zoom level to render')
+@click.option('--processes', '-p', type=int, default=multiprocessing.cpu_count(), help='Number of rendering processes')
+@click.option('--chunk-size', '-c', type=int, default=256, help='Tiles rendered per task')
+@click.option('--clear', is_flag=True, help='Remove all stored tiles of the layer first')
+def main(layer, bbox, min_zoom, max_zoom, processes, chunk_size, clear):
+    store = get_tile_store(layer)
+
+    if store is None:
+        raise click.UsageError('TILE_CACHE_DIR is empty, the tile store is disabled')
+
+    bbox = tuple(float(value) for value in bbox.split(','))
+
+    # spawned workers do not inherit the sqlite connection of this process
+    context = multiprocessing.get_context('spawn')
+
+    if clear:
+        store.invalidate()
+
+    tiles = 0
+    empty = 0
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=processes, mp_context=context) as executor:
+        futures = [
+            executor.submit(seed_chunk, layer, chunk)
+            for chunk in get_chunks(layer, bbox, min_zoom, max_zoom, chunk_size)
+        ]
+
+        for future in as_completed(futures):
+            rendered, blank = future.result()
+            tiles += rendered
+            empty += blank
+
+            elapsed = time.perf_counter() - start
+            click.echo(f'{tiles} tiles rendered, {tiles / elapsed:.1f} tiles/s', err=True)
+
+    elapsed = time.perf_counter() - start
+
+    click.echo(f'layer:       {layer}')
+    click.echo(f'zoom levels: {min_zoom} to {max_zoom}')
+    click.echo(f'tiles:       {tiles} ({empty} empty)')
+    click.echo(f'seconds:     {elapsed:.1f}')
+    click.echo(f'throughput:  {tiles / elapsed if elapsed else 0:.1f} tiles/s')
+    click.echo(f'stored:      {store.count()} tiles in {store.path}')
+
+
+if __name__ == '__main__':
+    main()
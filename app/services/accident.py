@@ -51,3 +51,36 @@ async def get_accident_details_by_city(session: AsyncSession, query: str):
     result = await session.execute(sql)
 
     return result.scalars().all()
+
+
+async def stream_accident_points_by_city(
+    session: AsyncSession,
+    query: str,
+    chunk_size: int
+):
+    try:
+        value = sanitize_string(query.lower())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    stmt = text('''
+    SELECT
+        ap.ujahr, ap.ustunde, ap.uwochentag, ap.umonat, ap.uland, ap.uart,
+        ap.utyp1, ap.ukategorie, ap.ulichtverh, ap.istrad, ap.istpkw,
+        ap.istfuss, ap.istgkfz, ap.istkrad, ap.istsonstig,
+        ST_AsGeoJSON(ap.geom)::jsonb AS geojson
+    FROM vg250_gem AS vg
+
+    JOIN de_accident_points AS ap
+    ON ST_Within(ap.geom, vg.geom)
+
+    WHERE LOWER(vg.gen) = :q
+    AND vg.gf = 4
+    ''')
+
+    # server side cursor, only one chunk of rows is held in memory at a time
+    sql = stmt.bindparams(q=value).execution_options(yield_per=chunk_size)
+    result = await session.stream(sql)
+
+    async for rows in result.mappings().partitions():
+        yield rows
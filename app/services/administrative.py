@@ -3,9 +3,10 @@ from sqlalchemy.sql import case
 from sqlalchemy.sql.sqltypes import String
 from sqlalchemy.future import select
 from sqlalchemy.sql.expression import cast, literal
-from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 
+from ..utils.geometry import GEOMETRY_PRECISION, GeometryOptions, geometry_column
 from ..utils.validators import validate_not_none
 from ..utils.sanitizer import sanitize_string
 
@@ -15,14 +16,16 @@ from ..models.administrative import (
     Flurstueck,
     VG25Gem,
     VG25Krs,
-    VG25Lan
+    VG25Lan,
+    VG25Simplified
 )
 
 
 async def get_parcel_meta_by_lat_lng(
     session: AsyncSession,
     lat: float,
-    lng: float
+    lng: float,
+    options: GeometryOptions = GeometryOptions()
 ):
     point = func.ST_SetSRID(func.ST_MakePoint(lng, lat), 4326)
 
@@ -42,9 +45,7 @@ async def get_parcel_meta_by_lat_lng(
         func.ST_Area(func.ST_Transform(Flurstueck.geometrie, 3587)) / 10000
     ).label('area_hectares')
 
-    geojson = func.ST_AsGeoJSON(
-        Flurstueck.geometrie, 15
-    ).cast(JSONB).label('geojson')
+    geojson = geometry_column(Flurstueck.geometrie, options).label('geojson')
 
     stmt = (
         select(
@@ -80,38 +81,96 @@ async def get_parcel_meta_by_lat_lng(
     return result.mappings().all()
 
 
+def get_simplified_boundary(model, level: str, tolerance: float):
+    """
+    Returns the precomputed simplification of the rows of model at
+    tolerance and the condition to outer join it.
+    """
+    simplified = aliased(VG25Simplified)
+
+    onclause = (
+        (simplified.level == level) &
+        (simplified.boundary_id == model.id) &
+        (simplified.tolerance == tolerance)
+    )
+
+    return simplified, onclause
+
+
+def get_municipality_columns(
+    bbox: list,
+    options: GeometryOptions,
+    simplified=None
+) -> list:
+    area = func.ST_Area(func.ST_Transform(VG25Gem.geom, 3587))
+    geom = VG25Gem.geom
+
+    # the full geometry stays the fallback until the view is refreshed
+    if simplified is not None:
+        area = func.coalesce(simplified.shape_area, area)
+        geom = func.coalesce(simplified.geom, geom)
+        bbox = [
+            func.coalesce(simplified.xmin, bbox[0]),
+            func.coalesce(simplified.ymin, bbox[1]),
+            func.coalesce(simplified.xmax, bbox[2]),
+            func.coalesce(simplified.ymax, bbox[3])
+        ]
+
+    return [
+        VG25Gem.ags.label('municipality_key'),
+        MunicipalityKey.municipality_name.label('municipality_name'),
+        VG25Gem.gen.label('geographical_name'),
+        func.to_char(VG25Gem.beginn, 'DD.MM.YYYY').label('date_of_entry'),
+        area.label('shape_area'),
+        func.jsonb_build_object(
+            'xmin', bbox[0],
+            'ymin', bbox[1],
+            'xmax', bbox[2],
+            'ymax', bbox[3],
+        ).label('bbox'),
+        geometry_column(geom, options).label('geojson'),
+    ]
+
+
 async def get_municipality_by_key(
     session: AsyncSession,
-    municipality_key: str
+    municipality_key: str,
+    options: GeometryOptions = GeometryOptions(),
+    tolerance: float | None = None
 ):
     validated_key = validate_not_none(municipality_key)
     validated_key = sanitize_string(validated_key.lower())
 
-    bbox_cte = (
-        select(
-            VG25Gem.ags.label('ags'),
-            func.ST_Extent(VG25Gem.geom).label('bbox')
+    simplified = None
+
+    if tolerance is None:
+        bbox_cte = (
+            select(
+                VG25Gem.ags.label('ags'),
+                func.ST_Extent(VG25Gem.geom).label('bbox')
+            )
+            .group_by(VG25Gem.ags)
+            .cte('agg')
         )
-        .group_by(VG25Gem.ags)
-        .cte('agg')
-    )
+
+        bbox = [
+            func.ST_XMin(bbox_cte.c.bbox),
+            func.ST_YMin(bbox_cte.c.bbox),
+            func.ST_XMax(bbox_cte.c.bbox),
+            func.ST_YMax(bbox_cte.c.bbox)
+        ]
+    else:
+        simplified, onclause = get_simplified_boundary(VG25Gem, 'municipality', tolerance)
+
+        bbox = [
+            func.ST_XMin(VG25Gem.geom),
+            func.ST_YMin(VG25Gem.geom),
+            func.ST_XMax(VG25Gem.geom),
+            func.ST_YMax(VG25Gem.geom)
+        ]
 
     stmt = (
-        select(
-            VG25Gem.ags.label('municipality_key'),
-            MunicipalityKey.municipality_name.label('municipality_name'),
-            VG25Gem.gen.label('geographical_name'),
-            func.to_char(VG25Gem.beginn, 'DD.MM.YYYY').label('date_of_entry'),
-            func.ST_Area(func.ST_Transform(
-                VG25Gem.geom, 3587)).label('shape_area'),
-            func.jsonb_build_object(
-                'xmin', func.ST_XMin(bbox_cte.c.bbox),
-                'ymin', func.ST_YMin(bbox_cte.c.bbox),
-                'xmax', func.ST_XMax(bbox_cte.c.bbox),
-                'ymax', func.ST_YMax(bbox_cte.c.bbox),
-            ).label('bbox'),
-            cast(func.ST_AsGeoJSON(VG25Gem.geom, 15), JSONB).label('geojson'),
-        )
+        select(*get_municipality_columns(bbox, options, simplified))
         .select_from(MunicipalityKey)
         .outerjoin(
             VG25Gem,
@@ -121,13 +180,15 @@ async def get_municipality_by_key(
                 VG25Gem.gf == 9
             )
         )
-        .outerjoin(
-            bbox_cte,
-            VG25Gem.ags == bbox_cte.c.ags
-        )
-        .where(MunicipalityKey.municipality_key == validated_key)
     )
 
+    if simplified is None:
+        stmt = stmt.outerjoin(bbox_cte, VG25Gem.ags == bbox_cte.c.ags)
+    else:
+        stmt = stmt.outerjoin(simplified, onclause)
+
+    stmt = stmt.where(MunicipalityKey.municipality_key == validated_key)
+
     result = await session.execute(stmt)
 
     return result.mappings().all()
@@ -135,27 +196,27 @@ async def get_municipality_by_key(
 
 async def get_municipality_by_name(
     session: AsyncSession,
-    municipality_name: str
+    municipality_name: str,
+    options: GeometryOptions = GeometryOptions(),
+    tolerance: float | None = None
 ):
     validated_name = validate_not_none(municipality_name)
     validated_name = sanitize_string(validated_name.lower())
 
+    bbox = [
+        func.ST_XMin(VG25Gem.geom),
+        func.ST_YMin(VG25Gem.geom),
+        func.ST_XMax(VG25Gem.geom),
+        func.ST_YMax(VG25Gem.geom)
+    ]
+
+    simplified = None
+
+    if tolerance is not None:
+        simplified, onclause = get_simplified_boundary(VG25Gem, 'municipality', tolerance)
+
     stmt = (
-        select(
-            VG25Gem.ags.label('municipality_key'),
-            MunicipalityKey.municipality_name.label('municipality_name'),
-            VG25Gem.gen.label('geographical_name'),
-            func.to_char(VG25Gem.beginn, 'DD.MM.YYYY').label('date_of_entry'),
-            func.ST_Area(func.ST_Transform(
-                VG25Gem.geom, 3587)).label('shape_area'),
-            func.jsonb_build_object(
-                'xmin', func.ST_XMin(VG25Gem.geom),
-                'ymin', func.ST_YMin(VG25Gem.geom),
-                'xmax', func.ST_XMax(VG25Gem.geom),
-                'ymax', func.ST_YMax(VG25Gem.geom),
-            ).label('bbox'),
-            cast(func.ST_AsGeoJSON(VG25Gem.geom, 15), JSONB).label('geojson'),
-        )
+        select(*get_municipality_columns(bbox, options, simplified))
         .select_from(VG25Gem)
         .outerjoin(
             MunicipalityKey,
@@ -164,6 +225,9 @@ async def get_municipality_by_name(
         .where(func.lower(VG25Gem.gen).like(validated_name))
     )
 
+    if simplified is not None:
+        stmt = stmt.outerjoin(simplified, onclause)
+
     result = await session.execute(stmt)
     return result.mappings().all()
 
@@ -222,3 +286,55 @@ async def get_municipality_by_query(
 
     result = await session.execute(stmt)
     return result.mappings().all()
+
+
+async def get_municipality_boundaries(
+    session: AsyncSession,
+    district_key: str
+):
+    validated_key = validate_not_none(district_key)
+    validated_key = sanitize_string(validated_key)
+
+    stmt = (
+        select(
+            VG25Gem.ags.label('id'),
+            VG25Gem.gen.label('geographical_name'),
+            VG25Gem.bez.label('designation'),
+            func.ST_AsGeoJSON(VG25Gem.geom, GEOMETRY_PRECISION).label('geojson')
+        )
+        .where(
+            (VG25Gem.sn_l == validated_key[:2]) &
+            (VG25Gem.sn_r == validated_key[2:3]) &
+            (VG25Gem.sn_k == validated_key[3:5]) &
+            (VG25Gem.gf == 9)
+        )
+        .order_by(VG25Gem.ags)
+    )
+
+    result = await session.execute(stmt)
+    return result.mappings().all()
+
+
+async def get_district_boundaries(
+    session: AsyncSession,
+    state_key: str
+):
+    validated_key = validate_not_none(state_key)
+    validated_key = sanitize_string(validated_key)
+
+    stmt = (
+        select(
+            VG25Krs.ags.label('id'),
+            VG25Krs.gen.label('geographical_name'),
+            VG25Krs.bez.label('designation'),
+            func.ST_AsGeoJSON(VG25Krs.geom, GEOMETRY_PRECISION).label('geojson')
+        )
+        .where(
+            (VG25Krs.sn_l == validated_key) &
+            (VG25Krs.gf == 9)
+        )
+        .order_by(VG25Krs.ags)
+    )
+
+    result = await session.execute(stmt)
+    return result.mappings().all()
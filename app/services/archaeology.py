@@ -1,12 +1,13 @@
 from sqlalchemy.sql import func, text
-from sqlalchemy.types import JSON
 from sqlalchemy.future import select
-from sqlalchemy.sql.expression import cast
+from sqlalchemy.sql.expression import type_coerce
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException
 
 from ..utils.parser import parse_date
 from ..utils.validators import validate_positive_int32, validate_not_none
+from ..utils.geometry import GEOMETRY_PRECISION
+from ..utils.serializer import GeoJSON
 
 from ..models.archaeology import (
     ArchaeologicalMonument,
@@ -48,7 +49,7 @@ async def get_archaeological_monument(session: AsyncSession, filters: dict):
             ArchaeologicalMonument.status,
             ArchaeologicalMonument.heritage_authority,
             ArchaeologicalMonument.municipality_key,
-            cast(func.ST_AsGeoJSON(ArchaeologicalMonument.wkb_geometry, 15), JSON).label(
+            type_coerce(func.ST_AsGeoJSON(ArchaeologicalMonument.wkb_geometry, GEOMETRY_PRECISION), GeoJSON).label(
                 'geojson')
         )
         .join(cte_stmt, ArchaeologicalMonument.id == cte_stmt.c.monument_id, isouter=True)
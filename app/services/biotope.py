@@ -3,6 +3,7 @@ from sqlalchemy.future import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..models.biotope import ShBiotopeOrigin
+from ..utils.geometry import GeometryOptions, geometry_sql, geometry_type
 from ..utils.sanitizer import sanitize_string
 
 
@@ -24,9 +25,10 @@ async def get_biotope_origin_meta(
 async def get_biotope_meta_by_lat_lng(
     session: AsyncSession,
     lat: float,
-    lng: float
+    lng: float,
+    options: GeometryOptions = GeometryOptions()
 ):
-    stmt = text('''
+    stmt = text(f'''
     SELECT
         bm.code,
         bm.designation,
@@ -49,7 +51,7 @@ async def get_biotope_meta_by_lat_lng(
         ht2.label AS habitat_label_2,
         b.gemeindename AS place_name,
         ST_Area(ST_Transform(b.wkb_geometry, 3587)) AS shape_area,
-        ST_AsGeoJSON(b.wkb_geometry, 15)::jsonb AS geojson
+        {geometry_sql('b.wkb_geometry', options)} AS geojson
     FROM
         sh_biotope AS b
     JOIN
@@ -65,7 +67,7 @@ async def get_biotope_meta_by_lat_lng(
         ST_Contains(b.wkb_geometry, ST_SetSRID(ST_MakePoint(:lng, :lat), 4326))
     ''')
 
-    sql = stmt.bindparams(lat=lat, lng=lng)
+    sql = stmt.bindparams(lat=lat, lng=lng).columns(geojson=geometry_type(options))
     result = await session.execute(sql)
 
     return result.mappings().all()
@@ -1,28 +1,31 @@
+from datetime import datetime
 from sqlalchemy.sql import func, text, bindparam
 from sqlalchemy.types import JSON
 from sqlalchemy.sql.expression import cast
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import aliased
-from geoalchemy2 import Geography
 
 from ..utils.validators import validate_not_none
 from ..utils.sanitizer import sanitize_string
+from ..utils.geometry import GEOMETRY_PRECISION, GeometryOptions, geometry_column
 
 from ..models.climate import (
     DwdStationReference,
     WeatherStation,
-    MosmixStation
+    MosmixStation,
+    MosmixElement,
+    MosmixIssue,
+    MosmixForecast
 )
 
 from ..models.administrative import VG25Gem
 
 
-async def get_all_mosmix_stations(session: AsyncSession):
+async def get_all_mosmix_stations(session: AsyncSession, options: GeometryOptions = GeometryOptions()):
     model = MosmixStation
 
-    geojson = cast(func.ST_AsGeoJSON(
-        model.wkb_geometry, 15), JSON).label('geojson')
+    geojson = geometry_column(model.wkb_geometry, options).label('geojson')
 
     query = select(
         model.station_id,
@@ -39,13 +42,13 @@ async def get_all_mosmix_stations(session: AsyncSession):
 
 async def get_dwd_stations_by_municipality_key(
     session: AsyncSession,
-    municipality_key: str
+    municipality_key: str,
+    options: GeometryOptions = GeometryOptions()
 ):
     validated_key = validate_not_none(municipality_key)
     validated_key = sanitize_string(validated_key)
 
-    geojson = cast(func.ST_AsGeoJSON(
-        DwdStationReference.wkb_geometry, 15), JSON).label('geojson')
+    geojson = geometry_column(DwdStationReference.wkb_geometry, options).label('geojson')
     gem_alias = aliased(VG25Gem)
 
     stmt = (
@@ -80,11 +83,10 @@ async def get_dwd_stations_by_municipality_key(
     return result.mappings().all()
 
 
-async def get_weather_service_stations(session: AsyncSession):
+async def get_weather_service_stations(session: AsyncSession, options: GeometryOptions = GeometryOptions()):
     model = WeatherStation
 
-    geojson = cast(func.ST_AsGeoJSON(
-        model.wkb_geometry, 15), JSON).label('geojson')
+    geojson = geometry_column(model.wkb_geometry, options).label('geojson')
 
     query = select(
         model.station_id,
@@ -102,129 +104,141 @@ async def get_weather_service_stations(session: AsyncSession):
     return result.mappings().all()
 
 
-async def get_mosmix_geometries_by_bbox(
-    session: AsyncSession,
-    xmin: float,
-    ymin: float,
-    xmax: float,
-    ymax: float
-):
+async def get_mosmix_station_points(session: AsyncSession):
     model = MosmixStation
 
     geojson = cast(func.ST_AsGeoJSON(
-        model.wkb_geometry, 15), JSON).label('geojson')
-
-    envelope = func.ST_MakeEnvelope(
-        bindparam('xmin'),
-        bindparam('ymin'),
-        bindparam('xmax'),
-        bindparam('ymax'),
-        4326
-    )
+        model.wkb_geometry, GEOMETRY_PRECISION), JSON).label('geojson')
 
     stmt = (
         select(
             model.station_id,
             model.station_name,
+            model.latitude,
+            model.longitude,
             model.station_elevation,
+            func.ST_Y(model.wkb_geometry).label('lat'),
+            func.ST_X(model.wkb_geometry).label('lng'),
             geojson
         )
         .where(
-            func.ST_WITHIN(model.wkb_geometry, envelope),
             func.ST_IsValid(model.wkb_geometry)
         )
     )
 
-    result = await session.execute(
-        stmt,
-        {'xmin': xmin, 'ymin': ymin, 'xmax': xmax, 'ymax': ymax}
-    )
+    result = await session.execute(stmt)
 
-    rows = result.mappings().all()
-
-    return rows
+    return result.mappings().all()
 
 
-async def get_mosmix_geometries_by_radius(
-    session: AsyncSession,
-    lat: float,
-    lng: float,
-    radius: float
-):
-    model = MosmixStation
+async def get_weather_station_points(session: AsyncSession):
+    model = WeatherStation
 
     geojson = cast(func.ST_AsGeoJSON(
-        model.wkb_geometry, 15), JSON).label('geojson')
-
-    point = func.ST_SetSRID(func.ST_MakePoint(
-        bindparam('lng'),
-        bindparam('lat')
-    ), 4326)
+        model.wkb_geometry, GEOMETRY_PRECISION), JSON).label('geojson')
 
     stmt = (
         select(
             model.station_id,
+            func.to_char(model.start_date, 'DD.MM.YYYY').label('start_date'),
+            func.to_char(model.end_date, 'DD.MM.YYYY').label('end_date'),
+            model.station_elevation,
             model.station_name,
+            model.state_name,
+            model.submission,
+            func.ST_Y(model.wkb_geometry).label('lat'),
+            func.ST_X(model.wkb_geometry).label('lng'),
             geojson
         )
         .where(
-            func.ST_DWithin(
-                cast(model.wkb_geometry, Geography),
-                cast(point, Geography),
-                bindparam('radius')
-            ),
             func.ST_IsValid(model.wkb_geometry)
         )
     )
 
-    result = await session.execute(
-        stmt,
-        {'lat': lat, 'lng': lng, 'radius': radius}
+    result = await session.execute(stmt)
+
+    return result.mappings().all()
+
+
+async def get_mosmix_station_ids(session: AsyncSession, station_ids: list):
+    model = MosmixStation
+
+    stmt = (
+        select(model.station_id)
+        .where(model.station_id.in_(bindparam('station_ids', expanding=True)))
+        .order_by(model.station_id)
     )
 
-    rows = result.mappings().all()
+    result = await session.execute(stmt, {'station_ids': station_ids})
 
-    return rows
+    return result.scalars().all()
 
 
-async def get_mosmix_nearest_geometriey_by_position(
-    session: AsyncSession,
-    lat: float,
-    lng: float
-):
-    model = MosmixStation
+async def get_mosmix_elements(session: AsyncSession):
+    model = MosmixElement
 
-    geojson = cast(func.ST_AsGeoJSON(
-        model.wkb_geometry, 15), JSON).label('geojson')
+    query = select(
+        model.element_code,
+        model.element_label,
+        model.element_unit
+    ).order_by(model.element_code)
 
-    point = func.ST_SetSRID(func.ST_MakePoint(
-        bindparam('lng'),
-        bindparam('lat')
-    ), 4326)
+    result = await session.execute(query)
 
-    stmt = (
+    return result.mappings().all()
+
+
+async def get_mosmix_issue(session: AsyncSession, issue_time: datetime = None):
+    stmt = select(MosmixIssue.issue_time, MosmixIssue.time_steps)
+
+    if issue_time is None:
+        stmt = stmt.order_by(MosmixIssue.issue_time.desc()).limit(1)
+    else:
+        stmt = stmt.where(MosmixIssue.issue_time == bindparam('issue_time'))
+
+    result = await session.execute(stmt, {'issue_time': issue_time})
+
+    return result.mappings().first()
+
+
+async def get_mosmix_forecasts_by_station(
+    session: AsyncSession,
+    issue_time: datetime,
+    station_id: str,
+    elements: tuple = None
+):
+    station = (
         select(
-            model.station_id,
-            model.station_name,
-            geojson
+            MosmixStation.station_id,
+            MosmixStation.station_name,
+            MosmixStation.latitude,
+            MosmixStation.longitude,
+            MosmixStation.station_elevation
         )
-        .where(
-            func.ST_IsValid(model.wkb_geometry)
+        .where(MosmixStation.station_id == bindparam('station_id'))
+    )
+
+    # the issue time is bound as a value, only its partition is scanned
+    forecasts = (
+        select(
+            MosmixForecast.element_name,
+            MosmixForecast.forecast_values
         )
-        .order_by(
-            func.ST_Distance(
-                cast(model.wkb_geometry, Geography),
-                cast(point, Geography)
-            )
+        .where(
+            MosmixForecast.issue_time == bindparam('issue_time'),
+            MosmixForecast.station_id == bindparam('station_id')
         )
-        .limit(1)
     )
 
-    result = await session.execute(
-        stmt,
-        {'lat': lat, 'lng': lng}
-    )
+    params = {'issue_time': issue_time, 'station_id': station_id}
+
+    if elements is not None:
+        forecasts = forecasts.where(
+            MosmixForecast.element_name.in_(bindparam('elements', expanding=True))
+        )
+        params['elements'] = list(elements)
 
-    rows = result.mappings().first()
+    station_row = (await session.execute(station, params)).mappings().first()
+    forecast_rows = (await session.execute(forecasts, params)).mappings().all()
 
-    return rows
+    return station_row, forecast_rows
@@ -1,8 +1,10 @@
+from sqlalchemy import func
 from sqlalchemy.sql import text
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from fastapi import HTTPException
 
+from ..utils.geometry import GEOMETRY_PRECISION
 from ..utils.validators import validate_positive_int32, validate_not_none
 from ..models.demographic import (
     DebtCounselingOfResidents,
@@ -253,6 +255,23 @@ async def get_districts(session: AsyncSession):
     return result.mappings().all()
 
 
+async def get_district_boundaries(session: AsyncSession):
+    model = District
+
+    stmt = (
+        select(
+            model.id.label('id'),
+            model.name.label('district_name'),
+            func.ST_AsGeoJSON(model.wkb_geometry, GEOMETRY_PRECISION).label('geojson')
+        )
+        .order_by(model.id)
+    )
+
+    result = await session.execute(stmt)
+
+    return result.mappings().all()
+
+
 async def get_district(session: AsyncSession, district_id: int):
     validated_district_id = validate_not_none(district_id)
     validated_district_id = validate_positive_int32(validated_district_id)
@@ -2,15 +2,26 @@ from sqlalchemy.sql import text
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException
 
+from ..utils.geojson import feature_collection_sql
+from ..utils.geometry import GEOMETRY_PRECISION, GeometryOptions, geometry_sql, geometry_type
 from ..utils.validators import validate_positive_int32, validate_utf8_string
 
 
-async def get_monument_by_slug(session: AsyncSession, slug: str):
+# features of the bounds and radius collections, assembled by PostgreSQL
+MONUMENT_FEATURE = '''json_build_object(
+            'type', 'Feature',
+            'id', m.id,
+            'geometry', m.geom::json,
+            'properties', json_build_object('label', m.label)
+        )'''
+
+
+async def get_monument_by_slug(session: AsyncSession, slug: str, options: GeometryOptions = GeometryOptions()):
     validated_slug = validate_utf8_string(slug)
 
-    stmt = text('''
+    stmt = text(f'''
     SELECT
-        ST_AsGeoJSON(b.polygon_center, 15)::jsonb AS geojson,
+        {geometry_sql('b.polygon_center', options)} AS geojson,
         COALESCE(
             NULLIF(b.street, '') || ' ' || NULLIF(b.housenumber, ''),
             NULLIF(b.street, '')
@@ -44,7 +55,7 @@ async def get_monument_by_slug(session: AsyncSession, slug: str):
         b.slug = :slug
     ''')
 
-    sql = stmt.bindparams(slug=validated_slug)
+    sql = stmt.bindparams(slug=validated_slug).columns(geojson=geometry_type(options))
     result = await session.execute(sql)
     rows = result.mappings().all()
 
@@ -53,11 +64,12 @@ async def get_monument_by_slug(session: AsyncSession, slug: str):
 
 async def get_monument_by_object_number(
     session: AsyncSession,
-    object_number: str
+    object_number: str,
+    options: GeometryOptions = GeometryOptions()
 ):
-    stmt = text('''
+    stmt = text(f'''
     SELECT
-        ST_AsGeoJSON(b.polygon_center, 15)::jsonb AS geojson,
+        {geometry_sql('b.polygon_center', options)} AS geojson,
         COALESCE(
             NULLIF(b.street, '') || ' ' || NULLIF(b.housenumber, ''),
             NULLIF(b.street, '')
@@ -90,22 +102,22 @@ async def get_monument_by_object_number(
         b.object_number = :object_number
     ''')
 
-    sql = stmt.bindparams(object_number=object_number)
+    sql = stmt.bindparams(object_number=object_number).columns(geojson=geometry_type(options))
     result = await session.execute(sql)
     rows = result.mappings().all()
 
     return [dict(row) for row in rows]
 
 
-async def get_monument_by_id(session: AsyncSession, monument_id: int):
+async def get_monument_by_id(session: AsyncSession, monument_id: int, options: GeometryOptions = GeometryOptions()):
     try:
         validated_monument_id = validate_positive_int32(monument_id)
     except ValueError as e:
         raise HTTPException(status_code=422, detail=str(e))
 
-    stmt = text('''
+    stmt = text(f'''
     SELECT
-        ST_AsGeoJSON(b.polygon_center, 15)::jsonb AS geojson,
+        {geometry_sql('b.polygon_center', options)} AS geojson,
         COALESCE(
             NULLIF(b.street, '') || ' ' || NULLIF(b.housenumber, ''),
             NULLIF(b.street, '')
@@ -139,7 +151,7 @@ async def get_monument_by_id(session: AsyncSession, monument_id: int):
         b.id = :monument_id
     ''')
 
-    sql = stmt.bindparams(monument_id=validated_monument_id)
+    sql = stmt.bindparams(monument_id=validated_monument_id).columns(geojson=geometry_type(options))
     result = await session.execute(sql)
     rows = result.mappings().all()
 
@@ -153,30 +165,33 @@ async def get_monument_geometries_by_bbox(
     xmax: float,
     ymax: float
 ):
-    stmt = text('''
+    stmt = text(f'''
     SELECT
-        id,
-        ST_AsGeoJSON(polygon_center) AS geom,
-        COALESCE(
-            NULLIF(street, '') || ' ' || NULLIF(housenumber, ''),
-            NULLIF(street, '')
-        ) AS label
-    FROM
-        sh_monument_boundary_processed
-    WHERE
-        ST_WITHIN(
-            polygon_center,
-            ST_MakeEnvelope(:xmin, :ymin, :xmax, :ymax, 4326)
-        )
-        AND ST_IsValid(polygon_center)
-        AND ST_IsSimple(polygon_center)
+        {feature_collection_sql(MONUMENT_FEATURE, crs=False)}
+    FROM (
+        SELECT
+            id,
+            ST_AsGeoJSON(polygon_center, {GEOMETRY_PRECISION}) AS geom,
+            COALESCE(
+                NULLIF(street, '') || ' ' || NULLIF(housenumber, ''),
+                NULLIF(street, '')
+            ) AS label
+        FROM
+            sh_monument_boundary_processed
+        WHERE
+            ST_WITHIN(
+                polygon_center,
+                ST_MakeEnvelope(:xmin, :ymin, :xmax, :ymax, 4326)
+            )
+            AND ST_IsValid(polygon_center)
+            AND ST_IsSimple(polygon_center)
+    ) AS m
     ''')
 
     sql = stmt.bindparams(xmin=xmin, ymin=ymin, xmax=xmax, ymax=ymax)
     result = await session.execute(sql)
-    rows = result.mappings().all()
 
-    return [dict(row) for row in rows]
+    return result.scalar()
 
 
 async def get_monument_geometries_by_lat_lng(
@@ -185,28 +200,31 @@ async def get_monument_geometries_by_lat_lng(
     lng: float,
     radius: float = 1000
 ):
-    stmt = text('''
+    stmt = text(f'''
     SELECT
-        id,
-        ST_AsGeoJSON(polygon_center) AS geom,
-        COALESCE(
-            NULLIF(street, '') || ' ' || NULLIF(housenumber, ''),
-            NULLIF(street, '')
-        ) AS label
-    FROM
-        sh_monument_boundary_processed
-    WHERE
-        ST_DWithin(
-            polygon_center::geography,
-            ST_SetSRID(ST_MakePoint(:lng, :lat), 4326)::geography,
-            :radius
-        )
-        AND ST_IsValid(polygon_center)
-        AND ST_IsSimple(polygon_center)
+        {feature_collection_sql(MONUMENT_FEATURE, crs=False)}
+    FROM (
+        SELECT
+            id,
+            ST_AsGeoJSON(polygon_center, {GEOMETRY_PRECISION}) AS geom,
+            COALESCE(
+                NULLIF(street, '') || ' ' || NULLIF(housenumber, ''),
+                NULLIF(street, '')
+            ) AS label
+        FROM
+            sh_monument_boundary_processed
+        WHERE
+            ST_DWithin(
+                polygon_center::geography,
+                ST_SetSRID(ST_MakePoint(:lng, :lat), 4326)::geography,
+                :radius
+            )
+            AND ST_IsValid(polygon_center)
+            AND ST_IsSimple(polygon_center)
+    ) AS m
     ''')
 
     sql = stmt.bindparams(lat=lat, lng=lng, radius=radius)
     result = await session.execute(sql)
-    rows = result.mappings().all()
 
-    return [dict(row) for row in rows]
+    return result.scalar()
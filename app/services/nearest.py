@@ -0,0 +1,190 @@
+import json
+
+from sqlalchemy.sql import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .tile import TILE_LAYERS
+from ..utils.geometry import GeometryOptions, geometry_sql
+
+
+# lower bounds of the meters per degree on the spheroid, a box of radius
+# meters converted with them covers at least the circle of that radius
+METERS_PER_DEGREE_LAT = 110574
+METERS_PER_DEGREE_LNG = 111319
+
+# layers too large for the in-memory index of app/spatial.py
+NEAREST_LAYERS = (
+    'monument',
+    'combustion_unit',
+    'nuclear_unit',
+    'water_unit',
+    'biomass_unit',
+    'wind_unit',
+    'solar_unit'
+)
+
+
+def get_nearest_statement(layer: str, max_distance: float | None, options: GeometryOptions = GeometryOptions()):
+    """
+    Builds the nearest neighbour query of a layer. The candidates are
+    taken in order of the planar <-> operator, which the GiST index of the
+    geometry answers without sorting the table. Planar degrees overrate
+    the longitude, so the k-th smallest geography distance of the
+    candidates only bounds the search: every row within a box around that
+    radius is ranked by its exact geography distance. Without k candidates
+    the box spans the whole layer.
+    """
+    if layer not in NEAREST_LAYERS:
+        raise ValueError(f'Unknown nearest layer {layer}')
+
+    config = TILE_LAYERS[layer]
+    geometry = config['geometry']
+    columns = ',\n            '.join(config['columns'])
+
+    where = f'{geometry} IS NOT NULL'
+
+    if config.get('where'):
+        where = f'{where} AND {config["where"]}'
+
+    radius = 'radius' if max_distance is None else 'LEAST(radius, :max_distance)'
+    within = '\n    WHERE\n        distance <= :max_distance' if max_distance is not None else ''
+
+    return text(f'''
+    WITH origin AS (
+        SELECT
+            ST_SetSRID(ST_MakePoint(:lng, :lat), 4326) AS point
+    ),
+    nearest AS (
+        SELECT
+            ST_Distance(candidate::geography, origin.point::geography) AS distance
+        FROM (
+            SELECT
+                {geometry} AS candidate
+            FROM
+                {config['table']}
+            WHERE
+                {where}
+            ORDER BY
+                {geometry} <-> (SELECT point FROM origin)
+            LIMIT :candidates
+        ) AS candidates, origin
+        ORDER BY
+            distance
+        LIMIT :k
+    ),
+    bound AS (
+        SELECT
+            {radius} AS radius
+        FROM (
+            SELECT
+                CASE WHEN COUNT(*) = :k THEN MAX(distance) END AS radius
+            FROM
+                nearest
+        ) AS kth
+    ),
+    search AS (
+        SELECT
+            COALESCE(
+                ST_Expand(
+                    origin.point,
+                    LEAST(360, radius / ({METERS_PER_DEGREE_LNG} * cos(radians(LEAST(89.9, abs(:lat) + radius / {METERS_PER_DEGREE_LAT}))))),
+                    radius / {METERS_PER_DEGREE_LAT}
+                ),
+                ST_MakeEnvelope(-180, -90, 180, 90, 4326)
+            ) AS box
+        FROM
+            bound, origin
+    )
+    SELECT
+        *
+    FROM (
+        SELECT
+            {columns},
+            {geometry_sql(geometry, options)} AS geojson,
+            ST_Distance({geometry}::geography, origin.point::geography) AS distance
+        FROM
+            {config['table']}, origin
+        WHERE
+            {where}
+        AND
+            {geometry} && (SELECT box FROM search)
+    ) AS ranked{within}
+    ORDER BY
+        distance
+    LIMIT :k
+    ''')
+
+
+def get_nearest_params(lat: float, lng: float, k: int, candidates: int, max_distance: float | None) -> dict:
+    # more candidates than k tighten the bound of the exact search
+    params = {'lat': lat, 'lng': lng, 'k': k, 'candidates': max(2 * k, candidates)}
+
+    if max_distance is not None:
+        params['max_distance'] = max_distance
+
+    return params
+
+
+async def get_nearest_rows(
+    session: AsyncSession,
+    layer: str,
+    lat: float,
+    lng: float,
+    k: int = 1,
+    candidates: int = 16,
+    max_distance: float | None = None,
+    options: GeometryOptions = GeometryOptions()
+):
+    stmt = get_nearest_statement(layer, max_distance, options)
+    sql = stmt.bindparams(**get_nearest_params(lat, lng, k, candidates, max_distance))
+
+    result = await session.execute(sql)
+    rows = result.mappings().all()
+
+    return [dict(row) for row in rows]
+
+
+def get_plan_nodes(plan: dict):
+    yield plan
+
+    for child in plan.get('Plans', []):
+        yield from get_plan_nodes(child)
+
+
+async def explain_nearest(
+    session: AsyncSession,
+    layer: str,
+    lat: float,
+    lng: float,
+    k: int = 1,
+    candidates: int = 16,
+    max_distance: float | None = None
+) -> dict:
+    """
+    Returns the plan of the nearest query of a layer and whether the
+    candidates are read from an index of the layer table in <-> order.
+    """
+    stmt = get_nearest_statement(layer, max_distance)
+    explain = text(f'EXPLAIN (FORMAT JSON) {stmt.text}')
+    sql = explain.bindparams(**get_nearest_params(lat, lng, k, candidates, max_distance))
+
+    result = await session.execute(sql)
+    plan = result.scalar()
+
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    nodes = list(get_plan_nodes(plan[0]['Plan']))
+    table = TILE_LAYERS[layer]['table']
+
+    return {
+        'layer': layer,
+        'uses_index': any(
+            node['Node Type'] in ('Index Scan', 'Index Only Scan')
+            and node.get('Relation Name') == table
+            and '<->' in node.get('Order By', '')
+            for node in nodes
+        ),
+        'seq_scans': [node['Relation Name'] for node in nodes if node['Node Type'] == 'Seq Scan'],
+        'plan': plan[0]['Plan']
+    }
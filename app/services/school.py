@@ -2,15 +2,25 @@ from sqlalchemy.sql import text
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException
 
+from ..utils.geojson import feature_collection_sql
+from ..utils.geometry import GEOMETRY_PRECISION, GeometryOptions, geometry_sql, geometry_type
 from ..utils.validators import validate_positive_int32, validate_utf8_string
 
 
-async def get_school_by_slug(session: AsyncSession, slug: str):
+SCHOOL_FEATURE = '''json_build_object(
+            'type', 'Feature',
+            'id', s.id,
+            'geometry', s.geojson::json,
+            'properties', json_build_object('label', s.label, 'school_type', s.school_type)
+        )'''
+
+
+async def get_school_by_slug(session: AsyncSession, slug: str, options: GeometryOptions = GeometryOptions()):
     validated_slug = validate_utf8_string(slug)
 
-    stmt = text('''
+    stmt = text(f'''
     SELECT
-        ST_AsGeoJSON(s.wkb_geometry, 15)::jsonb AS geojson,
+        {geometry_sql('s.wkb_geometry', options)} AS geojson,
         s.id,
         s.name,
         s.city,
@@ -39,22 +49,22 @@ async def get_school_by_slug(session: AsyncSession, slug: str):
         s.id, st.name
     ''')
 
-    sql = stmt.bindparams(slug=validated_slug)
+    sql = stmt.bindparams(slug=validated_slug).columns(geojson=geometry_type(options))
     result = await session.execute(sql)
     rows = result.mappings().all()
 
     return rows
 
 
-async def get_school_by_id(session: AsyncSession, school_id: int):
+async def get_school_by_id(session: AsyncSession, school_id: int, options: GeometryOptions = GeometryOptions()):
     try:
         validated_school_id = validate_positive_int32(school_id)
     except ValueError as e:
         raise HTTPException(status_code=422, detail=str(e))
 
-    stmt = text('''
+    stmt = text(f'''
     SELECT
-        ST_AsGeoJSON(s.wkb_geometry, 15)::jsonb AS geojson,
+        {geometry_sql('s.wkb_geometry', options)} AS geojson,
         s.id,
         s.name,
         s.city,
@@ -83,70 +93,29 @@ async def get_school_by_id(session: AsyncSession, school_id: int):
         s.id, st.name
     ''')
 
-    sql = stmt.bindparams(school_id=validated_school_id)
-    result = await session.execute(sql)
-    rows = result.mappings().all()
-
-    return rows
-
-
-async def get_school_geometries_by_bbox(
-    session: AsyncSession,
-    xmin: float,
-    ymin: float,
-    xmax: float,
-    ymax: float
-):
-    stmt = text('''
-    SELECT
-        id,
-        school_type,
-        ST_AsGeoJSON(wkb_geometry, 15) AS geojson,
-        name AS label
-    FROM
-        sh_school
-    WHERE
-        ST_WITHIN(
-            wkb_geometry,
-            ST_MakeEnvelope(:xmin, :ymin, :xmax, :ymax, 4326)
-        )
-    AND
-        ST_IsValid(wkb_geometry)
-    ''')
-
-    sql = stmt.bindparams(xmin=xmin, ymin=ymin, xmax=xmax, ymax=ymax)
+    sql = stmt.bindparams(school_id=validated_school_id).columns(geojson=geometry_type(options))
     result = await session.execute(sql)
     rows = result.mappings().all()
 
     return rows
 
 
-async def get_school_geometries_by_lat_lng(
-    session: AsyncSession,
-    lat: float,
-    lng: float,
-    radius: float = 1000
-):
-    stmt = text('''
+async def get_school_points(session: AsyncSession):
+    stmt = text(f'''
     SELECT
         id,
         school_type,
-        ST_AsGeoJSON(wkb_geometry, 15) AS geojson,
-        name AS label
+        ST_AsGeoJSON(wkb_geometry, {GEOMETRY_PRECISION}) AS geojson,
+        name AS label,
+        ST_Y(wkb_geometry) AS lat,
+        ST_X(wkb_geometry) AS lng
     FROM
         sh_school
     WHERE
-        ST_DWithin(
-            wkb_geometry::geography,
-            ST_SetSRID(ST_MakePoint(:lng, :lat), 4326)::geography,
-            :radius
-        )
-    AND
         ST_IsValid(wkb_geometry)
     ''')
 
-    sql = stmt.bindparams(lat=lat, lng=lng, radius=radius)
-    result = await session.execute(sql)
+    result = await session.execute(stmt)
     rows = result.mappings().all()
 
     return rows
@@ -156,25 +125,31 @@ async def get_school_geometries_by_school_type(
     session: AsyncSession,
     school_type: int
 ):
-    stmt = text('''
+    # the FeatureCollection is assembled by PostgreSQL and passed on as text
+    stmt = text(f'''
     SELECT
-        id,
-        school_type,
-        ST_AsGeoJSON(wkb_geometry, 15) AS geojson,
-        name AS label
-    FROM
-        sh_school
-    WHERE
-        (school_type & :school_type) != 0
-    AND
-        ST_IsValid(wkb_geometry)
+        COUNT(*) AS count,
+        {feature_collection_sql(SCHOOL_FEATURE)} AS content
+    FROM (
+        SELECT
+            id,
+            school_type,
+            ST_AsGeoJSON(wkb_geometry, {GEOMETRY_PRECISION}) AS geojson,
+            name AS label
+        FROM
+            sh_school
+        WHERE
+            (school_type & :school_type) != 0
+        AND
+            ST_IsValid(wkb_geometry)
+    ) AS s
     ''')
 
     sql = stmt.bindparams(school_type=school_type)
     result = await session.execute(sql)
-    rows = result.mappings().all()
+    row = result.mappings().one()
 
-    return rows
+    return row
 
 
 async def get_school_types(
@@ -0,0 +1,228 @@
+from sqlalchemy.sql import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..utils.validators import validate_tile_coordinates
+
+
+TILE_EXTENT = 4096
+TILE_BUFFER = 64
+
+# size of a thinning cell in tile units at the zoom below full_zoom,
+# doubled for every further zoom level out
+TILE_THIN_CELL = 16
+TILE_THIN_MAX_CELL = 512
+
+ENERGY_UNIT_COLUMNS = [
+    'unit_registration_number',
+    'unit_name',
+    'energy_source_id',
+    'gross_capacity'
+]
+
+# columns are trusted sql, never interpolate request values into a layer
+TILE_LAYERS = {
+    'school': {
+        'table': 'sh_school',
+        'geometry': 'wkb_geometry',
+        'columns': ['id', 'school_type', 'name AS label'],
+        'min_zoom': 6,
+        'full_zoom': 12
+    },
+    'police': {
+        'table': 'sh_police_station',
+        'geometry': 'wkb_geometry',
+        'columns': ['id', 'name AS label'],
+        'min_zoom': 6,
+        'full_zoom': 11
+    },
+    'monument': {
+        'table': 'sh_monument_boundary_processed',
+        'geometry': 'polygon_center',
+        'columns': [
+            'id',
+            'slug',
+            'monument_type',
+            '''COALESCE(
+                NULLIF(street, '') || ' ' || NULLIF(housenumber, ''),
+                NULLIF(street, '')
+            ) AS label'''
+        ],
+        'min_zoom': 10,
+        'full_zoom': 15
+    },
+    'mosmix': {
+        'table': 'global_mosmix_stations',
+        'geometry': 'wkb_geometry',
+        'columns': ['station_id', 'station_name', 'station_elevation'],
+        'min_zoom': 0,
+        'full_zoom': 8
+    },
+    'biotope': {
+        'table': 'sh_biotope',
+        'geometry': 'wkb_geometry',
+        'columns': [
+            'hauptcode AS code',
+            'biotopbez AS description',
+            'gemeindename AS place_name'
+        ],
+        'min_zoom': 12,
+        'full_zoom': 0
+    },
+    'municipality': {
+        'table': 'vg25_gem',
+        'geometry': 'geom',
+        'columns': ['ags AS municipality_key', 'gen AS label'],
+        'where': 'gf = 4',
+        'min_zoom': 6,
+        'full_zoom': 0
+    },
+    'combustion_unit': {
+        'table': 'de_combustion_units',
+        'geometry': 'wkb_geometry',
+        'columns': ENERGY_UNIT_COLUMNS,
+        'priority': 'gross_capacity DESC NULLS LAST',
+        'min_zoom': 4,
+        'full_zoom': 10
+    },
+    'nuclear_unit': {
+        'table': 'de_nuclear_units',
+        'geometry': 'wkb_geometry',
+        'columns': ENERGY_UNIT_COLUMNS,
+        'priority': 'gross_capacity DESC NULLS LAST',
+        'min_zoom': 0,
+        'full_zoom': 0
+    },
+    'water_unit': {
+        'table': 'de_water_units',
+        'geometry': 'wkb_geometry',
+        'columns': ENERGY_UNIT_COLUMNS,
+        'priority': 'gross_capacity DESC NULLS LAST',
+        'min_zoom': 5,
+        'full_zoom': 11
+    },
+    'biomass_unit': {
+        'table': 'de_biomass_units',
+        'geometry': 'wkb_geometry',
+        'columns': ENERGY_UNIT_COLUMNS,
+        'priority': 'gross_capacity DESC NULLS LAST',
+        'min_zoom': 5,
+        'full_zoom': 11
+    },
+    'wind_unit': {
+        'table': 'de_wind_units',
+        'geometry': 'wkb_geometry',
+        'columns': ENERGY_UNIT_COLUMNS,
+        'priority': 'gross_capacity DESC NULLS LAST',
+        'min_zoom': 5,
+        'full_zoom': 11
+    },
+    'solar_unit': {
+        'table': 'de_solar_units',
+        'geometry': 'wkb_geometry',
+        'columns': ENERGY_UNIT_COLUMNS,
+        'priority': 'gross_capacity DESC NULLS LAST',
+        'min_zoom': 9,
+        'full_zoom': 14
+    }
+}
+
+
+def get_thin_cell(layer: str, z: int) -> int:
+    full_zoom = TILE_LAYERS[layer]['full_zoom']
+
+    if z >= full_zoom:
+        return 0
+
+    return min(TILE_THIN_CELL * 2 ** (full_zoom - z - 1), TILE_THIN_MAX_CELL)
+
+
+def build_tile_sql(layer: str, thin: bool) -> str:
+    config = TILE_LAYERS[layer]
+    geometry = config['geometry']
+
+    conditions = [f'{geometry} && ST_Transform(bounds.buffered, 4326)']
+
+    if 'where' in config:
+        conditions.append(config['where'])
+
+    features = f'''
+    SELECT
+        ST_AsMVTGeom(
+            ST_Transform({geometry}, 3857),
+            bounds.envelope,
+            {TILE_EXTENT},
+            {TILE_BUFFER},
+            true
+        ) AS mvt_geom,
+        {', '.join(config['columns'])}
+    FROM
+        {config['table']}, bounds
+    WHERE
+        {' AND '.join(conditions)}
+    '''
+
+    # keep one feature per grid cell, the one with the highest priority
+    if thin:
+        order = ['ST_SnapToGrid(mvt_geom, :cell)']
+
+        if 'priority' in config:
+            order.append(config['priority'])
+
+        selected = f'''
+        SELECT DISTINCT ON (ST_SnapToGrid(mvt_geom, :cell))
+            *
+        FROM
+            features
+        WHERE
+            mvt_geom IS NOT NULL
+        ORDER BY
+            {', '.join(order)}
+        '''
+    else:
+        selected = '''
+        SELECT
+            *
+        FROM
+            features
+        WHERE
+            mvt_geom IS NOT NULL
+        '''
+
+    return f'''
+    WITH bounds AS (
+        SELECT
+            ST_TileEnvelope(:z, :x, :y) AS envelope,
+            ST_TileEnvelope(:z, :x, :y, margin => {TILE_BUFFER / TILE_EXTENT}) AS buffered
+    ),
+    features AS ({features}),
+    selected AS ({selected})
+    SELECT
+        ST_AsMVT(selected, :layer, {TILE_EXTENT}, 'mvt_geom')
+    FROM
+        selected
+    '''
+
+
+async def get_tile(
+    session: AsyncSession,
+    layer: str,
+    z: int,
+    x: int,
+    y: int
+) -> bytes:
+    z, x, y = validate_tile_coordinates(z, x, y)
+
+    if z < TILE_LAYERS[layer]['min_zoom']:
+        return b''
+
+    cell = get_thin_cell(layer, z)
+    params = {'z': z, 'x': x, 'y': y, 'layer': layer}
+
+    if cell:
+        params['cell'] = float(cell)
+
+    stmt = text(build_tile_sql(layer, thin=bool(cell)))
+    result = await session.execute(stmt.bindparams(**params))
+    tile = result.scalar()
+
+    return bytes(tile) if tile else b''
@@ -1,13 +1,16 @@
 from sqlalchemy.sql import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from ..utils.geometry import GeometryOptions, geometry_sql, geometry_type
+
 
 async def get_plan_by_lat_lng(
     session: AsyncSession,
     lat: float,
-    lng: float
+    lng: float,
+    options: GeometryOptions = GeometryOptions()
 ):
-    stmt = text('''
+    stmt = text(f'''
     SELECT
         b.name AS plan_name,
         b.nummer AS plan_number,
@@ -18,14 +21,14 @@ async def get_plan_by_lat_lng(
                 ST_Area(ST_Transform(b.geometry, 3587)) || ' m²'
             ELSE ST_Area(ST_Transform(b.geometry, 3587)) / 10000 || ' ha'
         END AS shape_area,
-        ST_AsGeoJSON(b.geometry, 15)::jsonb AS geojson
+        {geometry_sql('b.geometry', options)} AS geojson
     FROM
         xplan.bp_plan AS b
     WHERE
         ST_Contains(b.geometry, ST_SetSRID(ST_MakePoint(:lng, :lat), 4326))
     ''')
 
-    sql = stmt.bindparams(lat=lat, lng=lng)
+    sql = stmt.bindparams(lat=lat, lng=lng).columns(geojson=geometry_type(options))
     result = await session.execute(sql)
 
     return result.mappings().all()
@@ -0,0 +1,92 @@
+import time
+import asyncio
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .database import log
+from .invalidation import subscribe
+from .utils.cache import register_cache
+from .utils.point_index import PointIndex
+from .warmup import register_warmup
+
+
+# in-memory indexes of small point layers by name, see register_layer
+layers = {}
+
+
+class SpatialLayer:
+    """
+    Loads the rows of a point layer into a PointIndex on first use.
+
+    A notification of the layer topic marks the index as stale, the next
+    request reloads it while concurrent requests keep using the previous
+    index. The layer is registered like a cache so /system/v1/cache
+    reports its size and reloads.
+    """
+
+    def __init__(self, name: str, loader, render=None):
+        self.name = name
+        self.loader = loader
+        self.render = render
+        self.index = None
+        self.stale = False
+        self.loaded_at = None
+        self.load_seconds = None
+        self.reloads = 0
+        self.lock = asyncio.Lock()
+
+    def invalidate(self, key=None):
+        self.stale = True
+
+    async def load(self, session: AsyncSession):
+        started_at = time.perf_counter()
+        rows = await self.loader(session)
+
+        if self.render is not None:
+            rows = [{**row, 'feature': self.render(row)} for row in rows]
+
+        self.index = PointIndex(rows)
+        self.stale = False
+        self.loaded_at = time.time()
+        self.load_seconds = round(time.perf_counter() - started_at, 3)
+        self.reloads += 1
+
+        log.info('loaded %s points of %s in %ss', len(self.index), self.name, self.load_seconds)
+
+    async def get_index(self, session: AsyncSession) -> PointIndex:
+        if self.index is None or (self.stale and not self.lock.locked()):
+            async with self.lock:
+                if self.index is None or self.stale:
+                    await self.load(session)
+
+        return self.index
+
+    def stats(self) -> dict:
+        return {
+            'size': len(self.index) if self.index is not None else 0,
+            'stale': self.stale,
+            'loaded_at': self.loaded_at,
+            'load_seconds': self.load_seconds,
+            'reloads': self.reloads
+        }
+
+
+def register_layer(name: str, loader, topic: str, render=None) -> SpatialLayer:
+    """
+    Registers a point layer, loader is a coroutine function taking a
+    session and returning rows with lat and lng columns. render encodes
+    the GeoJSON feature of a row once per load, it is kept as feature.
+    The index is reloaded after a notification of topic.
+    """
+    layer = SpatialLayer(name, loader, render)
+
+    layers[name] = register_cache(f'index_{name}', layer)
+    subscribe(topic, layer.invalidate)
+
+    return layer
+
+
+@register_warmup
+async def warm_spatial_layers(session: AsyncSession):
+    for layer in layers.values():
+        await layer.get_index(session)
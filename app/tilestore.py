@@ -0,0 +1,211 @@
+import os
+import asyncio
+import sqlite3
+import threading
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .database import get_settings, log
+from .invalidation import subscribe
+from .services.tile import TILE_LAYERS, get_tile
+from .utils.cache import register_cache
+from .utils.validators import validate_tile_coordinates
+
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS metadata (name TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS tiles (
+    zoom_level INTEGER,
+    tile_column INTEGER,
+    tile_row INTEGER,
+    tile_data BLOB,
+    PRIMARY KEY (zoom_level, tile_column, tile_row)
+);
+'''
+
+TILE_CACHE_DIR = get_settings().tile_cache_dir
+
+stores = {}
+
+
+class TileStore:
+    """
+    MBTiles file holding the rendered vector tiles of one layer.
+
+    Rows are stored in the TMS scheme of the MBTiles spec, y is flipped.
+    Empty tiles are stored as zero length blobs so empty areas are not
+    rendered again. The file may be shared by all uvicorn workers and the
+    seeding command, sqlite serializes the writers. The generation in the
+    metadata table counts the invalidations of the file, a tile rendered
+    before one of them is refused by put_many.
+    """
+
+    def __init__(self, layer: str, path: str):
+        self.layer = layer
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._connection = None
+        self._clearing = set()
+
+    def connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+
+            connection = sqlite3.connect(
+                self.path, timeout=30, check_same_thread=False)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.executescript(SCHEMA)
+
+            with connection:
+                connection.executemany(
+                    'INSERT OR IGNORE INTO metadata (name, value) VALUES (?, ?)',
+                    [('name', self.layer), ('format', 'pbf'), ('type', 'overlay'), ('generation', '0')]
+                )
+
+            self._connection = connection
+
+        return self._connection
+
+    def get(self, z: int, x: int, y: int) -> bytes | None:
+        with self._lock:
+            row = self.connect().execute(
+                'SELECT tile_data FROM tiles WHERE zoom_level = ? AND tile_column = ? AND tile_row = ?',
+                (z, x, 2 ** z - 1 - y)
+            ).fetchone()
+
+        if row is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return bytes(row[0])
+
+    def read_generation(self, connection: sqlite3.Connection) -> int:
+        row = connection.execute(
+            "SELECT CAST(value AS INTEGER) FROM metadata WHERE name = 'generation'"
+        ).fetchone()
+
+        return row[0] if row else 0
+
+    def get_generation(self) -> int:
+        with self._lock:
+            return self.read_generation(self.connect())
+
+    def put_many(self, tiles: list, generation: int = None):
+        rows = [(z, x, 2 ** z - 1 - y, data) for z, x, y, data in tiles]
+
+        with self._lock:
+            connection = self.connect()
+
+            # the write lock is taken first, no process can invalidate
+            # between the check and the insert
+            connection.execute('BEGIN IMMEDIATE')
+
+            try:
+                # tiles rendered before an invalidation must not be stored
+                if generation is not None and generation != self.read_generation(connection):
+                    connection.rollback()
+                    return
+
+                connection.executemany(
+                    'INSERT OR REPLACE INTO tiles (zoom_level, tile_column, tile_row, tile_data) VALUES (?, ?, ?, ?)',
+                    rows
+                )
+                connection.commit()
+            except BaseException:
+                connection.rollback()
+                raise
+
+    def put(self, z: int, x: int, y: int, tile: bytes, generation: int = None):
+        self.put_many([(z, x, y, tile)], generation)
+
+    def clear(self):
+        try:
+            with self._lock:
+                connection = self.connect()
+
+                with connection:
+                    connection.execute('DELETE FROM tiles')
+                    connection.execute(
+                        "UPDATE metadata SET value = CAST(value AS INTEGER) + 1 WHERE name = 'generation'"
+                    )
+        except sqlite3.Error as e:
+            log.error('could not clear tile store %s: %s', self.path, e)
+            return
+
+        log.info('cleared tile store %s', self.path)
+
+    def invalidate(self, key=None):
+        """
+        Drops every stored tile and bumps the generation. Notifications are
+        dispatched on the event loop, so the delete runs in a thread there.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.clear()
+            return
+
+        task = loop.create_task(asyncio.to_thread(self.clear))
+        self._clearing.add(task)
+        task.add_done_callback(self._clearing.discard)
+
+    def count(self) -> int:
+        with self._lock:
+            return self.connect().execute('SELECT COUNT(*) FROM tiles').fetchone()[0]
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+
+        return {
+            'path': self.path,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 4) if total else None
+        }
+
+
+def get_tile_store(layer: str) -> TileStore | None:
+    if not TILE_CACHE_DIR:
+        return None
+
+    if layer not in stores:
+        store = TileStore(layer, os.path.join(TILE_CACHE_DIR, f'{layer}.mbtiles'))
+
+        stores[layer] = register_cache(f'tiles_{layer}', store)
+        subscribe(f'tiles_{layer}', store.invalidate)
+
+    return stores[layer]
+
+
+async def get_cached_tile(
+    session: AsyncSession,
+    layer: str,
+    z: int,
+    x: int,
+    y: int
+) -> bytes:
+    z, x, y = validate_tile_coordinates(z, x, y)
+    store = get_tile_store(layer)
+
+    if store is None or z < TILE_LAYERS[layer]['min_zoom']:
+        return await get_tile(session, layer, z, x, y)
+
+    tile = await asyncio.to_thread(store.get, z, x, y)
+
+    if tile is None:
+        generation = await asyncio.to_thread(store.get_generation)
+        tile = await get_tile(session, layer, z, x, y)
+
+        await asyncio.to_thread(store.put, z, x, y, tile, generation)
+
+    return tile
+
+
+# subscribe every layer at import, a reload notification may arrive
+# before the first tile of a layer was requested
+for name in TILE_LAYERS:
+    get_tile_store(name)
@@ -0,0 +1,56 @@
+from fastapi.responses import Response
+
+from .database import async_session, get_settings
+from .executor import run_in_executor
+from .invalidation import subscribe
+from .utils.cache import TTLCache, register_cache
+from .utils.singleflight import SingleFlight
+from .utils.topojson import encode_topology
+
+
+settings = get_settings()
+
+TOPOJSON_QUANTIZATION = settings.topojson_quantization
+
+# encoded topologies per collection, cleared with the 'topojson' notification
+topology_cache = register_cache('topojson', TTLCache(
+    maxsize=settings.topojson_cache_size,
+    ttl=settings.topojson_cache_ttl
+))
+
+subscribe('topojson', topology_cache.invalidate)
+
+# concurrent misses of a collection share one query and encode
+encodes = SingleFlight()
+
+
+async def build_topology(name: str, key: str, query, *args) -> bytes | None:
+    # the flight outlives a cancelled caller, so it keeps its own session
+    async with async_session() as session:
+        rows = [dict(row) for row in await query(session, *args)]
+
+    if len(rows) == 0:
+        return None
+
+    content = await run_in_executor(encode_topology, rows, name, TOPOJSON_QUANTIZATION)
+
+    topology_cache.set((name, key), content)
+
+    return content
+
+
+async def get_cached_topology(name: str, key: str, query, *args) -> bytes | None:
+    """
+    Returns the TopoJSON of the boundaries query returns for args, encoded
+    once per collection name and key. None when the collection is empty.
+    """
+    content = topology_cache.get((name, key))
+
+    if content is None:
+        content = await encodes.do((name, key), build_topology, name, key, query, *args)
+
+    return content
+
+
+def topology_response(content: bytes) -> Response:
+    return Response(content=content, media_type='application/json')
@@ -0,0 +1,83 @@
+import time
+
+from collections import OrderedDict
+
+
+# named caches whose statistics are reported by the system endpoints
+registry = {}
+
+
+class TTLCache:
+    """
+    Size bounded LRU cache where every entry expires after its own ttl.
+
+    The cache is meant to be used from a single event loop and does no
+    locking. Expired entries are dropped lazily on access or when the
+    least recently used entries are evicted.
+    """
+
+    def __init__(self, maxsize: int = 128, ttl: float = 3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key) -> bool:
+        return self.get(key, count=False) is not None
+
+    def get(self, key, count: bool = True):
+        entry = self._entries.get(key)
+
+        if entry is None:
+            if count:
+                self.misses += 1
+            return None
+
+        value, expires_at = entry
+
+        if expires_at < time.monotonic():
+            del self._entries[key]
+
+            if count:
+                self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+
+        if count:
+            self.hits += 1
+        return value
+
+    def set(self, key, value, ttl: float = None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key=None):
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    def stats(self) -> dict:
+        return {
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+            'ttl': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses
+        }
+
+
+def register_cache(name: str, cache: TTLCache) -> TTLCache:
+    registry[name] = cache
+
+    return cache
@@ -0,0 +1,20 @@
+import base64
+import binascii
+
+from fastapi import HTTPException, status
+
+
+def encode_cursor(value: str) -> str:
+    return base64.urlsafe_b64encode(value.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> str:
+    padding = '=' * (-len(cursor) % 4)
+
+    try:
+        return base64.urlsafe_b64decode(cursor + padding).decode('utf-8')
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail='Invalid pagination cursor.'
+        )
@@ -1,123 +1,193 @@
 import zipfile
 from lxml import etree
-import re
+import asyncio
 from datetime import datetime
 from io import BytesIO
 import aiohttp
 from fastapi import HTTPException
 
-
-def numeric(s: str) -> float | int:
-    try:
-        if '-' in s:
-            return 0
-        return int(s)
-    except ValueError:
-        return round(float(s), 1)
-
-
-def get_element_value_as_list(tree: etree._ElementTree, element: str) -> list:
-    for df in tree.xpath(f'////*[name()="dwd:Forecast" and @*[name()="dwd:elementName" and .="{element}"]]'):
-        elements = re.sub(
-            r'\s+', ';', str(df.getchildren()[0].text).lstrip(' '))
-        lst = elements.split(";")
-        return [numeric(item) for item in lst]
-    return []
-
-
-def analyse(tree: etree._ElementTree) -> dict:
-    result = {}
-    result['station'] = {}
-
-    # Station ID
-    for df in tree.xpath('////*[name()="dwd:Issuer"]'):
-        result["issuer"] = df.text.strip()
-
-    # Product ID
-    for df in tree.xpath('////*[name()="dwd:ProductID"]'):
-        result["productId"] = df.text.strip()
-
-    # generating process
-    for df in tree.xpath('////*[name()="dwd:GeneratingProcess"]'):
-        result["generatingProcess"] = df.text.strip()
-
-    # Location name
-    for df in tree.xpath('////*[name()="kml:description"]'):
-        result["location"] = df.text.strip()
-
-    # Issue time
-    for df in tree.xpath('////*[name()="dwd:IssueTime"]'):
-        dt = datetime.fromisoformat(df.text.replace("Z", "+00:00"))
-        result["issue_time"] = dt.strftime("%Y-%m-%dT%H:%M:%S%z")
-
-    # Coordinates
-    for df in tree.xpath('////*[name()="kml:coordinates"]'):
-        result['station']["coordinates"] = df.text.split(',')
-
-    # Station id
-    for df in tree.xpath('//*[name()="kml:Placemark"]/*[name()="kml:name"]'):
-        result['station']["name"] = df.text.strip()
-
-    # Station name
-    for df in tree.xpath('//*[name()="kml:Placemark"]/*[name()="kml:description"]'):
-        result['station']["description"] = df.text.strip()
-
-    # Time steps
-    time_stamps = []
-    for df in tree.xpath('//*[name()="dwd:ForecastTimeSteps"]'):
-        for timeslot in df:
-            dt = datetime.fromisoformat(timeslot.text.replace("Z", "+00:00"))
-            time_stamps.append(dt.strftime("%Y-%m-%dT%H:%M:%S%z"))
-    result["timeSteps"] = time_stamps
-
-    # Weather values
-    def add_transformed(key: str, values: list, transform=None):
-        if transform:
-            result['station'][key] = [transform(v) for v in values]
-        else:
-            result['station'][key] = values
-
-    add_transformed("PPPP", get_element_value_as_list(tree, 'PPPP'))
-    add_transformed("FX1", get_element_value_as_list(tree, 'FX1'))
-    add_transformed("TTT", get_element_value_as_list(tree, 'TTT'))
-    add_transformed("RR1c", get_element_value_as_list(tree, 'RR1c'))
-    add_transformed("SunD1", get_element_value_as_list(tree, 'SunD1'))
-    add_transformed("FF", get_element_value_as_list(tree, 'FF'))
-    add_transformed("DD", get_element_value_as_list(tree, 'DD'))
-    add_transformed("Td", get_element_value_as_list(tree, 'Td'))
-    add_transformed("ww", get_element_value_as_list(tree, 'ww'))
-    add_transformed("SunD", get_element_value_as_list(tree, 'SunD'))
-    add_transformed("Neff", get_element_value_as_list(tree, 'Neff'))
-    add_transformed("R101", get_element_value_as_list(tree, 'R101'))
+from ..client import get_client_session
+from ..executor import run_in_executor
+from ..database import get_settings
+from .singleflight import SingleFlight
+from .forecast_format import EMPTY_VALUES, parse_column, parse_time_axis
+
+
+KML_NAMESPACE = 'http://www.opengis.net/kml/2.2'
+DWD_NAMESPACE = 'https://opendata.dwd.de/weather/lib/pointforecast_dwd_extension_V1_0.xsd'
+
+FORECAST_ELEMENTS = (
+    'PPPP', 'FX1', 'TTT', 'RR1c', 'SunD1', 'FF',
+    'DD', 'Td', 'ww', 'SunD', 'Neff', 'R101'
+)
+
+HEADER_KEYS = ('issuer', 'productId', 'generatingProcess', 'location', 'issue_time')
+
+
+def format_time(text: str) -> str:
+    dt = datetime.fromisoformat(text.strip().replace("Z", "+00:00"))
+    return dt.strftime("%Y-%m-%dT%H:%M:%S%z")
+
+
+def get_tags(namespaces: dict) -> dict:
+    kml = '{%s}' % namespaces['kml']
+    dwd = '{%s}' % namespaces['dwd']
+
+    return {
+        'issuer': dwd + 'Issuer',
+        'product_id': dwd + 'ProductID',
+        'generating_process': dwd + 'GeneratingProcess',
+        'issue_time': dwd + 'IssueTime',
+        'time_step': dwd + 'TimeStep',
+        'forecast': dwd + 'Forecast',
+        'element_name': dwd + 'elementName',
+        'value': dwd + 'value',
+        'placemark': kml + 'Placemark',
+        'name': kml + 'name',
+        'description': kml + 'description',
+        'coordinates': kml + 'coordinates'
+    }
+
+
+def read_kml(source, elements: tuple, convert) -> tuple:
+    """
+    Reads a MOSMIX KML document in a single pass. Only the forecast
+    elements listed in elements are converted, every finished element is
+    freed right away so memory stays flat for large documents.
+    """
+    namespaces = {'kml': KML_NAMESPACE, 'dwd': DWD_NAMESPACE}
+    tags = get_tags(namespaces)
+    wanted = None if elements is None else set(elements)
+
+    header = {}
+    station = {}
+    forecasts = {}
+    time_steps = []
+
+    for event, item in etree.iterparse(source, events=('start-ns', 'end')):
+        # match elements by prefix like the xpath queries did, whatever
+        # namespace uri the document binds them to
+        if event == 'start-ns':
+            prefix, uri = item
+
+            if prefix in namespaces and namespaces[prefix] != uri:
+                namespaces[prefix] = uri
+                tags = get_tags(namespaces)
+            continue
+
+        tag = item.tag
+
+        if tag == tags['value']:
+            name = item.getparent().get(tags['element_name'])
+
+            if (wanted is None or name in wanted) and name not in forecasts:
+                forecasts[name] = convert(item.text or '')
+        elif tag == tags['time_step']:
+            time_steps.append(item.text)
+        elif tag == tags['issuer']:
+            header['issuer'] = item.text.strip()
+        elif tag == tags['product_id']:
+            header['productId'] = item.text.strip()
+        elif tag == tags['generating_process']:
+            header['generatingProcess'] = item.text.strip()
+        elif tag == tags['issue_time']:
+            header['issue_time'] = format_time(item.text)
+        elif tag == tags['coordinates']:
+            station['coordinates'] = item.text.split(',')
+        elif tag == tags['name']:
+            if item.getparent().tag == tags['placemark']:
+                station['name'] = item.text.strip()
+        elif tag == tags['description']:
+            header['location'] = item.text.strip()
+
+            if item.getparent().tag == tags['placemark']:
+                station['description'] = item.text.strip()
+
+        item.clear()
+
+        while item.getprevious() is not None:
+            del item.getparent()[0]
+
+    result = {'station': {}}
+
+    for key in ('coordinates', 'name', 'description'):
+        if key in station:
+            result['station'][key] = station[key]
+
+    for key in HEADER_KEYS:
+        if key in header:
+            result[key] = header[key]
+
+    return result, forecasts, time_steps
+
+
+def parse_forecast(source, elements: tuple = FORECAST_ELEMENTS) -> dict:
+    """
+    Parses a MOSMIX KML document into a columnar forecast, one float32
+    array per element with NaN for undefined values and one shared int64
+    axis of epoch seconds. See utils/forecast_format.py for its encodings.
+    Elements of None converts every element of the document.
+    """
+    result, forecasts, time_steps = read_kml(source, elements, parse_column)
+
+    result['time'] = parse_time_axis(time_steps)
+    result['elements'] = {
+        name: forecasts[name][0] if name in forecasts else EMPTY_VALUES
+        for name in (forecasts if elements is None else elements)
+    }
+    result['integral'] = [name for name in result['elements'] if name in forecasts and forecasts[name][1]]
 
     return result
 
 
-async def retrieve_station_kmz(station_id) -> dict:
-    url = (
-        f'https://opendata.dwd.de/weather/local_forecasts/mos/MOSMIX_L/single_stations/{station_id}/kml/MOSMIX_L_LATEST_{station_id}.kmz'
+DWD_BASE_URL = get_settings().dwd_base_url
+
+# concurrent requests for the same station share one download and parse
+downloads = SingleFlight()
+
+
+def get_station_kmz_url(station_id: str) -> str:
+    return (
+        f'{DWD_BASE_URL}/weather/local_forecasts/mos/MOSMIX_L/single_stations/{station_id}/kml/MOSMIX_L_LATEST_{station_id}.kmz'
     )
 
+
+def decode_kmz(content: bytes, elements: tuple | None = FORECAST_ELEMENTS) -> dict:
+    with zipfile.ZipFile(BytesIO(content), 'r') as kmz:
+        kml_filename = kmz.namelist()[0]
+        return parse_forecast(kmz.open(kml_filename), elements)
+
+
+async def parse_station_kmz(content: bytes, elements: tuple | None = FORECAST_ELEMENTS) -> dict:
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                if response.status != 200:
-                    raise HTTPException(
-                        status_code=response.status,
-                        detail=f'DWD returned status code {response.status}'
-                    )
-
-                content = await response.read()
-                with zipfile.ZipFile(BytesIO(content), 'r') as kmz:
-                    kml_filename = kmz.namelist()[0]
-                    tree = etree.parse(kmz.open(kml_filename))
-                    return analyse(tree)
+        return await run_in_executor(decode_kmz, content, elements)
+    except zipfile.BadZipFile:
+        raise HTTPException(
+            status_code=422, detail='Received invalid data format from DWD')
+
+
+async def download_station_kmz(station_id: str) -> bytes:
+    url = get_station_kmz_url(station_id)
+
+    try:
+        async with get_client_session().get(url) as response:
+            if response.status != 200:
+                raise HTTPException(
+                    status_code=response.status,
+                    detail=f'DWD returned status code {response.status}'
+                )
+
+            return await response.read()
     except aiohttp.ClientConnectionError as e:
         raise HTTPException(
             status_code=503, detail=f'Could not connect to DWD: {str(e)}')
     except aiohttp.ClientError as e:
         raise HTTPException(
             status_code=500, detail=f'Error fetching data from DWD: {str(e)}')
-    except zipfile.BadZipFile:
+    except asyncio.TimeoutError:
         raise HTTPException(
-            status_code=422, detail='Received invalid data format from DWD')
+            status_code=504, detail='Timed out fetching data from DWD')
+
+
+async def retrieve_station_kmz(station_id) -> bytes:
+    return await downloads.do(station_id, download_station_kmz, station_id)
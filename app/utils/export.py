@@ -0,0 +1,139 @@
+import csv
+import io
+import json
+
+from datetime import date, datetime, time
+from decimal import Decimal
+
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+
+from ..database import async_session
+
+
+EXPORT_MEDIA_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv'
+}
+
+
+def get_export_format(request: Request) -> str | None:
+    accept = request.headers.get('accept', '')
+
+    for media_range in accept.split(','):
+        media_type = media_range.split(';')[0].strip().lower()
+
+        for export_format, export_media_type in EXPORT_MEDIA_TYPES.items():
+            if media_type == export_media_type:
+                return export_format
+
+    return None
+
+
+def json_default(value):
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+
+    if isinstance(value, Decimal):
+        return float(value)
+
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def encode_ndjson(rows: list) -> bytes:
+    lines = [
+        json.dumps(dict(row), default=json_default, ensure_ascii=False)
+        for row in rows
+    ]
+
+    return ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+def csv_value(value):
+    if value is None:
+        return ''
+
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=json_default, ensure_ascii=False)
+
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+
+    return value
+
+
+def encode_csv(rows: list, header: bool = False) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    if header:
+        writer.writerow(rows[0].keys())
+
+    for row in rows:
+        writer.writerow([csv_value(value) for value in row.values()])
+
+    return buffer.getvalue().encode('utf-8')
+
+
+async def create_export_response(
+    export_format: str,
+    partitions_factory,
+    filename: str
+) -> StreamingResponse | None:
+    """
+    Streams the partitions yielded by partitions_factory(session) as ndjson
+    or csv. The first partition is read before the response starts, so
+    validation errors still turn into a proper status code and None is
+    returned when there is nothing to export.
+
+    The stream opens its own session, dependencies with yield are closed
+    before a streaming response body is sent.
+    """
+    session = async_session()
+    partitions = partitions_factory(session)
+
+    try:
+        first = await anext(partitions)
+    except StopAsyncIteration:
+        await session.close()
+        return None
+    except BaseException:
+        await session.close()
+        raise
+
+    closed = False
+
+    async def close():
+        nonlocal closed
+
+        if not closed:
+            closed = True
+            await partitions.aclose()
+            await session.close()
+
+    async def content():
+        try:
+            if export_format == 'csv':
+                yield encode_csv(first, header=True)
+
+                async for rows in partitions:
+                    yield encode_csv(rows)
+            else:
+                yield encode_ndjson(first)
+
+                async for rows in partitions:
+                    yield encode_ndjson(rows)
+        finally:
+            await close()
+
+    # the background task also runs when the client left before the body
+    # started, the generator and its finally are never entered then
+    return StreamingResponse(
+        content(),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={
+            'Content-Disposition': f'attachment; filename="{filename}.{export_format}"'
+        },
+        background=BackgroundTask(close)
+    )
@@ -0,0 +1,229 @@
+import json
+import struct
+import orjson
+import numpy as np
+
+from .serializer import dumps
+
+
+# little endian buffer: magic, version, element count, step count and
+# metadata length, then the json metadata padded to 8 bytes, the int64
+# time axis and one float32 array per element in metadata order
+BINARY_MAGIC = b'MOSF'
+BINARY_VERSION = 1
+BINARY_HEADER = struct.Struct('<4sHHII')
+
+FORECAST_MEDIA_TYPES = {
+    'json': 'application/json',
+    'columnar': 'application/json',
+    'binary': 'application/octet-stream'
+}
+
+EMPTY_VALUES = np.empty(0, dtype=np.float32)
+
+
+def parse_values(text: str) -> np.ndarray:
+    # DWD marks undefined values with a dash
+    return np.array(
+        [value if value != '-' else 'nan' for value in text.split()],
+        dtype=np.float32
+    )
+
+
+def is_integral(text: str) -> bool:
+    # values written without decimals were sent as integers before
+    return not any(character in text for character in '.eE')
+
+
+def parse_column(text: str) -> tuple:
+    return parse_values(text), is_integral(text)
+
+
+def parse_time_axis(time_steps: list) -> np.ndarray:
+    # MOSMIX time steps are UTC, numpy does not parse the zone designator
+    steps = [step.strip().rstrip('Z') for step in time_steps]
+
+    return np.array(steps, dtype='datetime64[s]').astype(np.int64)
+
+
+def get_metadata(forecast: dict) -> dict:
+    return {
+        key: value for key, value in forecast.items()
+        if key not in ('time', 'elements', 'integral')
+    }
+
+
+def format_epochs(seconds: np.ndarray) -> orjson.Fragment:
+    # iso strings of numpy contain nothing json has to escape
+    steps = np.datetime_as_string(seconds.astype('datetime64[s]')).tolist()
+
+    if not steps:
+        return orjson.Fragment(b'[]')
+
+    return orjson.Fragment(('["' + '+0000","'.join(steps) + '+0000"]').encode('ascii'))
+
+
+def round_values(values: np.ndarray) -> list:
+    # DWD publishes two decimals, rounding drops the float32 noise
+    return np.round(values.astype(np.float64), 2).tolist()
+
+
+def two_product(a: np.ndarray, b: float) -> tuple:
+    # a * b is exactly p + e, Dekker's product of the split halves
+    p = a * b
+    t = 134217729.0 * a
+    ah = t - (t - a)
+    al = a - ah
+    t = 134217729.0 * b
+    bh = t - (t - b)
+    bl = b - bh
+
+    return p, ((ah * bh - p) + ah * bl + al * bh) + al * bl
+
+
+def round_tenths(values: np.ndarray) -> np.ndarray:
+    """
+    Rounds float32 values to two and then to one decimal like round() of
+    Python does it for each value. Halves are decided by whether the double
+    of the two decimals lies above or below them, exact ties go to even.
+    """
+    values = values.astype(np.float64)
+    hundredths = np.rint(values * 100)
+    rounded = hundredths / 100
+
+    # integer division by hand, np.divmod is far slower on floats
+    tenths = np.floor(hundredths / 10)
+    rest = hundredths - tenths * 10
+    odd = tenths - np.floor(tenths / 2) * 2 == 1
+
+    p, e = two_product(rounded, 100.0)
+    error = (p - hundredths) + e
+
+    up = (rest > 5) | ((rest == 5) & ((error > 0) | ((error == 0) & odd)))
+
+    return np.copysign((tenths + up) / 10, rounded)
+
+
+def replace_missing(content: bytes, missing) -> orjson.Fragment:
+    # undefined values are encoded as null
+    if missing is not None and b'null' in content:
+        content = content.replace(b'null', dumps(missing))
+
+    return orjson.Fragment(content)
+
+
+def encode_element(values: np.ndarray, integral: bool, missing) -> orjson.Fragment:
+    if not integral:
+        return replace_missing(dumps(round_tenths(values)), missing)
+
+    if np.isnan(values).any():
+        return orjson.Fragment(dumps([
+            missing if value != value else int(value)
+            for value in np.rint(values.astype(np.float64)).tolist()
+        ]))
+
+    return orjson.Fragment(dumps(np.rint(values).astype(np.int64)))
+
+
+def encode_json(forecast: dict, missing=0) -> bytes:
+    """
+    Encodes a forecast in the structure of parse_kml() of
+    benchmarks/dwd_kml_parser.py, values rounded to one decimal and
+    undefined values replaced by missing. Elements the document wrote
+    without decimals are encoded as integers.
+    """
+    result = get_metadata(forecast)
+    result['station'] = dict(result['station'])
+    result['timeSteps'] = format_epochs(forecast['time'])
+
+    elements = forecast['elements']
+    integral = set(forecast.get('integral', ()))
+
+    # the elements of the time axis are rounded together as one matrix
+    steps = len(forecast['time'])
+    columns = [name for name, values in elements.items() if name not in integral and steps and len(values) == steps]
+    encoded = {}
+
+    if columns:
+        rounded = round_tenths(np.stack([elements[name] for name in columns]))
+
+        for name, values in zip(columns, rounded):
+            encoded[name] = replace_missing(dumps(values), missing)
+
+    for name, values in elements.items():
+        result['station'][name] = encoded.get(name) or encode_element(values, name in integral, missing)
+
+    return dumps(result)
+
+
+def format_column(values: np.ndarray) -> str:
+    return json.dumps(round_values(values), separators=(',', ':')).replace('NaN', 'null')
+
+
+def encode_columns(forecast: dict) -> bytes:
+    """
+    Encodes a forecast as columnar json, one time array of epoch seconds
+    and one array per element with null for undefined values.
+    """
+    metadata = json.dumps(get_metadata(forecast), ensure_ascii=False, separators=(',', ':'))
+    time_axis = json.dumps(forecast['time'].tolist(), separators=(',', ':'))
+
+    columns = ','.join(
+        f'{json.dumps(name)}:{format_column(values)}'
+        for name, values in forecast['elements'].items()
+    )
+
+    return f'{metadata[:-1]},"time":{time_axis},"elements":{{{columns}}}}}'.encode('utf-8')
+
+
+def encode_binary(forecast: dict) -> bytes:
+    elements = forecast['elements']
+
+    metadata = get_metadata(forecast)
+    metadata['elements'] = [[name, len(values)] for name, values in elements.items()]
+
+    if forecast.get('integral'):
+        metadata['integral'] = list(forecast['integral'])
+
+    encoded = json.dumps(metadata, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    encoded += b' ' * (-(BINARY_HEADER.size + len(encoded)) % 8)
+
+    parts = [
+        BINARY_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, len(elements), len(forecast['time']), len(encoded)),
+        encoded,
+        forecast['time'].astype('<i8').tobytes()
+    ]
+    parts.extend(values.astype('<f4').tobytes() for values in elements.values())
+
+    return b''.join(parts)
+
+
+def decode_binary(content: bytes) -> dict:
+    magic, version, _, steps, length = BINARY_HEADER.unpack_from(content)
+
+    if magic != BINARY_MAGIC or version != BINARY_VERSION:
+        raise ValueError('not a forecast buffer of this version')
+
+    offset = BINARY_HEADER.size
+    forecast = json.loads(content[offset:offset + length])
+    offset += length
+
+    forecast['time'] = np.frombuffer(content, dtype='<i8', count=steps, offset=offset)
+    offset += steps * 8
+
+    elements = {}
+
+    for name, count in forecast.pop('elements'):
+        elements[name] = np.frombuffer(content, dtype='<f4', count=count, offset=offset)
+        offset += count * 4
+
+    forecast['elements'] = elements
+
+    return forecast
+
+
+FORECAST_ENCODERS = {
+    'json': encode_json,
+    'columnar': encode_columns,
+    'binary': encode_binary
+}
@@ -0,0 +1,53 @@
+import json
+
+from fastapi import Response
+
+
+CRS84 = {'type': 'name', 'properties': {
+    'name': 'urn:ogc:def:crs:OGC:1.3:CRS84'}}
+
+CRS84_JSON = json.dumps(CRS84, separators=(',', ':')).encode('utf-8')
+
+
+def feature_collection_sql(features: str, crs: bool = True) -> str:
+    """
+    Returns the sql expression that aggregates a json feature expression
+    to a FeatureCollection, an empty collection for no rows.
+    """
+    crs_member = ''''crs', json_build_object(
+            'type', 'name',
+            'properties', json_build_object('name', 'urn:ogc:def:crs:OGC:1.3:CRS84')
+        ),''' if crs else ''
+
+    return f'''json_build_object(
+        'type', 'FeatureCollection',
+        {crs_member}
+        'features', COALESCE(json_agg({features}), '[]'::json)
+    )::text'''
+
+
+def encode_feature(feature_id, geometry: str | dict, properties: dict) -> bytes:
+    """
+    Encodes a single feature, geometry is the text of ST_AsGeoJSON which
+    is spliced in without parsing it.
+    """
+    if not isinstance(geometry, str):
+        geometry = json.dumps(geometry, separators=(',', ':'))
+
+    head = json.dumps({'type': 'Feature', 'id': feature_id}, ensure_ascii=False, separators=(',', ':'))
+    tail = json.dumps(properties, ensure_ascii=False, separators=(',', ':'), default=str)
+
+    return f'{head[:-1]},"geometry":{geometry},"properties":{tail}}}'.encode('utf-8')
+
+
+def encode_feature_collection(features: list, crs: bool = True) -> bytes:
+    """
+    Joins encoded features to a FeatureCollection.
+    """
+    head = b'{"type":"FeatureCollection",' + (b'"crs":' + CRS84_JSON + b',' if crs else b'')
+
+    return head + b'"features":[' + b','.join(features) + b']}'
+
+
+def geojson_response(content: bytes | str) -> Response:
+    return Response(content=content, media_type='application/json')
@@ -0,0 +1,201 @@
+import struct
+
+from fastapi import Query, Request
+from fastapi.responses import Response
+from sqlalchemy.sql import func, null
+from sqlalchemy.sql.expression import type_coerce
+from sqlalchemy.types import LargeBinary
+
+from ..database import get_settings
+from .exceptions import CustomValidationError
+from .serializer import FastJSONResponse, GeoJSON
+
+
+GEOMETRY_PRECISION = get_settings().geometry_precision
+
+GEOMETRY_MODES = ('none', 'bbox', 'centroid', 'full')
+
+GEOMETRY_MEDIA_TYPES = {
+    'wkb': 'application/wkb',
+    'twkb': 'application/twkb'
+}
+
+# the precision of twkb is stored in four bits, seven decimals at most
+TWKB_MAX_PRECISION = 7
+
+GEOMETRY_DESCRIPTION = (
+    'none omits the geometry, bbox and centroid replace it by its envelope '
+    'or centroid, full returns it as stored'
+)
+
+PRECISION_DESCRIPTION = 'Decimal places of the coordinates'
+
+GEOMETRY_ACCEPT_DESCRIPTION = (
+    'Send Accept: application/wkb or application/twkb to receive the '
+    'geometry alone, lists of rows as a geometry collection.'
+)
+
+
+class GeometryOptions:
+    """
+    How a geometry column is selected: its mode, the decimal places of the
+    coordinates and the encoding negotiated by the Accept header.
+    """
+
+    def __init__(self, mode: str = 'full', precision: int = GEOMETRY_PRECISION, encoding: str = 'geojson'):
+        self.mode = mode
+        self.precision = precision
+        self.encoding = encoding
+
+    @property
+    def binary(self) -> bool:
+        return self.encoding in GEOMETRY_MEDIA_TYPES
+
+
+def get_geometry_encoding(request: Request) -> str:
+    accept = request.headers.get('accept', '')
+
+    for media_range in accept.split(','):
+        media_type = media_range.split(';')[0].strip().lower()
+
+        for encoding, geometry_media_type in GEOMETRY_MEDIA_TYPES.items():
+            if media_type == geometry_media_type:
+                return encoding
+
+    return 'geojson'
+
+
+def get_geometry_options(
+    request: Request,
+    precision: int = Query(GEOMETRY_PRECISION, ge=0, le=15, description=PRECISION_DESCRIPTION),
+    geometry: str = Query('full', pattern='^(none|bbox|centroid|full)$', description=GEOMETRY_DESCRIPTION)
+) -> GeometryOptions:
+    encoding = get_geometry_encoding(request)
+
+    if encoding != 'geojson' and geometry == 'none':
+        raise CustomValidationError(
+            loc=['query', 'geometry'],
+            msg=f'geometry=none can not be sent as {GEOMETRY_MEDIA_TYPES[encoding]}',
+            error_type='value_error'
+        )
+
+    return GeometryOptions(geometry, precision, encoding)
+
+
+def geometry_sql(column: str, options: GeometryOptions) -> str:
+    """
+    Returns the sql expression that selects a geometry column of a text
+    statement, precision is validated as an integer before.
+    """
+    if options.mode == 'none':
+        return 'NULL'
+
+    if options.mode == 'bbox':
+        column = f'ST_Envelope({column})'
+    elif options.mode == 'centroid':
+        column = f'ST_Centroid({column})'
+
+    if options.encoding == 'wkb':
+        return f'ST_AsBinary({column})'
+
+    if options.encoding == 'twkb':
+        return f'ST_AsTWKB({column}, {min(options.precision, TWKB_MAX_PRECISION)})'
+
+    return f'ST_AsGeoJSON({column}, {options.precision})'
+
+
+def geometry_column(column, options: GeometryOptions):
+    """
+    Same as geometry_sql for select statements, GeoJSON stays text that is
+    spliced into the response.
+    """
+    if options.mode == 'none':
+        return null()
+
+    if options.mode == 'bbox':
+        column = func.ST_Envelope(column)
+    elif options.mode == 'centroid':
+        column = func.ST_Centroid(column)
+
+    if options.encoding == 'wkb':
+        return type_coerce(func.ST_AsBinary(column), LargeBinary)
+
+    if options.encoding == 'twkb':
+        return type_coerce(func.ST_AsTWKB(column, min(options.precision, TWKB_MAX_PRECISION)), LargeBinary)
+
+    return type_coerce(func.ST_AsGeoJSON(column, options.precision), GeoJSON)
+
+
+def geometry_type(options: GeometryOptions):
+    return LargeBinary if options.binary else GeoJSON
+
+
+def encode_varint(value: int) -> bytes:
+    encoded = bytearray()
+
+    while value > 0x7f:
+        encoded.append((value & 0x7f) | 0x80)
+        value >>= 7
+
+    encoded.append(value)
+
+    return bytes(encoded)
+
+
+def encode_zigzag(value: int) -> int:
+    return (value << 1) ^ (value >> 63)
+
+
+def encode_wkb_collection(geometries: list) -> bytes:
+    # little endian GeometryCollection of the wkb of every row
+    return struct.pack('<BII', 1, 7, len(geometries)) + b''.join(geometries)
+
+
+def encode_twkb_collection(geometries: list, ids: list | None, precision: int) -> bytes:
+    header = (encode_zigzag(min(precision, TWKB_MAX_PRECISION)) << 4) | 7
+
+    if not geometries:
+        return bytes([header, 0x10])
+
+    content = bytearray([header, 0x04 if ids else 0x00])
+    content += encode_varint(len(geometries))
+
+    for identifier in ids or []:
+        content += encode_varint(encode_zigzag(identifier))
+
+    return bytes(content) + b''.join(geometries)
+
+
+def encode_geometries(rows: list, options: GeometryOptions, key: str = 'geojson', id_key: str = 'id') -> bytes:
+    """
+    Encodes the geometries of rows as one collection, twkb lists the
+    integer ids of the rows.
+    """
+    rows = [row for row in rows if row[key] is not None]
+    geometries = [bytes(row[key]) for row in rows]
+
+    if options.encoding == 'wkb':
+        return encode_wkb_collection(geometries)
+
+    ids = [row.get(id_key) for row in rows]
+
+    if not all(isinstance(identifier, int) for identifier in ids):
+        ids = None
+
+    return encode_twkb_collection(geometries, ids, options.precision)
+
+
+def geometry_response(content, options: GeometryOptions, key: str = 'geojson', id_key: str = 'id') -> Response:
+    """
+    Returns content as json, or only its geometry when WKB or TWKB was
+    accepted, a list of rows as a collection.
+    """
+    if not options.binary:
+        return FastJSONResponse(content=content)
+
+    if isinstance(content, list):
+        body = encode_geometries(content, options, key, id_key)
+    else:
+        body = bytes(content[key])
+
+    return Response(content=body, media_type=GEOMETRY_MEDIA_TYPES[options.encoding])
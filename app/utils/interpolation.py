@@ -0,0 +1,143 @@
+import numpy as np
+
+
+EARTH_RADIUS = 6371008.8
+
+# standard atmosphere, temperatures drop by 0.65 K per 100 m
+LAPSE_RATE = 0.0065
+
+# temperature elements in Kelvin that are corrected for the elevation
+TEMPERATURE_ELEMENTS = frozenset(('TTT', 'TX', 'TN', 'TM', 'T5cm'))
+
+# directions in degrees are averaged as unit vectors
+DIRECTION_ELEMENTS = frozenset(('DD',))
+
+
+def get_distances(lat: float, lng: float, lats: np.ndarray, lngs: np.ndarray) -> np.ndarray:
+    """
+    Returns the haversine distances in meters between a position and the
+    given station coordinates.
+    """
+    phi, lam = np.radians(lat), np.radians(lng)
+    phis, lams = np.radians(lats), np.radians(lngs)
+
+    a = (
+        np.sin((phis - phi) / 2) ** 2
+        + np.cos(phi) * np.cos(phis) * np.sin((lams - lam) / 2) ** 2
+    )
+
+    return 2 * EARTH_RADIUS * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def get_weights(distances: np.ndarray, power: float = 2.0) -> np.ndarray:
+    """
+    Returns the normalized inverse distance weights, a station within a
+    meter of the position takes all of the weight.
+    """
+    distances = np.asarray(distances, dtype=np.float64)
+    close = distances < 1.0
+
+    if close.any():
+        weights = close.astype(np.float64)
+    else:
+        weights = distances ** -power
+
+    return weights / weights.sum()
+
+
+def align_values(time_axis: np.ndarray, times: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """
+    Returns the values of a station on the given time axis, steps the
+    station does not forecast are NaN.
+    """
+    if times.shape == time_axis.shape and np.array_equal(times, time_axis):
+        return values
+
+    aligned = np.full(time_axis.shape, np.nan, dtype=np.float32)
+    count = min(len(values), len(times))
+
+    if not count:
+        return aligned
+
+    times = times[:count]
+    index = np.minimum(np.searchsorted(times, time_axis), count - 1)
+    found = times[index] == time_axis
+
+    aligned[found] = values[index[found]]
+
+    return aligned
+
+
+def interpolate(weights: np.ndarray, matrix: np.ndarray) -> np.ndarray:
+    """
+    Interpolates a matrix of stations by time steps, undefined values are
+    left out and the weights of the remaining stations renormalized per step.
+    """
+    defined = ~np.isnan(matrix)
+    step_weights = np.where(defined, weights[:, np.newaxis], 0.0)
+    total = step_weights.sum(axis=0)
+
+    summed = np.where(defined, matrix, 0.0) * step_weights
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return summed.sum(axis=0) / total
+
+
+def interpolate_direction(weights: np.ndarray, matrix: np.ndarray) -> np.ndarray:
+    radians = np.radians(matrix)
+
+    u = interpolate(weights, np.sin(radians))
+    v = interpolate(weights, np.cos(radians))
+
+    # rounded first, a direction just below north would otherwise be 360
+    return np.round(np.degrees(np.arctan2(u, v)), 2) % 360
+
+
+def interpolate_forecasts(
+    forecasts: list,
+    distances: np.ndarray,
+    elevations: np.ndarray | None = None,
+    elevation: float | None = None,
+    power: float = 2.0
+) -> dict:
+    """
+    Interpolates the element arrays of several station forecasts by their
+    inverse distance to a position. The time axis of the first forecast is
+    used. With a target elevation the temperatures of each station are
+    corrected by the standard lapse rate before they are weighted.
+    """
+    weights = get_weights(distances, power)
+    time_axis = forecasts[0]['time']
+
+    names = list(dict.fromkeys(
+        name for forecast in forecasts for name in forecast['elements']
+    ))
+
+    corrections = None
+
+    if elevation is not None and elevations is not None:
+        offsets = np.asarray(elevations, dtype=np.float64) - elevation
+        corrections = np.nan_to_num(offsets * LAPSE_RATE)[:, np.newaxis]
+
+    elements = {}
+
+    for name in names:
+        matrix = np.vstack([
+            align_values(
+                time_axis,
+                forecast['time'],
+                forecast['elements'].get(name, np.empty(0, dtype=np.float32))
+            )
+            for forecast in forecasts
+        ]).astype(np.float64)
+
+        if name in DIRECTION_ELEMENTS:
+            elements[name] = interpolate_direction(weights, matrix).astype(np.float32)
+            continue
+
+        if corrections is not None and name in TEMPERATURE_ELEMENTS:
+            matrix = matrix + corrections
+
+        elements[name] = interpolate(weights, matrix).astype(np.float32)
+
+    return {'weights': weights, 'time': time_axis, 'elements': elements}
@@ -0,0 +1,49 @@
+import json
+
+from geojson import Feature, FeatureCollection
+
+from ..database import get_settings
+
+
+settings = get_settings()
+
+NEAREST_CANDIDATES = settings.nearest_candidates
+NEAREST_MAX_RESULTS = settings.nearest_max_results
+
+NEAREST_RESPONSES = {
+    200: {'description': 'OK'},
+    400: {'description': 'Bad Request'},
+    404: {'description': 'Not Found'},
+    422: {'description': 'Unprocessable Entity'},
+}
+
+# row keys that are part of the feature instead of its properties
+HIDDEN_KEYS = ('geojson', 'feature', 'lat', 'lng')
+
+
+def create_nearest_collection(rows: list, id_key: str) -> FeatureCollection:
+    """
+    Creates a FeatureCollection of nearest rows in order of their distance
+    in meters, which is added to the properties.
+    """
+    features = []
+
+    for row in rows:
+        geometry = row['geojson']
+
+        properties = {
+            key: value for key, value in row.items()
+            if key not in HIDDEN_KEYS and key != id_key
+        }
+        properties['distance'] = round(float(row['distance']), 1)
+
+        features.append(Feature(
+            id=row[id_key],
+            geometry=json.loads(geometry) if isinstance(geometry, str) else geometry,
+            properties=properties
+        ))
+
+    crs = {'type': 'name', 'properties': {
+        'name': 'urn:ogc:def:crs:OGC:1.3:CRS84'}}
+
+    return FeatureCollection(features, crs=crs)
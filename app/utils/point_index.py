@@ -0,0 +1,135 @@
+import numpy as np
+import shapely
+
+from shapely import STRtree
+
+from .interpolation import EARTH_RADIUS, get_distances
+
+
+def get_unit_vectors(lats, lngs) -> np.ndarray:
+    phi, lam = np.radians(lats), np.radians(lngs)
+
+    return np.stack([
+        np.cos(phi) * np.cos(lam),
+        np.cos(phi) * np.sin(lam),
+        np.sin(phi)
+    ], axis=-1)
+
+
+def get_radius_boxes(lat: float, lng: float, radius: float) -> list:
+    """
+    Returns the boxes in degrees that cover the circle of radius meters
+    around a point on the sphere. A circle around a pole spans every
+    longitude, one across the antimeridian is split into two boxes.
+    """
+    angle = radius / EARTH_RADIUS
+    dlat = np.degrees(angle)
+
+    ymin = max(lat - dlat, -90.0)
+    ymax = min(lat + dlat, 90.0)
+
+    # widest longitude extent of the circle, reached north or south of lat
+    ratio = np.sin(angle) / np.cos(np.radians(lat)) if ymin > -90 and ymax < 90 else 2.0
+
+    if angle >= np.pi / 2 or ratio >= 1:
+        return [shapely.box(-180.0, ymin, 180.0, ymax)]
+
+    dlng = np.degrees(np.arcsin(ratio))
+    xmin, xmax = lng - dlng, lng + dlng
+
+    if xmin < -180:
+        return [shapely.box(xmin + 360, ymin, 180.0, ymax), shapely.box(-180.0, ymin, xmax, ymax)]
+
+    if xmax > 180:
+        return [shapely.box(xmin, ymin, 180.0, ymax), shapely.box(-180.0, ymin, xmax - 360, ymax)]
+
+    return [shapely.box(xmin, ymin, xmax, ymax)]
+
+
+class PointIndex:
+    """
+    Immutable index over the rows of a point layer, each row carries its
+    coordinates as lat and lng.
+
+    Bounding box and radius queries select candidates from an STRtree in
+    degrees, radius candidates are refined by their haversine distance.
+    Nearest queries rank every point by the dot product of unit vectors,
+    which orders like the great circle distance without trigonometry per
+    point, the layers are small enough for that to take microseconds.
+    """
+
+    def __init__(self, rows: list):
+        self.rows = [dict(row) for row in rows]
+        self.lats = np.array([float(row['lat']) for row in self.rows], dtype=np.float64)
+        self.lngs = np.array([float(row['lng']) for row in self.rows], dtype=np.float64)
+        self.tree = STRtree(shapely.points(self.lngs, self.lats))
+        self.vectors = get_unit_vectors(self.lats, self.lngs)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def select(self, indices: np.ndarray) -> list:
+        return [self.rows[i] for i in indices]
+
+    def query_nearest(self, lat: float, lng: float, k: int = 1, max_distance: float | None = None) -> tuple:
+        """
+        Returns the indices of the k nearest rows ordered by distance and
+        their distances in meters, at most max_distance meters away if given.
+        """
+        if not self.rows:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.float64)
+
+        similarity = self.vectors @ get_unit_vectors(lat, lng)
+        k = min(k, len(similarity))
+
+        indices = np.argpartition(-similarity, k - 1)[:k]
+        indices = indices[np.argsort(-similarity[indices], kind='stable')]
+        distances = get_distances(lat, lng, self.lats[indices], self.lngs[indices])
+
+        if max_distance is not None:
+            indices = indices[distances <= max_distance]
+            distances = distances[distances <= max_distance]
+
+        return indices, distances
+
+    def nearest(self, lat: float, lng: float, k: int = 1, max_distance: float | None = None) -> list:
+        indices, _ = self.query_nearest(lat, lng, k, max_distance)
+
+        return self.select(indices)
+
+    def nearest_with_distance(self, lat: float, lng: float, k: int = 1, max_distance: float | None = None) -> list:
+        indices, distances = self.query_nearest(lat, lng, k, max_distance)
+
+        return [
+            {**self.rows[i], 'distance': distance}
+            for i, distance in zip(indices, distances.tolist())
+        ]
+
+    def radius(self, lat: float, lng: float, radius: float) -> list:
+        """
+        Returns the rows within radius meters ordered by distance.
+        """
+        boxes = get_radius_boxes(lat, lng, radius)
+
+        if len(boxes) == 1:
+            candidates = self.tree.query(boxes[0])
+        else:
+            candidates = np.unique(self.tree.query(boxes)[1])
+
+        if not len(candidates):
+            return []
+
+        distances = get_distances(lat, lng, self.lats[candidates], self.lngs[candidates])
+        order = np.argsort(distances, kind='stable')
+        order = order[distances[order] <= radius]
+
+        return self.select(candidates[order])
+
+    def bbox(self, xmin: float, ymin: float, xmax: float, ymax: float) -> list:
+        """
+        Returns the rows strictly inside the bounding box like ST_Within.
+        """
+        box = shapely.box(xmin, ymin, xmax, ymax)
+        candidates = self.tree.query(box, predicate='contains_properly')
+
+        return self.select(np.sort(candidates))
@@ -0,0 +1,195 @@
+import types
+import asyncio
+import orjson
+
+from decimal import Decimal
+from functools import wraps
+from typing import Any, Callable, Union, get_args, get_origin
+
+from fastapi.responses import JSONResponse, Response
+from fastapi.routing import APIRoute
+from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.engine import Row, RowMapping
+from sqlalchemy.types import Text, TypeDecorator
+
+
+OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+# encoders for types orjson does not know, looked up along the mro
+serializers: dict[type, Callable[[Any], Any]] = {}
+
+
+def register_serializer(cls: type, func: Callable[[Any], Any]):
+    serializers[cls] = func
+
+    return func
+
+
+def encode_decimal(value: Decimal):
+    # same as fastapi, integral numerics stay integers
+    if value.as_tuple().exponent >= 0:
+        return int(value)
+
+    return float(value)
+
+
+def encode_mapped(value) -> dict:
+    # loaded attributes only, like jsonable_encoder without the instance state
+    return {
+        key: item for key, item in vars(value).items()
+        if not key.startswith('_sa')
+    }
+
+
+register_serializer(Decimal, encode_decimal)
+register_serializer(RowMapping, dict)
+register_serializer(Row, lambda value: dict(value._mapping))
+register_serializer(set, list)
+register_serializer(frozenset, list)
+register_serializer(BaseModel, lambda value: value.model_dump(mode='json'))
+
+
+def default(value):
+    func = serializers.get(type(value))
+
+    if func is not None:
+        return func(value)
+
+    for cls in type(value).__mro__[1:]:
+        func = serializers.get(cls)
+
+        if func is not None:
+            return func(value)
+
+    # instances of any declarative base
+    if hasattr(type(value), '__mapper__'):
+        return encode_mapped(value)
+
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def dumps(content) -> bytes:
+    """
+    Encodes content to json in one pass, dates and times as iso strings,
+    rows and model instances as objects.
+    """
+    return orjson.dumps(content, default=default, option=OPTIONS)
+
+
+def fragment(content: str | bytes) -> orjson.Fragment:
+    """
+    Wraps already encoded json, e.g. the text of ST_AsGeoJSON, so that
+    dumps splices it in without parsing it.
+    """
+    return orjson.Fragment(content)
+
+
+class GeoJSON(TypeDecorator):
+    """
+    Column type for ST_AsGeoJSON, the text is kept as a fragment instead
+    of being parsed into dicts and encoded again.
+    """
+    impl = Text
+    cache_ok = True
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else fragment(value)
+
+
+def to_mapping(value):
+    if isinstance(value, dict):
+        return value
+
+    if isinstance(value, RowMapping):
+        return dict(value)
+
+    if isinstance(value, Row):
+        return dict(value._mapping)
+
+    if hasattr(type(value), '__mapper__'):
+        return encode_mapped(value)
+
+    return None
+
+
+def get_projection(annotation) -> Callable[[Any], Any] | None:
+    """
+    Returns a function that keeps only the fields annotation declares of
+    a result, None when the result is passed on as is.
+    """
+    origin = get_origin(annotation)
+
+    if origin is Union or origin is types.UnionType:
+        projections = [get_projection(arg) for arg in get_args(annotation) if arg is not type(None)]
+
+        return next((projection for projection in projections if projection is not None), None)
+
+    if origin is list:
+        args = get_args(annotation)
+        item = get_projection(args[0]) if args else None
+
+        if item is None:
+            return None
+
+        return lambda value: [item(element) for element in value] if isinstance(value, list) else value
+
+    if not (isinstance(annotation, type) and issubclass(annotation, BaseModel)):
+        return None
+
+    fields = {
+        name: get_projection(field.annotation)
+        for name, field in annotation.model_fields.items()
+    }
+
+    def project(value):
+        mapping = to_mapping(value)
+
+        # fragments, encoded geometries and model instances are final
+        if mapping is None:
+            return value
+
+        return {
+            name: projection(mapping[name]) if projection is not None and mapping[name] is not None else mapping[name]
+            for name, projection in fields.items()
+            if name in mapping
+        }
+
+    return project
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+class FastJSONRoute(APIRoute):
+    """
+    Encodes the return value of an endpoint with dumps. The response model
+    is not validated again, the result is only reduced to its fields.
+    """
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        status_code = kwargs.get('status_code')
+        is_coroutine = asyncio.iscoroutinefunction(endpoint)
+        projection = get_projection(kwargs.get('response_model'))
+
+        @wraps(endpoint)
+        async def wrapper(**values):
+            if is_coroutine:
+                result = await endpoint(**values)
+            else:
+                result = await run_in_threadpool(endpoint, **values)
+
+            if isinstance(result, Response):
+                return result
+
+            if projection is not None:
+                result = projection(result)
+
+            if status_code is None:
+                return FastJSONResponse(result)
+
+            return FastJSONResponse(result, status_code=status_code)
+
+        super().__init__(path, wrapper, **kwargs)
@@ -0,0 +1,45 @@
+from fastapi import Query
+
+
+# tolerances in degrees precomputed by data/vg25_simplified_schema.sql
+BOUNDARY_TOLERANCES = (0.0001, 0.0005, 0.002, 0.01)
+
+ZOOM_DESCRIPTION = 'Map zoom level, the boundary is simplified to about one pixel'
+
+TOLERANCE_DESCRIPTION = (
+    'Simplification tolerance in degrees, the largest precomputed tolerance '
+    'not above it is used'
+)
+
+SIMPLIFY_DESCRIPTION = (
+    'Pass zoom or tolerance to receive a precomputed simplified boundary, '
+    'bounding box and shape area stay those of the full geometry.'
+)
+
+
+def get_zoom_tolerance(zoom: int) -> float:
+    # degrees covered by one pixel of a 256 pixel web mercator tile
+    return 360 / (256 * 2 ** zoom)
+
+
+def get_simplification_tolerance(tolerance: float) -> float | None:
+    """
+    Returns the largest precomputed tolerance not above tolerance, or None
+    when even the smallest one would lose visible detail.
+    """
+    candidates = [value for value in BOUNDARY_TOLERANCES if value <= tolerance]
+
+    return max(candidates) if candidates else None
+
+
+def get_boundary_tolerance(
+    zoom: int = Query(None, ge=0, le=22, description=ZOOM_DESCRIPTION),
+    tolerance: float = Query(None, gt=0, description=TOLERANCE_DESCRIPTION)
+) -> float | None:
+    if tolerance is not None:
+        return get_simplification_tolerance(tolerance)
+
+    if zoom is not None:
+        return get_simplification_tolerance(get_zoom_tolerance(zoom))
+
+    return None
@@ -0,0 +1,45 @@
+import asyncio
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key into one in-flight call.
+
+    The first caller of a key starts the call as a task, every caller that
+    arrives before it finished awaits the same task. The task is shielded,
+    a cancelled caller does not cancel the call of the others.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.shared = 0
+        self._flights = {}
+
+    async def do(self, key, func, *args):
+        task = self._flights.get(key)
+
+        if task is None:
+            task = asyncio.ensure_future(func(*args))
+            task.add_done_callback(lambda t: self._done(key, t))
+
+            self._flights[key] = task
+            self.calls += 1
+        else:
+            self.shared += 1
+
+        return await asyncio.shield(task)
+
+    def _done(self, key, task: asyncio.Future):
+        if self._flights.get(key) is task:
+            del self._flights[key]
+
+        # mark the exception as retrieved when every caller went away
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict:
+        return {
+            'in_flight': len(self._flights),
+            'calls': self.calls,
+            'shared': self.shared
+        }
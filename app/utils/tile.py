@@ -0,0 +1,61 @@
+import math
+import hashlib
+
+from fastapi import Request, Response, status
+
+from ..database import get_settings
+
+
+TILE_MEDIA_TYPE = 'application/vnd.mapbox-vector-tile'
+
+TILE_MAX_AGE = get_settings().tile_max_age
+
+TILE_RESPONSES = {
+    200: {'description': 'OK', 'content': {TILE_MEDIA_TYPE: {}}},
+    204: {'description': 'No Content'},
+    304: {'description': 'Not Modified'},
+    400: {'description': 'Bad Request'},
+    422: {'description': 'Unprocessable Entity'},
+}
+
+
+def tile_response(request: Request, tile: bytes) -> Response:
+    headers = {
+        'Cache-Control': f'public, max-age={TILE_MAX_AGE}'
+    }
+
+    if not tile:
+        return Response(status_code=status.HTTP_204_NO_CONTENT, headers=headers)
+
+    etag = f'"{hashlib.md5(tile).hexdigest()}"'
+    headers['ETag'] = etag
+
+    if request.headers.get('if-none-match') == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return Response(content=tile, media_type=TILE_MEDIA_TYPE, headers=headers)
+
+
+def get_tile_range(
+    xmin: float,
+    ymin: float,
+    xmax: float,
+    ymax: float,
+    z: int
+) -> tuple:
+    """
+    Returns the x and y ranges of the web mercator tiles at zoom level z
+    that cover the WGS84 bounding box.
+    """
+    def to_tile(lng, lat):
+        lat = max(min(lat, 85.0511), -85.0511)
+        n = 2 ** z
+        x = int((lng + 180.0) / 360.0 * n)
+        y = int((1.0 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2.0 * n)
+
+        return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+    x0, y0 = to_tile(xmin, ymax)
+    x1, y1 = to_tile(xmax, ymin)
+
+    return range(x0, x1 + 1), range(y0, y1 + 1)
@@ -0,0 +1,196 @@
+import orjson
+
+from .serializer import dumps
+
+
+def get_polygons(geometry: dict) -> list:
+    if geometry['type'] == 'Polygon':
+        return [geometry['coordinates']]
+
+    if geometry['type'] == 'MultiPolygon':
+        return geometry['coordinates']
+
+    raise ValueError(f'{geometry["type"]} can not be encoded as a boundary')
+
+
+def quantize_ring(ring: list, x0: float, y0: float, kx: float, ky: float) -> list | None:
+    """
+    Returns the ring as open list of integer points without repeated
+    points, None when less than three points remain.
+    """
+    points = []
+
+    for coordinate in ring:
+        point = (round((coordinate[0] - x0) * kx), round((coordinate[1] - y0) * ky))
+
+        if not points or points[-1] != point:
+            points.append(point)
+
+    if len(points) > 1 and points[0] == points[-1]:
+        points.pop()
+
+    return points if len(points) >= 3 else None
+
+
+def find_junctions(rings: list) -> set:
+    """
+    Returns the points where rings meet or part, a point reached from
+    different neighbours by two rings starts a new arc.
+    """
+    neighbours = {}
+    junctions = set()
+
+    for ring in rings:
+        count = len(ring)
+
+        for i, point in enumerate(ring):
+            previous, following = ring[i - 1], ring[(i + 1) % count]
+            pair = (previous, following) if previous <= following else (following, previous)
+            seen = neighbours.setdefault(point, pair)
+
+            if seen != pair:
+                junctions.add(point)
+
+    return junctions
+
+
+def cut_ring(ring: list, junctions: set) -> list:
+    start = next((i for i, point in enumerate(ring) if point in junctions), None)
+
+    # rings without junctions start at their smallest point, an enclave
+    # and the hole around it are found as one arc in both directions
+    if start is None:
+        start = ring.index(min(ring))
+
+        return [ring[start:] + ring[:start + 1]]
+
+    ring = ring[start:] + ring[:start + 1]
+    arcs = []
+    begin = 0
+
+    for i in range(1, len(ring)):
+        if ring[i] in junctions:
+            arcs.append(ring[begin:i + 1])
+            begin = i
+
+    return arcs
+
+
+def index_arc(arc: list, arcs: list, index: dict) -> int:
+    key = tuple(arc)
+    position = index.get(key)
+
+    if position is not None:
+        return position
+
+    position = index.get(key[::-1])
+
+    if position is not None:
+        return ~position
+
+    index[key] = len(arcs)
+    arcs.append(arc)
+
+    return index[key]
+
+
+def encode_arc(arc: list) -> list:
+    # first point absolute, every further point relative to its predecessor
+    encoded = [arc[0]]
+
+    for previous, point in zip(arc, arc[1:]):
+        encoded.append((point[0] - previous[0], point[1] - previous[1]))
+
+    return encoded
+
+
+def encode_topology(
+    rows: list,
+    name: str,
+    quantization: int = 100000,
+    key: str = 'geojson',
+    id_key: str = 'id'
+) -> bytes:
+    """
+    Encodes the GeoJSON polygons of rows as one TopoJSON object named
+    name. Coordinates are quantized, borders shared by several rows are
+    stored once as delta encoded arc, the other columns of a row become
+    the properties of its geometry.
+    """
+    features = []
+    xmin = ymin = float('inf')
+    xmax = ymax = float('-inf')
+
+    for row in rows:
+        geometry = orjson.loads(row[key]) if row[key] is not None else None
+        features.append((row, geometry))
+
+        for polygon in get_polygons(geometry) if geometry else []:
+            for coordinate in polygon[0]:
+                xmin = min(xmin, coordinate[0])
+                ymin = min(ymin, coordinate[1])
+                xmax = max(xmax, coordinate[0])
+                ymax = max(ymax, coordinate[1])
+
+    if xmin > xmax:
+        xmin = ymin = xmax = ymax = 0
+
+    kx = (quantization - 1) / (xmax - xmin) if xmax > xmin else 1
+    ky = (quantization - 1) / (ymax - ymin) if ymax > ymin else 1
+
+    # polygons of every row as quantized rings, a collapsed exterior drops the polygon
+    quantized = []
+
+    for row, geometry in features:
+        polygons = []
+
+        for polygon in get_polygons(geometry) if geometry else []:
+            rings = [quantize_ring(ring, xmin, ymin, kx, ky) for ring in polygon]
+
+            if rings[0] is not None:
+                polygons.append([ring for ring in rings if ring is not None])
+
+        quantized.append(polygons)
+
+    junctions = find_junctions([ring for polygons in quantized for polygon in polygons for ring in polygon])
+
+    arcs = []
+    index = {}
+    geometries = []
+
+    for (row, geometry), polygons in zip(features, quantized):
+        properties = {column: value for column, value in row.items() if column not in (key, id_key)}
+
+        polygon_arcs = [
+            [
+                [index_arc(arc, arcs, index) for arc in cut_ring(ring, junctions)]
+                for ring in polygon
+            ]
+            for polygon in polygons
+        ]
+
+        if not polygon_arcs:
+            topology_geometry = {'type': None}
+        elif geometry['type'] == 'Polygon':
+            topology_geometry = {'type': 'Polygon', 'arcs': polygon_arcs[0]}
+        else:
+            topology_geometry = {'type': 'MultiPolygon', 'arcs': polygon_arcs}
+
+        if row.get(id_key) is not None:
+            topology_geometry['id'] = row[id_key]
+
+        topology_geometry['properties'] = properties
+        geometries.append(topology_geometry)
+
+    return dumps({
+        'type': 'Topology',
+        'bbox': [xmin, ymin, xmax, ymax],
+        'transform': {
+            'scale': [1 / kx, 1 / ky],
+            'translate': [xmin, ymin]
+        },
+        'objects': {
+            name: {'type': 'GeometryCollection', 'geometries': geometries}
+        },
+        'arcs': [encode_arc(arc) for arc in arcs]
+    })
@@ -74,3 +74,17 @@ def validate_utf8_string(value: str) -> str:
         )
 
     return value
+
+
+def validate_tile_coordinates(z: int, x: int, y: int) -> tuple:
+    if z < 0 or z > 22:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail='Zoom level must be between 0 and 22.'
+        )
+    if x < 0 or y < 0 or x >= 2 ** z or y >= 2 ** z:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f'Tile coordinates must be between 0 and {2 ** z - 1} at zoom level {z}.'
+        )
+    return z, x, y
@@ -0,0 +1,174 @@
+import asyncio
+import time
+
+from fastapi import FastAPI
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from .database import async_session, engine, get_settings, log
+from .services.administrative import get_parcel_meta_by_lat_lng
+from .services.school import get_school_by_slug
+from .services.energy import (
+    get_combustion_unit_by_id,
+    get_nuclear_unit_by_id,
+    get_water_unit_by_id,
+    get_biomass_unit_by_id,
+    get_wind_unit_by_id,
+    get_solar_unit_by_id
+)
+
+
+# statements that are prepared on every pooled connection during startup,
+# the arguments do not have to match any row
+HOT_STATEMENTS = [
+    (get_combustion_unit_by_id, ('SEE000000000000',)),
+    (get_nuclear_unit_by_id, ('SEE000000000000',)),
+    (get_water_unit_by_id, ('SEE000000000000',)),
+    (get_biomass_unit_by_id, ('SEE000000000000',)),
+    (get_wind_unit_by_id, ('SEE000000000000',)),
+    (get_solar_unit_by_id, ('SEE000000000000',)),
+    (get_school_by_slug, ('warmup',)),
+    (get_parcel_meta_by_lat_lng, (0.0, 0.0))
+]
+
+# coroutine functions taking a session which fill in-memory caches of
+# small static tables, see register_warmup
+CACHE_WARMERS = []
+
+
+class WarmupState:
+    def __init__(self):
+        self.ready = False
+        self.finished = False
+        self.started_at = None
+        self.duration = None
+        self.connections = 0
+        self.statements = 0
+        self.caches = 0
+        self.errors = []
+        self.first_request_logged = False
+
+    def as_dict(self) -> dict:
+        return {
+            'ready': self.ready,
+            'finished': self.finished,
+            'warmup_seconds': self.duration,
+            'connections': self.connections,
+            'prepared_statements': self.statements,
+            'caches': self.caches,
+            'errors': self.errors
+        }
+
+
+state = WarmupState()
+
+
+def register_warmup(func):
+    CACHE_WARMERS.append(func)
+
+    return func
+
+
+async def prepare_connection(connection: AsyncConnection) -> int:
+    prepared = 0
+
+    async with AsyncSession(bind=connection) as session:
+        for func, args in HOT_STATEMENTS:
+            await func(session, *args)
+            prepared += 1
+
+    return prepared
+
+
+async def warm_pool(count: int):
+    # all connections are held at the same time, otherwise the pool would
+    # hand out the same connection again and again
+    opened = await asyncio.gather(
+        *[engine.connect() for _ in range(count)],
+        return_exceptions=True
+    )
+
+    connections = [c for c in opened if isinstance(c, AsyncConnection)]
+    state.errors.extend(
+        f'connection: {c}' for c in opened if isinstance(c, Exception)
+    )
+
+    try:
+        results = await asyncio.gather(
+            *[prepare_connection(c) for c in connections],
+            return_exceptions=True
+        )
+    finally:
+        for connection in connections:
+            await connection.close()
+
+    for result in results:
+        if isinstance(result, Exception):
+            state.errors.append(f'statement: {result}')
+        else:
+            state.connections += 1
+            state.statements += result
+
+
+async def warm_caches():
+    async with async_session() as session:
+        for func in CACHE_WARMERS:
+            try:
+                await func(session)
+                state.caches += 1
+            except Exception as e:
+                state.errors.append(f'{func.__name__}: {e}')
+
+
+async def run_warmup(app: FastAPI):
+    state.started_at = time.perf_counter()
+
+    await warm_pool(get_settings().pool_size)
+    await warm_caches()
+
+    app.openapi()
+
+    state.duration = round(time.perf_counter() - state.started_at, 3)
+    state.finished = True
+
+    # a worker whose connections or caches failed to warm up is not ready
+    state.ready = len(state.errors) == 0
+
+    log.info(
+        'warm-up finished in %ss: connections=%s prepared_statements=%s '
+        'caches=%s errors=%s',
+        state.duration,
+        state.connections,
+        state.statements,
+        state.caches,
+        len(state.errors)
+    )
+
+    for error in state.errors:
+        log.warning('warm-up error: %s', error)
+
+
+class FirstRequestTimer:
+    """
+    ASGI middleware which logs the latency of the first http request
+    served by this worker and gets out of the way afterwards.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if state.first_request_logged or scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        state.first_request_logged = True
+        started_at = time.perf_counter()
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            log.info(
+                'first request %s served in %sms',
+                scope['path'],
+                round((time.perf_counter() - started_at) * 1000, 2)
+            )
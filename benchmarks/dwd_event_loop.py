@@ -0,0 +1,133 @@
+import os
+import time
+import click
+import random
+import asyncio
+import aiohttp
+import threading
+import statistics
+import multiprocessing
+
+from aiohttp import web
+
+from benchmarks.mosmix_fixture import build_kmz
+
+
+def create_stub(kmz: bytes) -> web.Application:
+    async def handle_kmz(request):
+        return web.Response(body=kmz, content_type='application/vnd.google-earth.kmz')
+
+    # stands in for a lightweight endpoint served by the same uvicorn worker
+    async def handle_ping(request):
+        return web.json_response({'status': 'ok'})
+
+    stub = web.Application()
+    stub.router.add_get('/weather/local_forecasts/mos/MOSMIX_L/single_stations/{station_id}/kml/{filename}', handle_kmz)
+    stub.router.add_get('/ping', handle_ping)
+
+    return stub
+
+
+async def probe(url: str, interval: float, latencies: list, done: threading.Event):
+    async with aiohttp.ClientSession() as session:
+        while not done.is_set():
+            start = time.perf_counter()
+
+            async with session.get(url) as response:
+                await response.read()
+
+            latencies.append((time.perf_counter() - start) * 1000)
+            await asyncio.sleep(interval)
+
+
+async def run_mode(kmz: bytes, forecasts: int, concurrency: int, interval: float) -> dict:
+    # imported here, the pool mode is read from the environment on import
+    from app.client import close_client_session
+    from app.executor import shutdown_executor
+    from app.utils import dwd_kmz
+
+    runner = web.AppRunner(create_stub(kmz))
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    dwd_kmz.DWD_BASE_URL = f'http://127.0.0.1:{port}'
+
+    # start the pool before measuring, spawning processes is not part of a request
+    await dwd_kmz.run_in_executor(dwd_kmz.decode_kmz, kmz)
+
+    # the probing client has its own loop, a blocked server loop delays the
+    # answers but not the requests
+    latencies = []
+    done = threading.Event()
+    prober = threading.Thread(target=asyncio.run, args=(probe(f'http://127.0.0.1:{port}/ping', interval, latencies, done),))
+    prober.start()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch(station_id):
+        async with semaphore:
+            content = await dwd_kmz.download_station_kmz(station_id)
+            await dwd_kmz.parse_station_kmz(content)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[fetch(f'{10000 + i}') for i in range(forecasts)])
+    elapsed = time.perf_counter() - start
+
+    done.set()
+    await asyncio.to_thread(prober.join)
+
+    await close_client_session()
+    shutdown_executor()
+    await runner.cleanup()
+
+    latencies.sort()
+
+    return {
+        'probes': len(latencies),
+        'p50': statistics.median(latencies),
+        'p99': latencies[int(len(latencies) * 0.99)],
+        'max': latencies[-1],
+        'forecasts_per_second': forecasts / elapsed
+    }
+
+
+def measure(mode: str, kmz: bytes, forecasts: int, concurrency: int, interval: float, queue):
+    queue.put(asyncio.run(run_mode(kmz, forecasts, concurrency, interval)))
+
+
+@click.command()
+@click.option('--stations', '-s', type=int, default=20, help='Placemarks per synthetic document')
+@click.option('--forecasts', '-f', type=int, default=40, help='Forecasts downloaded and parsed per mode')
+@click.option('--concurrency', '-c', type=int, default=8, help='Concurrent forecast downloads')
+@click.option('--interval', '-i', type=float, default=0.005, help='Seconds between two probe requests')
+@click.option('--workers', '-w', type=int, default=2, help='Pool size of the thread and process modes')
+def main(stations, forecasts, concurrency, interval, workers):
+    random.seed(0)
+    kmz = build_kmz(stations=stations)
+
+    click.echo(f'document:    {len(kmz) / 1024 / 1024:.1f} MiB kmz, {stations} placemarks')
+    click.echo(f'{"mode":<10}{"probes":>8}{"p50 ms":>10}{"p99 ms":>10}{"max ms":>10}{"forecasts/s":>14}')
+
+    # every mode runs in a fresh process, the pool settings are read on import
+    context = multiprocessing.get_context('spawn')
+
+    for mode in ('inline', 'thread', 'process'):
+        os.environ['PARSE_EXECUTOR'] = mode
+        os.environ['PARSE_WORKERS'] = str(workers)
+        os.environ['PARSE_QUEUE_SIZE'] = str(forecasts)
+
+        queue = context.Queue()
+        process = context.Process(target=measure, args=(mode, kmz, forecasts, concurrency, interval, queue))
+        process.start()
+        result = queue.get()
+        process.join()
+
+        click.echo(
+            f'{mode:<10}{result["probes"]:>8}{result["p50"]:>10.1f}{result["p99"]:>10.1f}'
+            f'{result["max"]:>10.1f}{result["forecasts_per_second"]:>14.1f}'
+        )
+
+
+if __name__ == '__main__':
+    main()
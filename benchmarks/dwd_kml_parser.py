@@ -0,0 +1,199 @@
+import re
+import time
+import click
+import random
+import resource
+import statistics
+import zipfile
+import multiprocessing
+
+from datetime import datetime
+from io import BytesIO
+from lxml import etree
+
+from app.utils.dwd_kmz import FORECAST_ELEMENTS, format_time, read_kml
+from benchmarks.mosmix_fixture import build_kmz
+
+
+def numeric(s: str) -> float | int:
+    try:
+        if '-' in s:
+            return 0
+        return int(s)
+    except ValueError:
+        return round(float(s), 1)
+
+
+def get_element_value_as_list(tree: etree._ElementTree, element: str) -> list:
+    for df in tree.xpath(f'////*[name()="dwd:Forecast" and @*[name()="dwd:elementName" and .="{element}"]]'):
+        elements = re.sub(
+            r'\s+', ';', str(df.getchildren()[0].text).lstrip(' '))
+        lst = elements.split(";")
+        return [numeric(item) for item in lst]
+    return []
+
+
+# dom based parser the api used before the iterparse of app/utils/dwd_kmz.py
+def analyse(tree: etree._ElementTree) -> dict:
+    result = {}
+    result['station'] = {}
+
+    # Station ID
+    for df in tree.xpath('////*[name()="dwd:Issuer"]'):
+        result["issuer"] = df.text.strip()
+
+    # Product ID
+    for df in tree.xpath('////*[name()="dwd:ProductID"]'):
+        result["productId"] = df.text.strip()
+
+    # generating process
+    for df in tree.xpath('////*[name()="dwd:GeneratingProcess"]'):
+        result["generatingProcess"] = df.text.strip()
+
+    # Location name
+    for df in tree.xpath('////*[name()="kml:description"]'):
+        result["location"] = df.text.strip()
+
+    # Issue time
+    for df in tree.xpath('////*[name()="dwd:IssueTime"]'):
+        dt = datetime.fromisoformat(df.text.replace("Z", "+00:00"))
+        result["issue_time"] = dt.strftime("%Y-%m-%dT%H:%M:%S%z")
+
+    # Coordinates
+    for df in tree.xpath('////*[name()="kml:coordinates"]'):
+        result['station']["coordinates"] = df.text.split(',')
+
+    # Station id
+    for df in tree.xpath('//*[name()="kml:Placemark"]/*[name()="kml:name"]'):
+        result['station']["name"] = df.text.strip()
+
+    # Station name
+    for df in tree.xpath('//*[name()="kml:Placemark"]/*[name()="kml:description"]'):
+        result['station']["description"] = df.text.strip()
+
+    # Time steps
+    time_stamps = []
+    for df in tree.xpath('//*[name()="dwd:ForecastTimeSteps"]'):
+        for timeslot in df:
+            dt = datetime.fromisoformat(timeslot.text.replace("Z", "+00:00"))
+            time_stamps.append(dt.strftime("%Y-%m-%dT%H:%M:%S%z"))
+    result["timeSteps"] = time_stamps
+
+    # Weather values
+    def add_transformed(key: str, values: list, transform=None):
+        if transform:
+            result['station'][key] = [transform(v) for v in values]
+        else:
+            result['station'][key] = values
+
+    add_transformed("PPPP", get_element_value_as_list(tree, 'PPPP'))
+    add_transformed("FX1", get_element_value_as_list(tree, 'FX1'))
+    add_transformed("TTT", get_element_value_as_list(tree, 'TTT'))
+    add_transformed("RR1c", get_element_value_as_list(tree, 'RR1c'))
+    add_transformed("SunD1", get_element_value_as_list(tree, 'SunD1'))
+    add_transformed("FF", get_element_value_as_list(tree, 'FF'))
+    add_transformed("DD", get_element_value_as_list(tree, 'DD'))
+    add_transformed("Td", get_element_value_as_list(tree, 'Td'))
+    add_transformed("ww", get_element_value_as_list(tree, 'ww'))
+    add_transformed("SunD", get_element_value_as_list(tree, 'SunD'))
+    add_transformed("Neff", get_element_value_as_list(tree, 'Neff'))
+    add_transformed("R101", get_element_value_as_list(tree, 'R101'))
+
+    return result
+
+
+def parse_kml(source, elements: tuple | None = FORECAST_ELEMENTS) -> dict:
+    """
+    Parses a MOSMIX KML document with read_kml and returns the same
+    structure as analyse(), values as lists of numeric() and time steps as
+    strings. Elements of None returns every element of the document.
+    """
+    result, forecasts, time_steps = read_kml(
+        source, elements, lambda text: [numeric(v) for v in text.split()])
+
+    result['timeSteps'] = [format_time(step) for step in time_steps]
+
+    for name in (forecasts if elements is None else elements):
+        result['station'][name] = forecasts.get(name, [])
+
+    return result
+
+
+def read_fixture(path: str) -> bytes:
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path, 'r') as kmz:
+            return kmz.read(kmz.namelist()[0])
+
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def parse_dom(content: bytes) -> dict:
+    return analyse(etree.parse(BytesIO(content)))
+
+
+def parse_stream(content: bytes) -> dict:
+    return parse_kml(BytesIO(content))
+
+
+PARSERS = {'xpath': parse_dom, 'iterparse': parse_stream}
+
+
+def run_parser(name: str, content: bytes, repeat: int, queue):
+    parse = PARSERS[name]
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    timings = []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = parse(content)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    queue.put((timings, peak - baseline, result))
+
+
+def measure(name: str, content: bytes, repeat: int) -> tuple:
+    # every parser runs in a fresh process, ru_maxrss never goes down
+    context = multiprocessing.get_context('spawn')
+    queue = context.Queue()
+    process = context.Process(target=run_parser, args=(name, content, repeat, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+
+    return result
+
+
+@click.command()
+@click.option('--src', '-s', type=click.Path(exists=True), multiple=True, help='MOSMIX kmz or kml fixture, can be repeated')
+@click.option('--stations', type=int, default=1, help='Placemarks of the synthetic fixture used without --src')
+@click.option('--repeat', '-r', type=int, default=10, help='Number of runs per parser')
+def main(src, stations, repeat):
+    if src:
+        fixtures = {path: read_fixture(path) for path in src}
+    else:
+        random.seed(0)
+        kmz = build_kmz(stations=stations)
+        fixtures = {f'synthetic ({stations} stations)': read_fixture(BytesIO(kmz))}
+
+    click.echo(f'{"fixture":<36}{"MiB":>8}{"parser":>11}{"median ms":>11}{"p95":>9}{"peak RSS MiB":>14}')
+
+    for label, content in fixtures.items():
+        results = {}
+
+        for name in PARSERS:
+            timings, peak, results[name] = measure(name, content, repeat)
+            timings.sort()
+            p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+
+            # ru_maxrss is reported in KiB on linux
+            click.echo(f'{label[-36:]:<36}{len(content) / 1048576:>8.1f}{name:>11}{statistics.median(timings):>11.1f}{p95:>9.1f}{peak / 1024:>14.1f}')
+
+        if results['xpath'] != results['iterparse']:
+            click.echo(f'{label}: parsers returned different results', err=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+import time
+import zipfile
+import click
+import random
+import asyncio
+import aiohttp
+
+from aiohttp import web
+from io import BytesIO
+
+from app.client import close_client_session
+from app.database import get_settings
+from app.utils import dwd_kmz
+from app.utils.dwd_kmz import retrieve_station_kmz, parse_station_kmz, get_station_kmz_url
+from app.utils.singleflight import SingleFlight
+from benchmarks.dwd_kml_parser import parse_kml
+from benchmarks.mosmix_fixture import build_kmz
+
+
+# the parse is coalesced per station like the forecast cache does
+parses = SingleFlight()
+
+
+def create_stub(kmz: bytes, delay: float, counters: dict) -> web.Application:
+    async def handle(request):
+        counters['requests'] += 1
+        counters['connections'].add(request.transport.get_extra_info('peername'))
+
+        await asyncio.sleep(delay)
+
+        return web.Response(body=kmz, content_type='application/vnd.google-earth.kmz')
+
+    stub = web.Application()
+    stub.router.add_get('/weather/local_forecasts/mos/MOSMIX_L/single_stations/{station_id}/kml/{filename}', handle)
+
+    return stub
+
+
+async def fetch_per_request(url: str) -> dict:
+    # the former behaviour, a new client and connection for every request
+    async with aiohttp.ClientSession() as session:
+        async with session.get(url) as response:
+            content = await response.read()
+
+            with zipfile.ZipFile(BytesIO(content), 'r') as kmz:
+                return parse_kml(kmz.open(kmz.namelist()[0]))
+
+
+async def fetch_shared(station_id: str) -> dict:
+    content = await retrieve_station_kmz(station_id)
+
+    return await parses.do(station_id, parse_station_kmz, content)
+
+
+async def run_rounds(label, rounds, clients, stations, request, counters):
+    counters['requests'] = 0
+    counters['connections'] = set()
+    start = time.perf_counter()
+
+    for _ in range(rounds):
+        await asyncio.gather(*[
+            request(f'{10000 + i % stations}')
+            for i in range(clients)
+        ])
+
+    elapsed = time.perf_counter() - start
+    total = rounds * clients
+
+    click.echo(f'{label:<26}{total:>10}{counters["requests"]:>10}{len(counters["connections"]):>13}{elapsed:>10.2f}')
+
+    return counters['requests'], len(counters['connections'])
+
+
+def get_pool_limit() -> int:
+    # all downloads go to one host, 0 means no limit in aiohttp
+    settings = get_settings()
+    limits = [limit for limit in (settings.http_pool_size, settings.http_limit_per_host) if limit]
+
+    return min(limits) if limits else None
+
+
+async def run_benchmark(rounds, clients, stations, delay):
+    random.seed(0)
+    counters = {'requests': 0, 'connections': set()}
+
+    runner = web.AppRunner(create_stub(build_kmz(), delay, counters))
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    # point the downloads at the stub instead of opendata.dwd.de
+    dwd_kmz.DWD_BASE_URL = f'http://127.0.0.1:{port}'
+
+    click.echo(f'{"mode":<26}{"requests":>10}{"upstream":>10}{"connections":>13}{"seconds":>10}')
+
+    await run_rounds(
+        'per request client', rounds, clients, stations,
+        lambda station_id: fetch_per_request(get_station_kmz_url(station_id)),
+        counters
+    )
+    try:
+        upstream, connections = await run_rounds(
+            'shared client, coalesced', rounds, clients, stations,
+            fetch_shared,
+            counters
+        )
+    finally:
+        await close_client_session()
+        await runner.cleanup()
+
+    # every burst downloads each station once, over the pooled connections
+    expected = rounds * min(clients, stations)
+    limit = get_pool_limit()
+
+    if upstream != expected:
+        raise click.ClickException(f'{upstream} upstream requests instead of {expected}')
+
+    if limit is not None and connections > limit:
+        raise click.ClickException(f'{connections} connections exceed the pool size of {limit}')
+
+
+@click.command()
+@click.option('--rounds', '-r', type=int, default=5, help='Number of request bursts')
+@click.option('--clients', '-c', type=int, default=50, help='Concurrent requests per burst')
+@click.option('--stations', '-s', type=int, default=5, help='Distinct station ids per burst')
+@click.option('--delay', '-d', type=float, default=0.2, help='Seconds the stub server waits before answering')
+def main(rounds, clients, stations, delay):
+    asyncio.run(run_benchmark(rounds, clients, stations, delay))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+import json
+import time
+import click
+import random
+import statistics
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from geojson import Feature, FeatureCollection
+
+from app.utils.geojson import CRS84, encode_feature, encode_feature_collection, geojson_response
+
+
+def build_rows(count: int) -> list:
+    # rows as the bounds queries return them, geometry as ST_AsGeoJSON text
+    # with the six decimals the geojson package rounds to
+    return [
+        {
+            'id': i,
+            'label': f'Feature {i}',
+            'school_type': random.randint(1, 1024),
+            'geojson': json.dumps({
+                'type': 'Point',
+                'coordinates': [round(random.uniform(8.0, 11.4), 6), round(random.uniform(53.3, 55.1), 6)]
+            })
+        }
+        for i in range(count)
+    ]
+
+
+def respond_former(rows: list) -> bytes:
+    # json.loads per row, geojson objects, jsonable_encoder and JSONResponse
+    features = [
+        Feature(
+            id=row['id'],
+            geometry=json.loads(row['geojson']),
+            properties={'label': row['label'], 'school_type': row['school_type']}
+        )
+        for row in rows
+    ]
+
+    return JSONResponse(content=jsonable_encoder(FeatureCollection(features, crs=CRS84))).body
+
+
+def respond_rendered(features: list) -> bytes:
+    # features of the in-memory index are encoded once when it is loaded
+    return geojson_response(encode_feature_collection(features)).body
+
+
+def respond_database(content: str) -> bytes:
+    # the collection assembled by json_agg arrives as text
+    return geojson_response(content).body
+
+
+def cpu_time(func, repeat: int) -> float:
+    timings = []
+
+    for _ in range(repeat):
+        start = time.process_time()
+        func()
+        timings.append((time.process_time() - start) * 1000)
+
+    return statistics.median(timings)
+
+
+@click.command()
+@click.option('--features', '-f', type=int, default=5000, help='Features per bounding box')
+@click.option('--repeat', '-r', type=int, default=20, help='Requests per path')
+def main(features, repeat):
+    random.seed(0)
+
+    rows = build_rows(features)
+    rendered = [
+        encode_feature(row['id'], row['geojson'], {'label': row['label'], 'school_type': row['school_type']})
+        for row in rows
+    ]
+    content = encode_feature_collection(rendered).decode('utf-8')
+
+    assert json.loads(respond_former(rows)) == json.loads(respond_rendered(rendered)) == json.loads(respond_database(content))
+
+    click.echo(f'{"path":<34}{"cpu ms":>10}')
+
+    for label, func in [
+        ('json.loads, Feature, encoder', lambda: respond_former(rows)),
+        ('pre-rendered index features', lambda: respond_rendered(rendered)),
+        ('json_agg text passed through', lambda: respond_database(content))
+    ]:
+        click.echo(f'{label:<34}{cpu_time(func, repeat):>10.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+import gzip
+import json
+import time
+import click
+import random
+import statistics
+
+from io import BytesIO
+
+from app.utils.dwd_kmz import parse_forecast
+from app.utils.forecast_format import encode_json, encode_columns, encode_binary, decode_binary
+from benchmarks.dwd_kml_parser import parse_kml, read_fixture
+from benchmarks.mosmix_fixture import build_kml
+
+
+def dump_lists(data: dict) -> bytes:
+    # the former payload, parse_kml lists serialized as they are
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def time_call(func, repeat: int) -> float:
+    timings = []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    return statistics.median(timings)
+
+
+@click.command()
+@click.option('--src', '-s', type=click.Path(exists=True), help='Path to a MOSMIX_L kmz or kml file of one station')
+@click.option('--repeat', '-r', type=int, default=50, help='Repetitions per format')
+@click.option('--undefined', '-u', type=float, default=0.05, help='Share of undefined values of the synthetic document')
+def main(src, repeat, undefined):
+    random.seed(0)
+    content = read_fixture(src) if src else build_kml(undefined=undefined)
+
+    data = parse_kml(BytesIO(content))
+    forecast = parse_forecast(BytesIO(content))
+
+    # the buffer restores the arrays exactly, the json formats are derived from them
+    assert encode_json(decode_binary(encode_binary(forecast))) == dump_lists(data)
+
+    formats = {
+        'lists json': lambda: dump_lists(data),
+        'array json': lambda: encode_json(forecast),
+        'columnar': lambda: encode_columns(forecast),
+        'binary': lambda: encode_binary(forecast)
+    }
+
+    click.echo(f'parse lists:  {time_call(lambda: parse_kml(BytesIO(content)), repeat):.2f} ms')
+    click.echo(f'parse arrays: {time_call(lambda: parse_forecast(BytesIO(content)), repeat):.2f} ms')
+    click.echo(f'parse TTT:    {time_call(lambda: parse_forecast(BytesIO(content), ("TTT",)), repeat):.2f} ms')
+    click.echo(f'parse all:    {time_call(lambda: parse_forecast(BytesIO(content), None), repeat):.2f} ms')
+    click.echo(f'{"format":<12}{"bytes":>10}{"gzip":>10}{"encode ms":>12}')
+
+    for name, encode in formats.items():
+        payload = encode()
+
+        click.echo(f'{name:<12}{len(payload):>10}{len(gzip.compress(payload)):>10}{time_call(encode, repeat):>12.3f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+import json
+import time
+import click
+import random
+import asyncio
+import statistics
+
+from datetime import date
+from decimal import Decimal
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from sqlalchemy.engine.result import IteratorResult, SimpleResultMetaData
+
+from app.schemas.climate import MosmixStationResponse
+from app.utils.serializer import FastJSONResponse, fragment
+
+
+def build_mappings(keys: list, values: list) -> list:
+    # RowMapping instances as result.mappings().all() returns them
+    return IteratorResult(SimpleResultMetaData(keys), iter(values)).mappings().all()
+
+
+def build_point() -> str:
+    return json.dumps({
+        'type': 'Point',
+        'coordinates': [random.uniform(-180, 180), random.uniform(-90, 90)]
+    })
+
+
+def build_polygon(vertices: int) -> str:
+    ring = [[random.uniform(8.0, 11.4), random.uniform(53.3, 55.1)] for _ in range(vertices)]
+
+    return json.dumps({'type': 'MultiPolygon', 'coordinates': [[ring + ring[:1]]]})
+
+
+def build_mosmix_stations(count: int, geojson) -> list:
+    keys = ['station_id', 'icao_code', 'station_name', 'station_elevation', 'geojson']
+
+    return build_mappings(keys, [
+        (f'{10000 + i}', None if i % 3 else f'E{i:03}', f'Station {i}', random.randint(-5, 3000), geojson(build_point()))
+        for i in range(count)
+    ])
+
+
+def build_units(count: int) -> list:
+    keys = [
+        'unit_registration_number', 'unit_name', 'municipality_key', 'gross_power',
+        'net_rated_power', 'latitude', 'longitude', 'commissioning_date', 'last_update'
+    ]
+
+    return build_mappings(keys, [
+        (
+            f'SEE9{i:08}', f'Unit {i}', '01001000',
+            Decimal(f'{random.uniform(1, 5000):.3f}'), Decimal(random.randint(1, 5000)),
+            Decimal(f'{random.uniform(53.3, 55.1):.7f}'), Decimal(f'{random.uniform(8.0, 11.4):.7f}'),
+            date(2000 + i % 24, 1 + i % 12, 1 + i % 28), date(2024, 1, 1)
+        )
+        for i in range(count)
+    ])
+
+
+def build_municipality(vertices: int, geojson) -> list:
+    keys = ['municipality_key', 'municipality_name', 'geographical_name', 'date_of_entry', 'shape_area', 'bbox', 'geojson']
+
+    return build_mappings(keys, [(
+        '01001000', 'Flensburg', 'Flensburg', '01.01.2024', 56730000.5,
+        {'xmin': 9.36, 'ymin': 54.74, 'xmax': 9.5, 'ymax': 54.84},
+        geojson(build_polygon(vertices))
+    )])
+
+
+def respond_validated(field, rows: list) -> bytes:
+    # response_model, validation of every row, jsonable_encoder and JSONResponse
+    content = asyncio.run(serialize_response(field=field, response_content=rows, is_coroutine=True))
+
+    return JSONResponse(content=content).body
+
+
+def respond_encoder(rows) -> bytes:
+    return JSONResponse(content=jsonable_encoder(rows)).body
+
+
+def respond_fast(rows) -> bytes:
+    return FastJSONResponse(content=rows).body
+
+
+def cpu_time(func, repeat: int) -> float:
+    timings = []
+
+    for _ in range(repeat):
+        start = time.process_time()
+        func()
+        timings.append((time.process_time() - start) * 1000)
+
+    return statistics.median(timings)
+
+
+@click.command()
+@click.option('--stations', '-s', type=int, default=5400, help='Rows of the MOSMIX station list')
+@click.option('--units', '-u', type=int, default=1000, help='Rows of an energy unit page')
+@click.option('--vertices', '-v', type=int, default=20000, help='Vertices of the municipality geometry')
+@click.option('--repeat', '-r', type=int, default=20, help='Requests per path')
+def main(stations, units, vertices, repeat):
+    mosmix_field = create_response_field(name='mosmix', type_=List[MosmixStationResponse])
+
+    # the former queries parse the geometry to dicts, now it stays json text
+    cases = []
+
+    for endpoint, build, former in [
+        ('/climate/v1/mosmix/list', lambda geojson: build_mosmix_stations(stations, geojson),
+            lambda rows: respond_validated(mosmix_field, rows)),
+        ('/energy/v1/unit/wind', lambda geojson: {'items': build_units(units), 'next_cursor': None, 'total_estimate': units},
+            respond_encoder),
+        ('/administrative/v1/municipality', lambda geojson: build_municipality(vertices, geojson),
+            respond_encoder)
+    ]:
+        random.seed(0)
+        parsed = build(json.loads)
+        random.seed(0)
+        text = build(fragment)
+
+        assert json.loads(former(parsed)) == json.loads(respond_fast(text))
+
+        cases.append((endpoint, former, parsed, text))
+
+    click.echo(f'{"endpoint":<34}{"former ms":>12}{"fast ms":>10}{"speedup":>10}')
+
+    for endpoint, former, parsed, text in cases:
+        former_ms = cpu_time(lambda: former(parsed), repeat)
+        fast_ms = cpu_time(lambda: respond_fast(text), repeat)
+
+        click.echo(f'{endpoint:<34}{former_ms:>12.2f}{fast_ms:>10.2f}{former_ms / fast_ms:>9.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+import io
+import click
+import random
+import zipfile
+
+from datetime import datetime, timedelta, timezone
+
+from app.utils.dwd_kmz import KML_NAMESPACE, DWD_NAMESPACE, FORECAST_ELEMENTS
+
+
+# element names of a MOSMIX_L document besides the ones the api returns
+EXTRA_ELEMENTS = [
+    'DRR1', 'E_DD', 'E_FF', 'E_PPP', 'E_Td', 'E_TTT', 'FX3', 'FXh', 'FXh25',
+    'FXh40', 'FXh55', 'N', 'N05', 'Nh', 'Nl', 'Nlm', 'Nm', 'PEvap', 'R130',
+    'R150', 'R600', 'R602', 'R610', 'R650', 'Rad1h', 'RR1c', 'RR3c', 'RR6c',
+    'RRhc', 'RRdc', 'RRad1', 'Rh00', 'Rh02', 'Rh10', 'Rh50', 'SunD3', 'T5cm',
+    'TG', 'TM', 'TN', 'TX', 'VV', 'VV10', 'W1W2', 'wwD', 'wwM', 'wwP', 'wwT',
+    'wwZ', 'WPc11', 'WPc31', 'WPc61', 'WPch1', 'WPcd1'
+]
+
+
+def format_values(steps: int, undefined: float) -> str:
+    values = [
+        '-' if random.random() < undefined else f'{random.uniform(0, 1100):.2f}'
+        for _ in range(steps)
+    ]
+
+    return ''.join(f'{value:>11}' for value in values)
+
+
+def build_kml(stations: int = 1, steps: int = 247, extra: int = 100, undefined: float = 0.05) -> bytes:
+    """
+    Builds a synthetic document with the structure of a MOSMIX_L KML file,
+    one placemark per station with all api elements plus extra ones.
+    """
+    issue_time = datetime(2024, 10, 18, 9, tzinfo=timezone.utc)
+    names = list(FORECAST_ELEMENTS) + [EXTRA_ELEMENTS[i % len(EXTRA_ELEMENTS)] + ('' if i < len(EXTRA_ELEMENTS) else str(i)) for i in range(extra)]
+
+    out = io.StringIO()
+    out.write('<?xml version="1.0" encoding="ISO-8859-1" standalone="yes"?>\n')
+    out.write(f'<kml:kml xmlns:dwd="{DWD_NAMESPACE}" xmlns:kml="{KML_NAMESPACE}">\n')
+    out.write('<kml:Document>\n<kml:ExtendedData>\n<dwd:ProductDefinition>\n')
+    out.write('<dwd:Issuer>Deutscher Wetterdienst</dwd:Issuer>\n')
+    out.write('<dwd:ProductID>MOSMIX</dwd:ProductID>\n')
+    out.write('<dwd:GeneratingProcess>DWD MOSMIX hourly, Version 1.0</dwd:GeneratingProcess>\n')
+    out.write(f'<dwd:IssueTime>{issue_time:%Y-%m-%dT%H:%M:%S}.000Z</dwd:IssueTime>\n')
+    out.write('<dwd:ForecastTimeSteps>\n')
+
+    for step in range(steps):
+        out.write(f'<dwd:TimeStep>{issue_time + timedelta(hours=step + 1):%Y-%m-%dT%H:%M:%S}.000Z</dwd:TimeStep>\n')
+
+    out.write('</dwd:ForecastTimeSteps>\n</dwd:ProductDefinition>\n</kml:ExtendedData>\n')
+
+    for station in range(stations):
+        out.write('<kml:Placemark>\n')
+        out.write(f'<kml:name>{10000 + station}</kml:name>\n')
+        out.write(f'<kml:description>STATION {station}</kml:description>\n')
+        out.write('<kml:ExtendedData>\n')
+
+        for name in names:
+            out.write(f'<dwd:Forecast dwd:elementName="{name}">\n')
+            out.write(f'<dwd:value>{format_values(steps, undefined)}</dwd:value>\n')
+            out.write('</dwd:Forecast>\n')
+
+        out.write('</kml:ExtendedData>\n')
+        out.write(f'<kml:Point>\n<kml:coordinates>{random.uniform(6, 15):.2f},{random.uniform(47, 55):.2f},{random.randint(0, 900)}.0</kml:coordinates>\n</kml:Point>\n')
+        out.write('</kml:Placemark>\n')
+
+    out.write('</kml:Document>\n</kml:kml>\n')
+
+    return out.getvalue().encode('iso-8859-1')
+
+
+def build_kmz(**kwargs) -> bytes:
+    buffer = io.BytesIO()
+
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as kmz:
+        kmz.writestr('MOSMIX_L_LATEST.kml', build_kml(**kwargs))
+
+    return buffer.getvalue()
+
+
+@click.command()
+@click.option('--dst', '-d', type=click.Path(), required=True, help='Path of the kmz file to write')
+@click.option('--stations', '-s', type=int, default=1, help='Number of placemarks')
+@click.option('--steps', '-t', type=int, default=247, help='Number of forecast time steps')
+@click.option('--extra', '-x', type=int, default=100, help='Number of elements besides the api ones')
+@click.option('--seed', type=int, default=0, help='Random seed')
+def main(dst, stations, steps, extra, seed):
+    random.seed(seed)
+
+    with open(dst, 'wb') as f:
+        f.write(build_kmz(stations=stations, steps=steps, extra=extra))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+import sys
+import time
+import click
+import asyncio
+import statistics
+
+from sqlalchemy.sql import text
+
+from app.database import async_session, engine
+from app.services.nearest import NEAREST_LAYERS, explain_nearest, get_nearest_rows
+from app.services.tile import TILE_LAYERS
+
+
+def get_distance_statement(layer: str):
+    # the former pattern, every row is cast to geography and sorted
+    config = TILE_LAYERS[layer]
+    geometry = config['geometry']
+
+    return text(f'''
+    SELECT
+        {', '.join(config['columns'])},
+        ST_Distance(
+            {geometry}::geography,
+            ST_SetSRID(ST_MakePoint(:lng, :lat), 4326)::geography
+        ) AS distance
+    FROM
+        {config['table']}
+    WHERE
+        {geometry} IS NOT NULL
+    ORDER BY
+        distance
+    LIMIT :k
+    ''')
+
+
+async def time_query(func, repeat: int) -> float:
+    timings = []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await func()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    return statistics.median(timings)
+
+
+def get_distances(rows) -> list:
+    return [round(float(row['distance']), 3) for row in rows]
+
+
+def get_failures(report: dict, table: str, knn: list, exact: list) -> list:
+    failures = []
+
+    if not report['uses_index']:
+        failures.append('no index scan in <-> order')
+
+    if table in report['seq_scans']:
+        failures.append(f'sequential scan of {table}')
+
+    if knn != exact:
+        failures.append(f'distances {knn} instead of {exact}')
+
+    return failures
+
+
+async def run_check(layers, lat, lng, k, max_distance, repeat) -> bool:
+    failed = []
+
+    click.echo(f'{"layer":<18}{"index":>8}{"knn ms":>10}{"distance ms":>13}  seq scans')
+
+    async with async_session() as session:
+        for layer in layers:
+            report = await explain_nearest(session, layer, lat, lng, k, max_distance=max_distance)
+
+            knn = await time_query(
+                lambda: get_nearest_rows(session, layer, lat, lng, k, max_distance=max_distance),
+                repeat
+            )
+            sort = await time_query(
+                lambda: session.execute(get_distance_statement(layer).bindparams(lat=lat, lng=lng, k=k)),
+                repeat
+            )
+
+            # the knn query has to find the rows of the full distance sort
+            nearest = await get_nearest_rows(session, layer, lat, lng, k, max_distance=max_distance)
+            result = await session.execute(get_distance_statement(layer).bindparams(lat=lat, lng=lng, k=k))
+            exact = [
+                row for row in result.mappings().all()
+                if max_distance is None or row['distance'] <= max_distance
+            ]
+
+            index = 'yes' if report['uses_index'] else 'NO'
+
+            click.echo(f'{layer:<18}{index:>8}{knn:>10.2f}{sort:>13.2f}  {", ".join(report["seq_scans"]) or "-"}')
+
+            for failure in get_failures(report, TILE_LAYERS[layer]['table'], get_distances(nearest), get_distances(exact)):
+                failed.append(f'{layer}: {failure}')
+
+    await engine.dispose()
+
+    for failure in failed:
+        click.echo(f'FAILED {failure}', err=True)
+
+    return not failed
+
+
+@click.command()
+@click.option('--layer', '-l', type=click.Choice(NEAREST_LAYERS), multiple=True, help='Layer to check, can be repeated, all by default')
+@click.option('--lat', type=float, default=54.7836, help='Latitude of the query point')
+@click.option('--lng', type=float, default=9.4321, help='Longitude of the query point')
+@click.option('--k', '-k', type=int, default=5, help='Number of nearest features')
+@click.option('--max-distance', type=float, help='Maximum distance in meters')
+@click.option('--repeat', '-r', type=int, default=20, help='Repetitions per query')
+def main(layer, lat, lng, k, max_distance, repeat):
+    """
+    Checks that the nearest queries of the layers read their candidates
+    from a GiST index in <-> order and compares them with the former
+    ORDER BY ST_Distance queries. Exits with 1 when a plan has no index
+    scan in <-> order, scans the layer table sequentially, e.g. because
+    its geometry index is missing, or returns other distances than the
+    full sort.
+    """
+    passed = asyncio.run(run_check(layer or NEAREST_LAYERS, lat, lng, k, max_distance, repeat))
+
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+import json
+import time
+import click
+import random
+import shapely
+
+from shapely.geometry import mapping
+
+from app.utils.serializer import dumps, fragment
+from app.utils.topojson import encode_topology
+
+
+def build_boundaries(count: int, spacing: float) -> list:
+    # voronoi cells share their borders vertex by vertex like vg25_gem
+    box = shapely.box(9.0, 54.0, 10.0, 55.0)
+    points = shapely.MultiPoint([(random.uniform(9.0, 10.0), random.uniform(54.0, 55.0)) for _ in range(count)])
+    cells = shapely.voronoi_polygons(points, extend_to=box)
+
+    return [
+        {
+            'id': f'01059{i:03}',
+            'geographical_name': f'Gemeinde {i}',
+            'geojson': json.dumps(mapping(shapely.segmentize(cell.intersection(box), spacing)))
+        }
+        for i, cell in enumerate(cells.geoms)
+    ]
+
+
+def encode_feature_collection(rows: list) -> bytes:
+    return dumps({
+        'type': 'FeatureCollection',
+        'features': [
+            {
+                'type': 'Feature',
+                'id': row['id'],
+                'properties': {'geographical_name': row['geographical_name']},
+                'geometry': fragment(row['geojson'])
+            }
+            for row in rows
+        ]
+    })
+
+
+@click.command()
+@click.option('--boundaries', '-b', type=int, default=100, help='Boundaries of the collection')
+@click.option('--spacing', '-s', type=float, default=0.0002, help='Distance of the vertices in degrees')
+@click.option('--quantization', '-q', type=int, default=100000, help='Quantization steps per axis')
+def main(boundaries, spacing, quantization):
+    random.seed(0)
+    rows = build_boundaries(boundaries, spacing)
+
+    geojson = encode_feature_collection(rows)
+
+    start = time.process_time()
+    topojson = encode_topology(rows, 'municipalities', quantization)
+    encode_ms = (time.process_time() - start) * 1000
+
+    click.echo(f'{"format":<10}{"kB":>10}{"ratio":>8}')
+    click.echo(f'{"geojson":<10}{len(geojson) / 1000:>10.1f}{1:>8.2f}')
+    click.echo(f'{"topojson":<10}{len(topojson) / 1000:>10.1f}{len(topojson) / len(geojson):>8.2f}')
+    click.echo(f'encoded once in {encode_ms:.0f} ms, cached per collection afterwards')
+
+
+if __name__ == '__main__':
+    main()
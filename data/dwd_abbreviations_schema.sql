@@ -46,3 +46,132 @@ INSERT INTO de_weather_station_code (station_code, station_label) VALUES
 ('SY', 'Stationen mit stündlichen, automatischen Messungen (teilweise ergänzt mit Augenbeobachtungen, vor Einführung der Automaten nur Augenbeobachtungen)'),
 ('TU', 'Stationen mit stündlichen Daten der Temperatur und der relativen Feuchte');
 
+
+
+
+-- HILFSTABELLE DWD MOSMIX ELEMENTE
+DROP TABLE IF EXISTS de_mosmix_element CASCADE;
+
+CREATE TABLE IF NOT EXISTS de_mosmix_element (
+    id SERIAL PRIMARY KEY,
+    element_code VARCHAR NOT NULL,
+    element_label VARCHAR,
+    element_unit VARCHAR
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_unique_mosmix_element_code ON de_mosmix_element (element_code);
+
+
+INSERT INTO de_mosmix_element (element_code, element_label, element_unit) VALUES
+('DD', 'Windrichtung', '°'),
+('DRR1', 'Niederschlagsdauer in der letzten Stunde', 's'),
+('E_DD', 'Fehler der Windrichtung', '°'),
+('E_FF', 'Fehler der Windgeschwindigkeit', 'm/s'),
+('E_PPP', 'Fehler des Luftdrucks', 'Pa'),
+('E_Td', 'Fehler des Taupunkts in 2 m Höhe', 'K'),
+('E_TTT', 'Fehler der Temperatur in 2 m Höhe', 'K'),
+('FF', 'Windgeschwindigkeit', 'm/s'),
+('FX1', 'Maximale Windböe in der letzten Stunde', 'm/s'),
+('FX3', 'Maximale Windböe in den letzten 3 Stunden', 'm/s'),
+('FX625', 'Wahrscheinlichkeit für Windböen >= 25 kn in den letzten 6 Stunden', '%'),
+('FX640', 'Wahrscheinlichkeit für Windböen >= 40 kn in den letzten 6 Stunden', '%'),
+('FX655', 'Wahrscheinlichkeit für Windböen >= 55 kn in den letzten 6 Stunden', '%'),
+('FXh', 'Maximale Windböe in den letzten 12 Stunden', 'm/s'),
+('FXh25', 'Wahrscheinlichkeit für Windböen >= 25 kn in den letzten 12 Stunden', '%'),
+('FXh40', 'Wahrscheinlichkeit für Windböen >= 40 kn in den letzten 12 Stunden', '%'),
+('FXh55', 'Wahrscheinlichkeit für Windböen >= 55 kn in den letzten 12 Stunden', '%'),
+('H_BsC', 'Wolkenuntergrenze konvektiver Bewölkung', 'm'),
+('N', 'Gesamtbedeckung', '%'),
+('N05', 'Bedeckung unterhalb von 500 ft', '%'),
+('Neff', 'Effektive Bedeckung', '%'),
+('Nh', 'Bedeckung mit hohen Wolken über 7 km', '%'),
+('Nl', 'Bedeckung mit tiefen Wolken unter 2 km', '%'),
+('Nlm', 'Bedeckung mit tiefen und mittelhohen Wolken unter 7 km', '%'),
+('Nm', 'Bedeckung mit mittelhohen Wolken zwischen 2 und 7 km', '%'),
+('PEvap', 'Potentielle Verdunstung in den letzten 24 Stunden', 'kg/m²'),
+('PPPP', 'Luftdruck reduziert auf Meeresniveau', 'Pa'),
+('PSd00', 'Wahrscheinlichkeit für relative Sonnenscheindauer > 0 % in 24 Stunden', '%'),
+('PSd30', 'Wahrscheinlichkeit für relative Sonnenscheindauer > 30 % in 24 Stunden', '%'),
+('PSd60', 'Wahrscheinlichkeit für relative Sonnenscheindauer > 60 % in 24 Stunden', '%'),
+('R101', 'Wahrscheinlichkeit für Niederschlag > 0,1 mm in der letzten Stunde', '%'),
+('R102', 'Wahrscheinlichkeit für Niederschlag > 0,2 mm in der letzten Stunde', '%'),
+('R103', 'Wahrscheinlichkeit für Niederschlag > 0,3 mm in der letzten Stunde', '%'),
+('R105', 'Wahrscheinlichkeit für Niederschlag > 0,5 mm in der letzten Stunde', '%'),
+('R107', 'Wahrscheinlichkeit für Niederschlag > 0,7 mm in der letzten Stunde', '%'),
+('R110', 'Wahrscheinlichkeit für Niederschlag > 1,0 mm in der letzten Stunde', '%'),
+('R120', 'Wahrscheinlichkeit für Niederschlag > 2,0 mm in der letzten Stunde', '%'),
+('R130', 'Wahrscheinlichkeit für Niederschlag > 3,0 mm in der letzten Stunde', '%'),
+('R150', 'Wahrscheinlichkeit für Niederschlag > 5,0 mm in der letzten Stunde', '%'),
+('R600', 'Wahrscheinlichkeit für Niederschlag > 0,0 mm in den letzten 6 Stunden', '%'),
+('R602', 'Wahrscheinlichkeit für Niederschlag > 0,2 mm in den letzten 6 Stunden', '%'),
+('R610', 'Wahrscheinlichkeit für Niederschlag > 1,0 mm in den letzten 6 Stunden', '%'),
+('R650', 'Wahrscheinlichkeit für Niederschlag > 5,0 mm in den letzten 6 Stunden', '%'),
+('Rad1h', 'Globalstrahlung in der letzten Stunde', 'kJ/m²'),
+('Rd00', 'Wahrscheinlichkeit für Niederschlag > 0,0 mm in den letzten 24 Stunden', '%'),
+('Rd02', 'Wahrscheinlichkeit für Niederschlag > 0,2 mm in den letzten 24 Stunden', '%'),
+('Rd10', 'Wahrscheinlichkeit für Niederschlag > 1,0 mm in den letzten 24 Stunden', '%'),
+('Rd50', 'Wahrscheinlichkeit für Niederschlag > 5,0 mm in den letzten 24 Stunden', '%'),
+('Rh00', 'Wahrscheinlichkeit für Niederschlag > 0,0 mm in den letzten 12 Stunden', '%'),
+('Rh02', 'Wahrscheinlichkeit für Niederschlag > 0,2 mm in den letzten 12 Stunden', '%'),
+('Rh10', 'Wahrscheinlichkeit für Niederschlag > 1,0 mm in den letzten 12 Stunden', '%'),
+('Rh50', 'Wahrscheinlichkeit für Niederschlag > 5,0 mm in den letzten 12 Stunden', '%'),
+('RR1c', 'Niederschlagsmenge in der letzten Stunde, konsistent mit dem signifikanten Wetter', 'kg/m²'),
+('RR3c', 'Niederschlagsmenge in den letzten 3 Stunden, konsistent mit dem signifikanten Wetter', 'kg/m²'),
+('RR6c', 'Niederschlagsmenge in den letzten 6 Stunden, konsistent mit dem signifikanten Wetter', 'kg/m²'),
+('RRad1', 'Globalstrahlung in der letzten Stunde relativ zum wolkenlosen Himmel', '%'),
+('RRdc', 'Niederschlagsmenge in den letzten 24 Stunden, konsistent mit dem signifikanten Wetter', 'kg/m²'),
+('RRhc', 'Niederschlagsmenge in den letzten 12 Stunden, konsistent mit dem signifikanten Wetter', 'kg/m²'),
+('RRL1c', 'Flüssiger Niederschlag in der letzten Stunde', 'kg/m²'),
+('RRS1c', 'Schneeregenäquivalent in der letzten Stunde', 'kg/m²'),
+('RRS3c', 'Schneeregenäquivalent in den letzten 3 Stunden', 'kg/m²'),
+('RSunD', 'Relative Sonnenscheindauer in den letzten 24 Stunden', '%'),
+('SunD', 'Sonnenscheindauer des Vortags', 's'),
+('SunD1', 'Sonnenscheindauer in der letzten Stunde', 's'),
+('SunD3', 'Sonnenscheindauer in den letzten 3 Stunden', 's'),
+('T5cm', 'Temperatur 5 cm über dem Erdboden', 'K'),
+('Td', 'Taupunkt in 2 m Höhe', 'K'),
+('TG', 'Minimum der Temperatur 5 cm über dem Erdboden in den letzten 12 Stunden', 'K'),
+('TM', 'Mitteltemperatur der letzten 24 Stunden', 'K'),
+('TN', 'Minimumtemperatur in den letzten 12 Stunden', 'K'),
+('TTT', 'Temperatur in 2 m Höhe', 'K'),
+('TX', 'Maximumtemperatur in den letzten 12 Stunden', 'K'),
+('VV', 'Sichtweite', 'm'),
+('VV10', 'Wahrscheinlichkeit für Sichtweite unter 1000 m', '%'),
+('W1W2', 'Wetter in den letzten 6 Stunden', NULL),
+('WPc11', 'Signifikantes Wetter mit der höchsten Priorität in der letzten Stunde', NULL),
+('WPc31', 'Signifikantes Wetter mit der höchsten Priorität in den letzten 3 Stunden', NULL),
+('WPc61', 'Signifikantes Wetter mit der höchsten Priorität in den letzten 6 Stunden', NULL),
+('WPcd1', 'Signifikantes Wetter mit der höchsten Priorität in den letzten 24 Stunden', NULL),
+('WPch1', 'Signifikantes Wetter mit der höchsten Priorität in den letzten 12 Stunden', NULL),
+('ww', 'Signifikantes Wetter', NULL),
+('ww3', 'Signifikantes Wetter in den letzten 3 Stunden', NULL),
+('wwC', 'Wahrscheinlichkeit für konvektiven Niederschlag in der letzten Stunde', '%'),
+('wwC6', 'Wahrscheinlichkeit für konvektiven Niederschlag in den letzten 6 Stunden', '%'),
+('wwCh', 'Wahrscheinlichkeit für konvektiven Niederschlag in den letzten 12 Stunden', '%'),
+('wwD', 'Wahrscheinlichkeit für stratiformen Niederschlag in der letzten Stunde', '%'),
+('wwD6', 'Wahrscheinlichkeit für stratiformen Niederschlag in den letzten 6 Stunden', '%'),
+('wwDh', 'Wahrscheinlichkeit für stratiformen Niederschlag in den letzten 12 Stunden', '%'),
+('wwF', 'Wahrscheinlichkeit für gefrierenden Regen in der letzten Stunde', '%'),
+('wwF6', 'Wahrscheinlichkeit für gefrierenden Regen in den letzten 6 Stunden', '%'),
+('wwFh', 'Wahrscheinlichkeit für gefrierenden Regen in den letzten 12 Stunden', '%'),
+('wwL', 'Wahrscheinlichkeit für Sprühregen in der letzten Stunde', '%'),
+('wwL6', 'Wahrscheinlichkeit für Sprühregen in den letzten 6 Stunden', '%'),
+('wwLh', 'Wahrscheinlichkeit für Sprühregen in den letzten 12 Stunden', '%'),
+('wwM', 'Wahrscheinlichkeit für Nebel in der letzten Stunde', '%'),
+('wwM6', 'Wahrscheinlichkeit für Nebel in den letzten 6 Stunden', '%'),
+('wwMh', 'Wahrscheinlichkeit für Nebel in den letzten 12 Stunden', '%'),
+('wwMd', 'Wahrscheinlichkeit für Nebel in den letzten 24 Stunden', '%'),
+('wwP', 'Wahrscheinlichkeit für Niederschlag in der letzten Stunde', '%'),
+('wwP6', 'Wahrscheinlichkeit für Niederschlag in den letzten 6 Stunden', '%'),
+('wwPh', 'Wahrscheinlichkeit für Niederschlag in den letzten 12 Stunden', '%'),
+('wwPd', 'Wahrscheinlichkeit für Niederschlag in den letzten 24 Stunden', '%'),
+('wwS', 'Wahrscheinlichkeit für festen Niederschlag in der letzten Stunde', '%'),
+('wwS6', 'Wahrscheinlichkeit für festen Niederschlag in den letzten 6 Stunden', '%'),
+('wwSh', 'Wahrscheinlichkeit für festen Niederschlag in den letzten 12 Stunden', '%'),
+('wwT', 'Wahrscheinlichkeit für Gewitter in der letzten Stunde', '%'),
+('wwT6', 'Wahrscheinlichkeit für Gewitter in den letzten 6 Stunden', '%'),
+('wwTh', 'Wahrscheinlichkeit für Gewitter in den letzten 12 Stunden', '%'),
+('wwTd', 'Wahrscheinlichkeit für Gewitter in den letzten 24 Stunden', '%'),
+('wwZ', 'Wahrscheinlichkeit für gefrierenden Sprühregen in der letzten Stunde', '%'),
+('wwZ6', 'Wahrscheinlichkeit für gefrierenden Sprühregen in den letzten 6 Stunden', '%'),
+('wwZh', 'Wahrscheinlichkeit für gefrierenden Sprühregen in den letzten 12 Stunden', '%');
@@ -0,0 +1,21 @@
+-- TABELLE VORHERSAGEN MOSMIX
+DROP TABLE IF EXISTS global_mosmix_forecasts CASCADE;
+DROP TABLE IF EXISTS global_mosmix_issues CASCADE;
+
+CREATE TABLE IF NOT EXISTS global_mosmix_issues (
+    issue_time TIMESTAMPTZ PRIMARY KEY,
+    product_id VARCHAR,
+    generating_process VARCHAR,
+    time_steps TIMESTAMPTZ[] NOT NULL,
+    station_count INT NOT NULL,
+    loaded_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+-- one partition per issue, loaded and attached by tools/insert_mosmix_forecasts.py
+CREATE TABLE IF NOT EXISTS global_mosmix_forecasts (
+    issue_time TIMESTAMPTZ NOT NULL,
+    station_id VARCHAR NOT NULL,
+    element_name VARCHAR NOT NULL,
+    forecast_values REAL[] NOT NULL,
+    PRIMARY KEY (issue_time, station_id, element_name)
+) PARTITION BY LIST (issue_time);
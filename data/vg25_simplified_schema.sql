@@ -0,0 +1,43 @@
+-- MATERIALISIERTE SICHT VEREINFACHTE VERWALTUNGSGRENZEN VG25
+-- Gemeinden, Kreise und Länder je Toleranz in Grad vorab vereinfacht,
+-- Ausdehnung und Fläche stammen von der vollständigen Geometrie
+DROP MATERIALIZED VIEW IF EXISTS vg25_simplified CASCADE;
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS vg25_simplified AS
+WITH tolerances (tolerance) AS (
+    VALUES (0.0001::double precision), (0.0005), (0.002), (0.01)
+),
+boundaries AS (
+    SELECT 'municipality' AS level, id, ags AS key, gen AS name, gf, geom FROM vg25_gem
+    UNION ALL
+    SELECT 'district' AS level, id, ags AS key, gen AS name, gf, geom FROM vg25_krs
+    UNION ALL
+    SELECT 'state' AS level, id, sn_l AS key, gen AS name, gf, geom FROM vg25_lan
+)
+SELECT
+    b.level,
+    b.id AS boundary_id,
+    b.key,
+    b.name,
+    b.gf,
+    t.tolerance,
+    ST_XMin(b.geom) AS xmin,
+    ST_YMin(b.geom) AS ymin,
+    ST_XMax(b.geom) AS xmax,
+    ST_YMax(b.geom) AS ymax,
+    ST_Area(ST_Transform(b.geom, 3587)) AS shape_area,
+    ST_Multi(ST_SimplifyPreserveTopology(b.geom, t.tolerance))::geometry(MultiPolygon, 4326) AS geom
+FROM
+    boundaries AS b
+CROSS JOIN
+    tolerances AS t
+WHERE
+    b.gf IN (4, 9)
+AND
+    b.geom IS NOT NULL;
+
+-- UNIQUE INDEX
+CREATE UNIQUE INDEX IF NOT EXISTS idx_unq_vg25_simplified_boundary ON vg25_simplified (level, boundary_id, tolerance);
+
+-- INDEX
+CREATE INDEX IF NOT EXISTS idx_vg25_simplified_key ON vg25_simplified (level, key, gf, tolerance);
@@ -0,0 +1,117 @@
+import os
+import sys
+import time
+import click
+import traceback
+import statistics
+import logging as log
+import psycopg2
+
+from dotenv import load_dotenv
+from pathlib import Path
+
+
+
+UNIT_TYPES = ['combustion', 'nuclear', 'water', 'biomass', 'wind', 'solar']
+
+
+# log uncaught exceptions
+def log_exceptions(type, value, tb):
+    for line in traceback.TracebackException(type, value, tb).format(chain=True):
+        log.exception(line)
+
+    log.exception(value)
+
+    sys.__excepthook__(type, value, tb) # calls default excepthook
+
+
+def connect_database(env_path):
+    try:
+        load_dotenv(dotenv_path=Path(env_path))
+
+        conn = psycopg2.connect(
+            database = os.getenv('DB_NAME'),
+            password = os.getenv('DB_PASS'),
+            user = os.getenv('DB_USER'),
+            host = os.getenv('DB_HOST'),
+            port = os.getenv('DB_PORT')
+        )
+
+        conn.autocommit = True
+
+        log.info('connection to database established')
+
+        return conn
+    except Exception as e:
+        log.error(e)
+
+        sys.exit(1)
+
+
+def get_view_definition(cur, view):
+    cur.execute('SELECT definition FROM pg_matviews WHERE matviewname = %s', (view,))
+    row = cur.fetchone()
+
+    if row is None:
+        log.error(f'materialized view {view} does not exist')
+        sys.exit(1)
+
+    return row[0].rstrip().rstrip(';')
+
+
+def measure(cur, sql, key, repeat):
+    timings = []
+    rows = 0
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        cur.execute(sql, (key,))
+        rows = len(cur.fetchall())
+        timings.append((time.perf_counter() - start) * 1000)
+
+    timings.sort()
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+
+    return rows, statistics.median(timings), p95
+
+
+def run_benchmark(conn, unit_types, keys, repeat):
+    cur = conn.cursor()
+
+    click.echo(f'{"type":<12}{"key":<10}{"rows":>8}{"joins ms":>12}{"p95":>10}{"read ms":>12}{"p95":>10}{"speedup":>10}')
+
+    for unit_type in unit_types:
+        view = f'de_{unit_type}_units_read'
+
+        # the view definition is the join query the api used to run per request
+        live_sql = f'SELECT * FROM ({get_view_definition(cur, view)}) AS live WHERE LOWER(municipality_key) = %s'
+        read_sql = f'SELECT * FROM {view} WHERE LOWER(municipality_key) = %s'
+
+        for key in keys:
+            rows, live_median, live_p95 = measure(cur, live_sql, key.lower(), repeat)
+            _, read_median, read_p95 = measure(cur, read_sql, key.lower(), repeat)
+            speedup = live_median / read_median if read_median else 0
+
+            click.echo(f'{unit_type:<12}{key:<10}{rows:>8}{live_median:>12.2f}{live_p95:>10.2f}{read_median:>12.2f}{read_p95:>10.2f}{speedup:>9.1f}x')
+
+
+@click.command()
+@click.option('--env', '-e', type=str, required=True, help='Path to local dot env file')
+@click.option('--key', '-k', type=str, multiple=True, default=['01001000', '11000000'], help='Municipality key to query, can be repeated')
+@click.option('--type', '-t', 'unit_types', type=click.Choice(UNIT_TYPES), multiple=True, default=UNIT_TYPES, help='Energy unit type, can be repeated')
+@click.option('--repeat', '-r', type=int, default=20, help='Number of runs per query')
+@click.option('--verbose', '-v', is_flag=True, help='Print more verbose output')
+def main(env, key, unit_types, repeat, verbose):
+    if verbose:
+        log.basicConfig(format='%(levelname)s: %(message)s', level=log.INFO)
+    else:
+        log.basicConfig(format='%(levelname)s: %(message)s')
+
+    conn = connect_database(env)
+    run_benchmark(conn, unit_types, key, repeat)
+
+
+if __name__ == '__main__':
+    sys.excepthook = log_exceptions
+
+    main()
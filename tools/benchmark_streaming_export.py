@@ -0,0 +1,159 @@
+import os
+import sys
+import json
+import time
+import click
+import resource
+import traceback
+import multiprocessing
+import logging as log
+import psycopg2
+import psycopg2.extras
+
+from datetime import date, datetime, time as dtime
+from decimal import Decimal
+from dotenv import load_dotenv
+from pathlib import Path
+
+
+
+UNIT_TYPES = ['combustion', 'nuclear', 'water', 'biomass', 'wind', 'solar']
+
+
+# log uncaught exceptions
+def log_exceptions(type, value, tb):
+    for line in traceback.TracebackException(type, value, tb).format(chain=True):
+        log.exception(line)
+
+    log.exception(value)
+
+    sys.__excepthook__(type, value, tb) # calls default excepthook
+
+
+def connect_database(env_path):
+    try:
+        load_dotenv(dotenv_path=Path(env_path))
+
+        conn = psycopg2.connect(
+            database = os.getenv('DB_NAME'),
+            password = os.getenv('DB_PASS'),
+            user = os.getenv('DB_USER'),
+            host = os.getenv('DB_HOST'),
+            port = os.getenv('DB_PORT')
+        )
+
+        log.info('connection to database established')
+
+        return conn
+    except Exception as e:
+        log.error(e)
+
+        sys.exit(1)
+
+
+def json_default(value):
+    if isinstance(value, (datetime, date, dtime)):
+        return value.isoformat()
+
+    if isinstance(value, Decimal):
+        return float(value)
+
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def export_buffered(conn, sql, params, chunk_size):
+    # what the json endpoints do, every row and the whole document in memory
+    cur = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+    cur.execute(sql, params)
+    rows = cur.fetchall()
+
+    content = json.dumps(rows, default=json_default, ensure_ascii=False).encode('utf-8')
+
+    with open(os.devnull, 'wb') as f:
+        f.write(content)
+
+    return len(rows), len(content)
+
+
+def export_streaming(conn, sql, params, chunk_size):
+    # what the ndjson export does, a server side cursor read chunk by chunk
+    cur = conn.cursor('export', cursor_factory=psycopg2.extras.RealDictCursor)
+    cur.itersize = chunk_size
+    cur.execute(sql, params)
+
+    rows = 0
+    size = 0
+
+    with open(os.devnull, 'wb') as f:
+        while True:
+            chunk = cur.fetchmany(chunk_size)
+
+            if not chunk:
+                break
+
+            lines = [json.dumps(row, default=json_default, ensure_ascii=False) for row in chunk]
+            content = ('\n'.join(lines) + '\n').encode('utf-8')
+            f.write(content)
+
+            rows += len(chunk)
+            size += len(content)
+
+    return rows, size
+
+
+def run_export(mode, env, sql, params, chunk_size, queue):
+    conn = connect_database(env)
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    start = time.perf_counter()
+    export = export_streaming if mode == 'streaming' else export_buffered
+    rows, size = export(conn, sql, params, chunk_size)
+    duration = time.perf_counter() - start
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    conn.close()
+
+    queue.put((rows, size, duration, baseline, peak))
+
+
+def run_benchmark(env, unit_type, key, rows, chunk_size):
+    sql = f'SELECT * FROM de_{unit_type}_units_read WHERE LOWER(municipality_key) LIKE %s LIMIT %s'
+    params = (f'{key.lower()}%', rows)
+
+    click.echo(f'{"mode":<12}{"rows":>10}{"MiB out":>10}{"seconds":>10}{"peak RSS MiB":>14}{"delta MiB":>12}')
+
+    # every mode runs in a fresh process, ru_maxrss never goes down
+    for mode in ['buffered', 'streaming']:
+        queue = multiprocessing.Queue()
+        process = multiprocessing.Process(
+            target=run_export,
+            args=(mode, env, sql, params, chunk_size, queue)
+        )
+        process.start()
+        count, size, duration, baseline, peak = queue.get()
+        process.join()
+
+        # ru_maxrss is reported in KiB on linux
+        click.echo(f'{mode:<12}{count:>10}{size / 1048576:>10.1f}{duration:>10.2f}{peak / 1024:>14.1f}{(peak - baseline) / 1024:>12.1f}')
+
+
+@click.command()
+@click.option('--env', '-e', type=str, required=True, help='Path to local dot env file')
+@click.option('--type', '-t', 'unit_type', type=click.Choice(UNIT_TYPES), default='solar', help='Energy unit type')
+@click.option('--key', '-k', type=str, default='01', help='Municipality key prefix, 01 exports a whole state')
+@click.option('--rows', '-r', type=int, default=100000, help='Maximum number of rows to export')
+@click.option('--chunk-size', '-c', type=int, default=1000, help='Rows per server side cursor fetch')
+@click.option('--verbose', '-v', is_flag=True, help='Print more verbose output')
+def main(env, unit_type, key, rows, chunk_size, verbose):
+    if verbose:
+        log.basicConfig(format='%(levelname)s: %(message)s', level=log.INFO)
+    else:
+        log.basicConfig(format='%(levelname)s: %(message)s')
+
+    run_benchmark(env, unit_type, key, rows, chunk_size)
+
+
+if __name__ == '__main__':
+    sys.excepthook = log_exceptions
+
+    main()
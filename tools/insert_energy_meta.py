@@ -49,6 +49,28 @@ def connect_database(env_path):
         sys.exit(1)
 
 
+def refresh_read_model(conn, view):
+    cur = conn.cursor()
+
+    try:
+        cur.execute(f'REFRESH MATERIALIZED VIEW CONCURRENTLY {view}')
+
+        log.info(f'refreshed materialized view {view}')
+    except Exception as e:
+        log.error(e)
+
+
+def notify_reload(conn, topic):
+    cur = conn.cursor()
+
+    try:
+        cur.execute('SELECT pg_notify(%s, %s)', ('open_data_api_reload', topic))
+
+        log.info(f'notified api workers to reload {topic}')
+    except Exception as e:
+        log.error(e)
+
+
 def parse_json(conn, data):
     cur = conn.cursor()
 
@@ -511,6 +533,12 @@ def main(env, url, target, verbose, debug):
     data = save_file_if_different(absolute_path, json_data)
     parse_json(conn, data)
 
+    # unit read models carry the resolved meta names
+    for unit_type in ['combustion', 'nuclear', 'water', 'biomass', 'wind', 'solar']:
+        refresh_read_model(conn, f'de_{unit_type}_units_read')
+
+    notify_reload(conn, 'energy_meta')
+
 
 if __name__ == '__main__':
     sys.excepthook = log_exceptions
@@ -0,0 +1,251 @@
+import io
+import os
+import sys
+import click
+import zipfile
+import traceback
+import logging as log
+import psycopg2
+
+from datetime import datetime
+from lxml import etree
+from psycopg2 import sql
+from dotenv import load_dotenv
+from pathlib import Path
+
+
+KML_NAMESPACE = 'http://www.opengis.net/kml/2.2'
+DWD_NAMESPACE = 'https://opendata.dwd.de/weather/lib/pointforecast_dwd_extension_V1_0.xsd'
+
+KML = '{%s}' % KML_NAMESPACE
+DWD = '{%s}' % DWD_NAMESPACE
+
+# elements served by the forecast endpoints
+FORECAST_ELEMENTS = (
+    'PPPP', 'FX1', 'TTT', 'RR1c', 'SunD1', 'FF',
+    'DD', 'Td', 'ww', 'SunD', 'Neff', 'R101'
+)
+
+
+# log uncaught exceptions
+def log_exceptions(type, value, tb):
+    for line in traceback.TracebackException(type, value, tb).format(chain=True):
+        log.exception(line)
+
+    log.exception(value)
+
+    sys.__excepthook__(type, value, tb)  # calls default excepthook
+
+
+def connect_database(env_path):
+    try:
+        load_dotenv(dotenv_path=Path(env_path))
+
+        conn = psycopg2.connect(
+            database=os.getenv('DB_NAME'),
+            password=os.getenv('DB_PASS'),
+            user=os.getenv('DB_USER'),
+            host=os.getenv('DB_HOST'),
+            port=os.getenv('DB_PORT')
+        )
+
+        conn.autocommit = True
+
+        log.info('connection to database established')
+
+        return conn
+    except Exception as e:
+        log.error(e)
+
+        sys.exit(1)
+
+
+def open_source(src):
+    if zipfile.is_zipfile(src):
+        kmz = zipfile.ZipFile(src, 'r')
+
+        # the member is decompressed while it is parsed
+        return kmz.open(kmz.namelist()[0])
+
+    return open(src, 'rb')
+
+
+def parse_time(text):
+    return datetime.fromisoformat(text.strip().replace('Z', '+00:00'))
+
+
+def format_array(text):
+    values = ('NULL' if value == '-' else value for value in text.split())
+
+    return '{' + ','.join(values) + '}'
+
+
+def read_placemarks(source, elements):
+    """
+    Stream parses a MOSMIX_L document. Yields the product definition once
+    its time steps were read, then one (station_id, element_name, values)
+    tuple per forecast element of every placemark. Each placemark is freed
+    after it was read, memory stays flat for the all stations document.
+    """
+    header = {'time_steps': []}
+    tags = (
+        DWD + 'ProductID', DWD + 'GeneratingProcess', DWD + 'IssueTime',
+        DWD + 'TimeStep', DWD + 'ForecastTimeSteps', KML + 'Placemark'
+    )
+
+    for _, item in etree.iterparse(source, events=('end',), tag=tags):
+        tag = item.tag
+
+        if tag == KML + 'Placemark':
+            station_id = item.findtext(KML + 'name').strip()
+
+            for forecast in item.iter(DWD + 'Forecast'):
+                element_name = forecast.get(DWD + 'elementName')
+
+                if elements is None or element_name in elements:
+                    yield station_id, element_name, format_array(forecast.findtext(DWD + 'value') or '')
+
+            item.clear()
+
+            while item.getprevious() is not None:
+                del item.getparent()[0]
+        elif tag == DWD + 'TimeStep':
+            header['time_steps'].append(parse_time(item.text))
+        elif tag == DWD + 'IssueTime':
+            header['issue_time'] = parse_time(item.text)
+        elif tag == DWD + 'ProductID':
+            header['product_id'] = item.text.strip()
+        elif tag == DWD + 'GeneratingProcess':
+            header['generating_process'] = item.text.strip()
+        elif tag == DWD + 'ForecastTimeSteps':
+            yield header
+
+
+def copy_rows(cur, table, rows):
+    buffer = io.StringIO(''.join(rows))
+
+    cur.copy_expert(
+        sql.SQL('COPY {} (issue_time, station_id, element_name, forecast_values) FROM STDIN').format(sql.Identifier(table)),
+        buffer
+    )
+
+
+def load_forecasts(conn, src, elements, batch_size):
+    cur = conn.cursor()
+
+    with open_source(src) as source:
+        placemarks = read_placemarks(source, elements)
+        header = next(placemarks)
+
+        issue_time = header['issue_time']
+        partition = f'global_mosmix_forecasts_{issue_time:%Y%m%d%H}'
+        staging = f'{partition}_load'
+
+        cur.execute(sql.SQL('DROP TABLE IF EXISTS {}').format(sql.Identifier(staging)))
+        cur.execute(sql.SQL('CREATE TABLE {} (LIKE global_mosmix_forecasts INCLUDING DEFAULTS)').format(sql.Identifier(staging)))
+
+        stations = set()
+        rows = []
+        count = 0
+
+        for station_id, element_name, values in placemarks:
+            stations.add(station_id)
+            rows.append(f'{issue_time.isoformat()}\t{station_id}\t{element_name}\t{values}\n')
+
+            if len(rows) == batch_size:
+                copy_rows(cur, staging, rows)
+                count += len(rows)
+                rows = []
+
+                log.info(f'copied {count} forecasts of {len(stations)} stations')
+
+        if rows:
+            copy_rows(cur, staging, rows)
+            count += len(rows)
+
+    log.info(f'copied {count} forecasts of {len(stations)} stations issued {issue_time.isoformat()}')
+
+    # the key and check constraint let the partition attach without a scan
+    cur.execute(sql.SQL('ALTER TABLE {} ADD PRIMARY KEY (issue_time, station_id, element_name)').format(sql.Identifier(staging)))
+    cur.execute(
+        sql.SQL('ALTER TABLE {} ADD CHECK (issue_time = {})').format(sql.Identifier(staging), sql.Literal(issue_time))
+    )
+
+    # replace an earlier load of the same issue in one transaction
+    conn.autocommit = False
+
+    try:
+        cur.execute(sql.SQL('DROP TABLE IF EXISTS {}').format(sql.Identifier(partition)))
+        cur.execute(sql.SQL('ALTER TABLE {} RENAME TO {}').format(sql.Identifier(staging), sql.Identifier(partition)))
+        cur.execute(
+            sql.SQL('ALTER TABLE global_mosmix_forecasts ATTACH PARTITION {} FOR VALUES IN ({})').format(
+                sql.Identifier(partition), sql.Literal(issue_time))
+        )
+        cur.execute('''
+            INSERT INTO global_mosmix_issues (issue_time, product_id, generating_process, time_steps, station_count)
+            VALUES (%s, %s, %s, %s, %s)
+            ON CONFLICT (issue_time) DO UPDATE SET
+                product_id = EXCLUDED.product_id,
+                generating_process = EXCLUDED.generating_process,
+                time_steps = EXCLUDED.time_steps,
+                station_count = EXCLUDED.station_count,
+                loaded_at = now()
+        ''', (
+            issue_time, header.get('product_id'), header.get('generating_process'),
+            header['time_steps'], len(stations)
+        ))
+
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.autocommit = True
+
+    log.info(f'attached partition {partition}')
+
+    return issue_time
+
+
+def drop_old_issues(conn, keep):
+    cur = conn.cursor()
+
+    cur.execute('SELECT issue_time FROM global_mosmix_issues ORDER BY issue_time DESC OFFSET %s', (keep,))
+
+    for issue_time, in cur.fetchall():
+        partition = f'global_mosmix_forecasts_{issue_time:%Y%m%d%H}'
+
+        cur.execute(sql.SQL('DROP TABLE IF EXISTS {}').format(sql.Identifier(partition)))
+        cur.execute('DELETE FROM global_mosmix_issues WHERE issue_time = %s', (issue_time,))
+
+        log.info(f'dropped partition {partition}')
+
+
+@click.command()
+@click.option('--env', '-e', type=str, required=True, help='Path to local dot env file')
+@click.option('--src', '-s', type=str, required=True, help='Path to your local MOSMIX_L kmz or kml file')
+@click.option('--elements', type=str, default=','.join(FORECAST_ELEMENTS), help='Comma separated elements to load or "all"')
+@click.option('--keep', '-k', type=click.IntRange(1), default=4, help='Number of latest issues to keep')
+@click.option('--batch-size', '-b', type=click.IntRange(1), default=10000, help='Forecasts copied per round trip')
+@click.option('--verbose', '-v', is_flag=True, help='Print more verbose output')
+@click.option('--debug', '-d', is_flag=True, help='Print detailed debug output')
+def main(env, src, elements, keep, batch_size, verbose, debug):
+    if debug:
+        log.basicConfig(format='%(levelname)s: %(message)s', level=log.DEBUG)
+    if verbose:
+        log.basicConfig(format='%(levelname)s: %(message)s', level=log.INFO)
+        log.info(f'set logging level to verbose')
+    else:
+        log.basicConfig(format='%(levelname)s: %(message)s')
+
+    elements = None if elements == 'all' else set(elements.split(','))
+
+    conn = connect_database(env)
+    load_forecasts(conn, src, elements, batch_size)
+    drop_old_issues(conn, keep)
+
+
+if __name__ == '__main__':
+    sys.excepthook = log_exceptions
+
+    main()
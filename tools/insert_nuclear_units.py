@@ -162,6 +162,28 @@ def read_nuclear_units(conn, src):
             del elem.getparent()[0]
 
 
+def refresh_read_model(conn, view):
+    cur = conn.cursor()
+
+    try:
+        cur.execute(f'REFRESH MATERIALIZED VIEW CONCURRENTLY {view}')
+
+        log.info(f'refreshed materialized view {view}')
+    except Exception as e:
+        log.error(e)
+
+
+def notify_reload(conn, topic):
+    cur = conn.cursor()
+
+    try:
+        cur.execute('SELECT pg_notify(%s, %s)', ('open_data_api_reload', topic))
+
+        log.info(f'notified api workers to reload {topic}')
+    except Exception as e:
+        log.error(e)
+
+
 @click.command()
 @click.option('--env', '-e', type=str, required=True, help='Set your local dot env path')
 @click.option('--src', '-s', type=click.Path(exists=True), required=True, help='Set src path to your xml')
@@ -181,6 +203,8 @@ def main(env, src, verbose, debug):
 
     conn = connect_database(env)
     read_nuclear_units(conn, Path(src))
+    refresh_read_model(conn, 'de_nuclear_units_read')
+    notify_reload(conn, 'tiles_nuclear_unit')
 
 
 if __name__ == '__main__':
@@ -140,6 +140,17 @@ def read_csv(conn, src):
         insert_row(cur, row)
 
 
+def notify_reload(conn, topic):
+    cur = conn.cursor()
+
+    try:
+        cur.execute('SELECT pg_notify(%s, %s)', ('open_data_api_reload', topic))
+
+        log.info(f'notified api workers to reload {topic}')
+    except Exception as e:
+        log.error(e)
+
+
 @click.command()
 @click.option('--env', '-e', type=str, required=True, help='Path to local dot env file')
 @click.option('--src', '-s', type=str, required=True, help='Path to your local file')
@@ -159,6 +170,7 @@ def main(env, src, verbose, debug):
 
     conn = connect_database(env)
     data = read_csv(conn, src)
+    notify_reload(conn, 'weather_stations')
 
 
 if __name__ == '__main__':